@@ -1 +1,3 @@
-"""OpenGL Extensions"""
\ No newline at end of file
+"""OpenGL Extensions"""
+from OpenGL import _lazyimport
+_lazyimport.extensionPackage( globals() )
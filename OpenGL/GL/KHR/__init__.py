@@ -0,0 +1,3 @@
+"""OpenGL Extensions"""
+from OpenGL import _lazyimport
+_lazyimport.extensionPackage( globals() )
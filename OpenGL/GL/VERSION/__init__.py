@@ -0,0 +1,3 @@
+"""OpenGL core version modules (GL_1_0 ... GL_4_6)"""
+from OpenGL import _lazyimport
+_lazyimport.extensionPackage( globals() )
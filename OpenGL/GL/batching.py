@@ -0,0 +1,338 @@
+"""Client-side batching of immediate-mode geometry
+
+Importing the names from this module *after* OpenGL.GL replaces the
+glBegin/glEnd pair and the per-vertex attribute entry points with
+versions which record into growable client-side float buffers
+instead of crossing into the GL once per call:
+
+    from OpenGL.GL import *
+    from OpenGL.GL.batching import *
+
+    glBegin( GL_QUADS )
+    glColor3f( 1,0,0 )
+    glVertex3f( 0,0,0 )
+    ...
+    glEnd() # a single glDrawArrays call for the whole primitive
+
+At glEnd the recorded vertices are issued as one glDrawArrays with
+the same primitive mode (GL_QUADS, GL_POLYGON and friends are all
+legal for glDrawArrays on compatibility contexts).  Client array
+state is saved/restored with glPushClientAttrib, so application
+vertex-array/VBO bindings are not disturbed.
+
+Current-attribute semantics follow immediate mode: a glColor (or
+glNormal, glTexCoord) issued inside the pair applies to all following
+vertices, vertices before the first such call use the value current
+at glBegin (queried from the GL only in that case), and after glEnd
+the GL's current value is the last one set inside the pair.  Attributes
+which are never set inside a pair are not sent as arrays at all, so
+the GL's current value applies as usual.  Outside of a pair all of
+the entry points here simply forward to the standard OpenGL.GL ones.
+
+Each context has its own ImmediateBatch (see currentBatch), stored
+with OpenGL.contextdata, so its buffers and statistics are not shared
+between contexts.  The batch of the context current at glBegin
+records until the matching glEnd.
+
+Note:
+    Only the entry points exported from this module may be used
+    between a batched glBegin/glEnd pair, any other GL call issued
+    there executes immediately (i.e. *before* the batched geometry).
+"""
+import ctypes
+from array import array
+from OpenGL import error, contextdata
+from OpenGL import platform as _platform
+from OpenGL.lazywrapper import lazy as _lazy
+from OpenGL.GL.VERSION import GL_1_1 as full
+from OpenGL.GL import exceptional
+from OpenGL.raw.GL.VERSION import GL_1_1 as _simple
+from OpenGL.raw.GL.VERSION.GL_1_5 import (
+    glBindBuffer as _glBindBuffer, GL_ARRAY_BUFFER as _GL_ARRAY_BUFFER,
+)
+
+__all__ = [
+    'glBegin',
+    'glEnd',
+    'glVertex',
+    'glColor',
+    'glNormal',
+    'glTexCoord',
+    'ImmediateBatch',
+    'currentBatch',
+    # automatically added stuff here...
+]
+
+class ImmediateBatch( object ):
+    """Recording state for the current glBegin/glEnd pair
+
+    Attributes:
+
+        mode -- primitive mode passed to glBegin or None if not recording
+        vertices -- list of recorded 4-component vertex positions
+        colors, normals, texCoords -- lists of recorded per-vertex attribute
+            values, only populated once the attribute is set in the pair
+        buffers -- map from recording list name to the (growable)
+            array('f') client-side buffer it is packed into at glEnd
+        color, normal, texCoord -- attribute values set in the pair
+        leading -- map from attribute name to the number of vertices
+            recorded before the attribute was first set in the pair
+        drawCount -- number of glDrawArrays calls issued (statistics)
+        vertexCount -- number of vertices drawn (statistics)
+    """
+    mode = None
+    color = normal = texCoord = None
+    drawCount = 0
+    vertexCount = 0
+    def __init__( self ):
+        """Allocate the recording lists and client-side buffers"""
+        self.vertices = []
+        self.colors = []
+        self.normals = []
+        self.texCoords = []
+        self.buffers = dict([
+            (name,array( 'f' ))
+            for name in ('vertices','colors','normals','texCoords')
+        ])
+        self.leading = {}
+    def begin( self, mode ):
+        """Start recording a primitive of the given mode"""
+        if self.mode is not None:
+            raise error.GLError(
+                full.GL_INVALID_OPERATION,
+                baseOperation = full.glBegin,
+                description = 'glBegin called inside a batched glBegin/glEnd pair',
+            )
+        self.mode = mode
+        self.leading.clear()
+        del self.vertices[:]
+    def vertex( self, values ):
+        """Record a vertex (4-tuple) along with the in-pair attribute values"""
+        self.vertices.extend( values )
+        leading = self.leading
+        if leading:
+            if 'color' in leading:
+                self.colors.extend( self.color )
+            if 'normal' in leading:
+                self.normals.extend( self.normal )
+            if 'texCoord' in leading:
+                self.texCoords.extend( self.texCoord )
+    def attribute( self, name, value ):
+        """Record an attribute setting, return False if not recording"""
+        if self.mode is None:
+            return False
+        if name not in self.leading:
+            self.leading[name] = len(self.vertices)//4
+            del getattr( self, name+'s' )[:]
+        setattr( self, name, value )
+        return True
+    def end( self ):
+        """Flush the recorded primitive with a single glDrawArrays"""
+        mode = self.mode
+        if mode is None:
+            raise error.GLError(
+                full.GL_INVALID_OPERATION,
+                baseOperation = full.glEnd,
+                description = 'glEnd called without a batched glBegin',
+            )
+        self.mode = None
+        count = len(self.vertices)//4
+        leading = self.leading
+        try:
+            if count:
+                self._draw( mode, count )
+        finally:
+            # the GL's current values are undefined after an array draw,
+            # restore the last in-pair settings as immediate mode would...
+            if 'color' in leading:
+                full.glColor4f( *self.color )
+            if 'normal' in leading:
+                full.glNormal3f( *self.normal )
+            if 'texCoord' in leading:
+                full.glTexCoord4f( *self.texCoord )
+            leading.clear()
+    def _draw( self, mode, count ):
+        """Issue the recorded vertices (count of them) as mode"""
+        leading = self.leading
+        for (name,query,size) in (
+            ('color',full.GL_CURRENT_COLOR,4),
+            ('normal',full.GL_CURRENT_NORMAL,3),
+            ('texCoord',full.GL_CURRENT_TEXTURE_COORDS,4),
+        ):
+            before = leading.get( name )
+            if before:
+                # vertices before the first in-pair setting use the GL's
+                # current value from before the glBegin call...
+                current = [float(x) for x in full.glGetFloatv( query )][:size]
+                getattr( self, name+'s' )[0:0] = current*before
+        buffers = []
+        for name in ('vertices','colors','normals','texCoords'):
+            if name == 'vertices' or name[:-1] in leading:
+                # pack the recorded values into the reusable float buffer
+                buffer = self.buffers[name]
+                del buffer[:]
+                buffer.fromlist( getattr( self, name ))
+                buffers.append( ctypes.c_void_p( buffer.buffer_info()[0] ) )
+            else:
+                buffers.append( None )
+        vertices,colors,normals,texCoords = buffers
+        _simple.glPushClientAttrib( full.GL_CLIENT_VERTEX_ARRAY_BIT )
+        try:
+            if _glBindBuffer:
+                _glBindBuffer( _GL_ARRAY_BUFFER, 0 )
+            _simple.glEnableClientState( full.GL_VERTEX_ARRAY )
+            _simple.glVertexPointer( 4, full.GL_FLOAT, 0, vertices )
+            if colors is not None:
+                _simple.glEnableClientState( full.GL_COLOR_ARRAY )
+                _simple.glColorPointer( 4, full.GL_FLOAT, 0, colors )
+            if normals is not None:
+                _simple.glEnableClientState( full.GL_NORMAL_ARRAY )
+                _simple.glNormalPointer( full.GL_FLOAT, 0, normals )
+            if texCoords is not None:
+                _simple.glEnableClientState( full.GL_TEXTURE_COORD_ARRAY )
+                _simple.glTexCoordPointer( 4, full.GL_FLOAT, 0, texCoords )
+            full.glDrawArrays( mode, 0, count )
+        finally:
+            _simple.glPopClientAttrib()
+        self.drawCount += 1
+        self.vertexCount += count
+
+_BATCH_KEY = 'OpenGL.GL.batching'
+_getContext = _platform.GetCurrentContext
+_current = [None, None]
+# batch recording a glBegin/glEnd pair, checked by the per-vertex entry points
+_recording = [None]
+def currentBatch( ):
+    """Retrieve the ImmediateBatch for the current context (creating it if necessary)"""
+    context = _getContext()
+    if context and context == _current[0]:
+        return _current[1]
+    batch = contextdata.getValue( _BATCH_KEY, context=context )
+    if batch is None:
+        batch = ImmediateBatch()
+        contextdata.setValue( _BATCH_KEY, batch, context=context )
+    _current[:] = [context, batch]
+    return batch
+
+@_lazy( exceptional.glBegin )
+def glBegin( baseFunction, mode ):
+    """Begin recording batched geometry (no GL call is made until glEnd)"""
+    batch = currentBatch()
+    batch.begin( mode )
+    _recording[0] = batch
+@_lazy( exceptional.glEnd )
+def glEnd( baseFunction ):
+    """Finish recording batched geometry, drawing it with one glDrawArrays"""
+    batch = _recording[0] or currentBatch()
+    _recording[0] = None
+    return batch.end()
+
+def _vertex( name, count, vector=False ):
+    """Produce a batching version of the glVertex entry point name"""
+    base = getattr( full, name )
+    default = (0.0,0.0,0.0,1.0)[count:]
+    if vector:
+        def function( v ):
+            batch = _recording[0]
+            if batch is None:
+                return base( v )
+            return batch.vertex( tuple(v)[:count] + default )
+    else:
+        def function( *args ):
+            batch = _recording[0]
+            if batch is None:
+                return base( *args )
+            return batch.vertex( args + default )
+    function.__name__ = name
+    function.__doc__ = base.__doc__
+    function.baseFunction = base
+    return function
+
+def _attribute( name, attribute, count, default, scale=1.0, vector=False ):
+    """Produce a batching version of the glColor/glNormal/glTexCoord entry point name
+
+    count -- number of components taken by the entry point
+    default -- tuple of values used to fill the components not provided
+    scale -- multiplier applied to normalise integer (e.g. ub) colours
+    """
+    base = getattr( full, name )
+    default = tuple(default[count:])
+    def function( *args ):
+        batch = _recording[0]
+        if batch is None:
+            return base( *args )
+        if vector:
+            args = tuple(args[0])[:count]
+        if scale != 1.0:
+            args = tuple([x*scale for x in args])
+        return batch.attribute( attribute, tuple(args) + default )
+    function.__name__ = name
+    function.__doc__ = base.__doc__
+    function.baseFunction = base
+    return function
+
+for _suffix in ('d','f','i','s'):
+    for _count in (2,3,4):
+        for _vector in (False,True):
+            _name = 'glVertex%s%s%s'%( _count, _suffix, ('','v')[_vector] )
+            globals()[_name] = _vertex( _name, _count, _vector )
+            __all__.append( _name )
+    for _count in (3,4):
+        for _vector in (False,True):
+            _name = 'glColor%s%s%s'%( _count, _suffix, ('','v')[_vector] )
+            globals()[_name] = _attribute(
+                _name, 'color', _count, (0.0,0.0,0.0,1.0),
+                scale = {'i':1.0/2147483647,'s':1.0/32767}.get( _suffix, 1.0 ),
+                vector = _vector,
+            )
+            __all__.append( _name )
+    for _vector in (False,True):
+        _name = 'glNormal3%s%s'%( _suffix, ('','v')[_vector] )
+        globals()[_name] = _attribute(
+            _name, 'normal', 3, (0.0,0.0,1.0),
+            scale = {'i':1.0/2147483647,'s':1.0/32767}.get( _suffix, 1.0 ),
+            vector = _vector,
+        )
+        __all__.append( _name )
+    for _count in (1,2,3,4):
+        for _vector in (False,True):
+            _name = 'glTexCoord%s%s%s'%( _count, _suffix, ('','v')[_vector] )
+            globals()[_name] = _attribute(
+                _name, 'texCoord', _count, (0.0,0.0,0.0,1.0), vector = _vector,
+            )
+            __all__.append( _name )
+for _count in (3,4):
+    for _vector in (False,True):
+        _name = 'glColor%sub%s'%( _count, ('','v')[_vector] )
+        globals()[_name] = _attribute(
+            _name, 'color', _count, (0.0,0.0,0.0,1.0), scale=1.0/255, vector=_vector,
+        )
+        __all__.append( _name )
+try:
+    del _suffix, _count, _vector, _name
+except NameError as err:
+    pass
+
+def glVertex( *args ):
+    """Choose glVertexX based on number of args"""
+    if len(args) == 1:
+        # v form...
+        args = args[0]
+    return globals()['glVertex%sd'%(len(args),)]( *args )
+def glColor( *args ):
+    """glColor*f* -- convenience function to dispatch on argument type"""
+    if len(args) == 1:
+        args = tuple(args[0])
+    if len(args) not in (3,4):
+        raise ValueError( """Don't know how to handle arguments: %s"""%(args,))
+    return globals()['glColor%sd'%(len(args),)]( *args )
+def glNormal( *args ):
+    """Set the current normal (3 values or a 3-sequence)"""
+    if len(args) == 1:
+        args = tuple(args[0])
+    return glNormal3d( *args )
+def glTexCoord( *args ):
+    """Choose glTexCoordX based on number of args"""
+    if len(args) == 1:
+        args = tuple(args[0])
+    return globals()['glTexCoord%sd'%(len(args),)]( *args )
@@ -0,0 +1,137 @@
+"""KHR_debug message callback routed into the OpenGL.errors logger
+
+With OpenGL.ERROR_CHECKING set to 'debug' (or 'debug:sync') GL entry
+points are not followed by a glGetError call, instead the driver reports
+errors (and performance/portability warnings etceteras) to a callback
+installed with glDebugMessageCallback.  installDebugCallback() is called
+automatically by OpenGL.GLUT.glutCreateWindow in those modes, call it
+yourself after making the context current with other GUI libraries:
+
+    from OpenGL.GL import debugmessages
+    debugmessages.installDebugCallback()
+
+Messages are logged to the OpenGL.errors logger at a level determined
+by their severity.  With synchronous output ('debug:sync') messages of
+type GL_DEBUG_TYPE_ERROR are also queued for the error checker, so that
+the offending entry point raises GLError (with the message as the
+description).
+
+Note:
+    drivers are free to report nothing at all for contexts which were
+    not created with the debug flag set, request a debug context (e.g.
+    glutInitContextFlags( GLUT_DEBUG )) to be sure of seeing errors.
+"""
+import ctypes, logging
+from OpenGL import error, contextdata, extensions
+from OpenGL.raw.GL import _types
+from OpenGL.raw.GL.VERSION import GL_1_1 as _simple
+from OpenGL.raw.GL.VERSION import GL_4_3 as _core
+from OpenGL.raw.GL.KHR import debug as _khr
+from OpenGL.raw.GL.ARB import debug_output as _arb
+_log = logging.getLogger( 'OpenGL.errors' )
+
+__all__ = [
+    'installDebugCallback',
+    'removeDebugCallback',
+    'debugMessageHandler',
+]
+
+SOURCE_NAMES = {
+    _core.GL_DEBUG_SOURCE_API: 'API',
+    _core.GL_DEBUG_SOURCE_WINDOW_SYSTEM: 'window-system',
+    _core.GL_DEBUG_SOURCE_SHADER_COMPILER: 'shader-compiler',
+    _core.GL_DEBUG_SOURCE_THIRD_PARTY: 'third-party',
+    _core.GL_DEBUG_SOURCE_APPLICATION: 'application',
+    _core.GL_DEBUG_SOURCE_OTHER: 'other',
+}
+TYPE_NAMES = {
+    _core.GL_DEBUG_TYPE_ERROR: 'error',
+    _core.GL_DEBUG_TYPE_DEPRECATED_BEHAVIOR: 'deprecated',
+    _core.GL_DEBUG_TYPE_UNDEFINED_BEHAVIOR: 'undefined-behavior',
+    _core.GL_DEBUG_TYPE_PORTABILITY: 'portability',
+    _core.GL_DEBUG_TYPE_PERFORMANCE: 'performance',
+    _core.GL_DEBUG_TYPE_MARKER: 'marker',
+    _core.GL_DEBUG_TYPE_PUSH_GROUP: 'push-group',
+    _core.GL_DEBUG_TYPE_POP_GROUP: 'pop-group',
+    _core.GL_DEBUG_TYPE_OTHER: 'other',
+}
+SEVERITY_LEVELS = {
+    _core.GL_DEBUG_SEVERITY_HIGH: logging.ERROR,
+    _core.GL_DEBUG_SEVERITY_MEDIUM: logging.WARNING,
+    _core.GL_DEBUG_SEVERITY_LOW: logging.INFO,
+    _core.GL_DEBUG_SEVERITY_NOTIFICATION: logging.DEBUG,
+}
+_CALLBACK_KEY = 'OpenGL.GL.debugmessages.callback'
+
+def debugMessageHandler( source, type, id, severity, length, message, userParam ):
+    """Default GLDEBUGPROC implementation, logs and queues errors
+
+    Never raises (exceptions cannot propagate out of a ctypes callback),
+    GL_DEBUG_TYPE_ERROR messages are queued in error._DEBUG_ERRORS for the
+    error checker when ERROR_CHECKING is 'debug:sync'.
+    """
+    try:
+        if isinstance( message, bytes ):
+            message = message.decode( 'utf-8', 'replace' )
+        if type == _core.GL_DEBUG_TYPE_ERROR and error.DEBUG_OUTPUT == 'sync':
+            error._DEBUG_ERRORS.append( (id,message) )
+        _log.log(
+            SEVERITY_LEVELS.get( severity, logging.WARNING ),
+            'GL %s %s 0x%x: %s',
+            SOURCE_NAMES.get( source, hex(source) ),
+            TYPE_NAMES.get( type, hex(type) ),
+            id,
+            message,
+        )
+    except Exception as err:
+        _log.error( """Failure in GL debug message handler: %s""", err )
+
+def _callbackSetter( ):
+    """Choose the glDebugMessageCallback implementation for the current context"""
+    if _core.glDebugMessageCallback:
+        return _core.glDebugMessageCallback
+    if extensions.hasGLExtension( _khr._EXTENSION_NAME ) and _khr.glDebugMessageCallback:
+        return _khr.glDebugMessageCallback
+    if extensions.hasGLExtension( _arb._EXTENSION_NAME ) and _arb.glDebugMessageCallbackARB:
+        return _arb.glDebugMessageCallbackARB
+    return None
+
+def installDebugCallback( handler=debugMessageHandler, synchronous=None ):
+    """Install handler as the debug message callback for the current context
+
+    handler -- Python callable matching the GLDEBUGPROC signature
+    synchronous -- if True enable GL_DEBUG_OUTPUT_SYNCHRONOUS, None
+        means "if ERROR_CHECKING is 'debug:sync'"
+
+    The ctypes callback is stored in the context's contextdata so that
+    it lives as long as the context.
+
+    returns False (after logging a warning) if the context has no
+    debug output support, otherwise True
+    """
+    setter = _callbackSetter()
+    if setter is None:
+        _log.warning(
+            """No KHR_debug/ARB_debug_output support in context, GL errors will not be reported"""
+        )
+        return False
+    if synchronous is None:
+        synchronous = error.DEBUG_OUTPUT == 'sync'
+    callback = _types.GLDEBUGPROC( handler )
+    contextdata.setValue( _CALLBACK_KEY, callback )
+    setter( callback, None )
+    _simple.glEnable( _core.GL_DEBUG_OUTPUT )
+    if synchronous:
+        _simple.glEnable( _core.GL_DEBUG_OUTPUT_SYNCHRONOUS )
+    else:
+        _simple.glDisable( _core.GL_DEBUG_OUTPUT_SYNCHRONOUS )
+    return True
+
+def removeDebugCallback( ):
+    """Remove the debug message callback from the current context"""
+    setter = _callbackSetter()
+    if setter is not None:
+        setter( _types.GLDEBUGPROC(), None )
+        _simple.glDisable( _core.GL_DEBUG_OUTPUT )
+    contextdata.delValue( _CALLBACK_KEY )
+    del error._DEBUG_ERRORS[:]
@@ -195,14 +195,15 @@ glDrawElements = wrapper.wrapper( _simple.glDrawElements ).setPyConverter(
 
 def glDrawElementsTyped( type, suffix ):
     arrayType = arraydatatype.GL_CONSTANT_TO_ARRAY_TYPE[ type ]
+    typed, size = arrayhelpers.asArrayTypedWithSize( 'indices', arrayType )
     function = wrapper.wrapper(
         _simple.glDrawElements
     ).setPyConverter('type').setCConverter(
         'type', type
     ).setPyConverter('count').setCConverter(
-        'count', arrayhelpers.AsArrayTypedSize( 'indices', arrayType ),
+        'count', size,
     ).setPyConverter(
-        'indices', arrayhelpers.AsArrayTyped( 'indices', arrayType ),
+        'indices', typed,
     ).setReturnValues(
         wrapper.returnPyArgument( 'indices' )
     )
@@ -0,0 +1,483 @@
+"""Shadowing of common GL state to elide redundant state-setting calls
+
+Importing the names from this module *after* OpenGL.GL (and after
+OpenGL.GL.batching, if that is used) replaces a set of common
+state-setting entry points with versions which remember, per context,
+the last value set and skip the call entirely when it would not change
+anything:
+
+    from OpenGL.GL import *
+    from OpenGL.GL.statecache import *
+
+    glClearColor( 0,0,0,1 )
+    glClearColor( 0,0,0,1 ) # no GL call is made
+
+Matching queries (glIsEnabled and glGetIntegerv/glGetFloatv/glGetDoublev
+for the shadowed pnames) are answered from the shadow without a driver
+round-trip.  Unknown values are read through, i.e. the first query
+goes to the GL and its result is remembered.
+
+Shadowed state (the names accepted by invalidate()):
+
+    'enable' -- glEnable/glDisable/glIsEnabled (texture-target caps
+        are tracked per texture unit)
+    'color' -- glColor3/4 d/f/ub, the other glColor* forms forget the
+        shadowed colour
+    'clearColor', 'viewport', 'matrixMode', 'shadeModel', 'blendFunc',
+    'depthFunc', 'lineWidth', 'pointSize' -- the corresponding setters
+    'program', 'buffer', 'texture', 'activeTexture' -- glUseProgram,
+        glBindBuffer, glBindTexture and glActiveTexture
+
+The shadow is kept coherent with the entry points exported here:
+glPopAttrib, glCallList(s) and glDelete{Buffers,Textures} forget the
+state they may have changed, and calls made while compiling a display
+list (glNewList) are passed through.  While a list is compiled the
+names of the shadowed state its calls set are recorded, so glCallList
+of a list compiled through this module's glNewList/glEndList only
+forgets that state (e.g. just 'color' for a list of glColor'd
+geometry).  Lists compiled by other means, and all glCallLists calls
+(whose ids depend on glListBase), forget all shadowed state.  A list
+must not set shadowed state through other entry points than these
+(e.g. the raw ones) unless it is compiled by other means.  State changed by any other route
+(code using the raw entry points, other libraries sharing the context,
+client-array draws which leave the current colour undefined) is not
+seen, call invalidate() after such code runs.  Likewise call
+invalidate() after destroying a context if a new one may be created
+with the same handle.
+"""
+from OpenGL import contextdata, platform as _platform
+from OpenGL import _configflags
+from OpenGL.arrays import GLintArray, GLfloatArray, GLdoubleArray
+from OpenGL.GL.VERSION import GL_1_1 as full
+from OpenGL.GL.VERSION.GL_1_3 import glActiveTexture as _glActiveTexture, GL_ACTIVE_TEXTURE
+from OpenGL.GL.VERSION.GL_1_5 import (
+    glBindBuffer as _glBindBuffer, glDeleteBuffers as _glDeleteBuffers,
+    GL_ARRAY_BUFFER, GL_ELEMENT_ARRAY_BUFFER,
+    GL_ARRAY_BUFFER_BINDING, GL_ELEMENT_ARRAY_BUFFER_BINDING,
+)
+from OpenGL.GL.VERSION.GL_2_0 import glUseProgram as _glUseProgram, GL_CURRENT_PROGRAM
+from OpenGL.GL.VERSION.GL_1_2 import GL_TEXTURE_3D, GL_TEXTURE_BINDING_3D
+from OpenGL.GL.VERSION.GL_1_3 import GL_TEXTURE_CUBE_MAP, GL_TEXTURE_BINDING_CUBE_MAP
+import sys
+
+__all__ = [
+    'StateCache',
+    'currentCache',
+    'invalidate',
+    'glEnable',
+    'glDisable',
+    'glIsEnabled',
+    'glClearColor',
+    'glViewport',
+    'glMatrixMode',
+    'glShadeModel',
+    'glBlendFunc',
+    'glDepthFunc',
+    'glLineWidth',
+    'glPointSize',
+    'glUseProgram',
+    'glBindBuffer',
+    'glDeleteBuffers',
+    'glBindTexture',
+    'glDeleteTextures',
+    'glActiveTexture',
+    'glGetIntegerv',
+    'glGetFloatv',
+    'glGetDoublev',
+    'glPopAttrib',
+    'glCallList',
+    'glCallLists',
+    'glNewList',
+    'glEndList',
+    # automatically added stuff here...
+]
+
+_CACHE_KEY = 'OpenGL.GL.statecache'
+TEXTURE_TARGETS = {
+    full.GL_TEXTURE_1D: full.GL_TEXTURE_BINDING_1D,
+    full.GL_TEXTURE_2D: full.GL_TEXTURE_BINDING_2D,
+    GL_TEXTURE_3D: GL_TEXTURE_BINDING_3D,
+    GL_TEXTURE_CUBE_MAP: GL_TEXTURE_BINDING_CUBE_MAP,
+}
+# glGet pname: (state key, getters which may answer from the shadow)
+_INTEGER = ('glGetIntegerv','glGetFloatv','glGetDoublev')
+_FLOAT = ('glGetFloatv','glGetDoublev')
+QUERIES = {
+    full.GL_MATRIX_MODE: (('matrixMode',), _INTEGER),
+    full.GL_SHADE_MODEL: (('shadeModel',), _INTEGER),
+    full.GL_VIEWPORT: (('viewport',), _INTEGER),
+    full.GL_DEPTH_FUNC: (('depthFunc',), _INTEGER),
+    full.GL_BLEND_SRC: (('blendFunc',), _INTEGER),
+    full.GL_BLEND_DST: (('blendFunc',), _INTEGER),
+    full.GL_COLOR_CLEAR_VALUE: (('clearColor',), _FLOAT),
+    full.GL_CURRENT_COLOR: (('color',), _FLOAT),
+    full.GL_LINE_WIDTH: (('lineWidth',), _FLOAT),
+    full.GL_POINT_SIZE: (('pointSize',), _FLOAT),
+    GL_CURRENT_PROGRAM: (('program',), _INTEGER),
+    GL_ACTIVE_TEXTURE: (('activeTexture',), _INTEGER),
+    GL_ARRAY_BUFFER_BINDING: (('buffer',GL_ARRAY_BUFFER), _INTEGER),
+    GL_ELEMENT_ARRAY_BUFFER_BINDING: (('buffer',GL_ELEMENT_ARRAY_BUFFER), _INTEGER),
+}
+
+class StateCache( object ):
+    """Shadow of the state of a single context
+
+    Attributes:
+
+        values -- map from state key (a tuple whose first item is the
+            state name, e.g. ('enable', GL_BLEND)) to the last value set
+            or queried (ints/floats or tuples of them)
+        listMode -- mode passed to glNewList while compiling a display
+            list, otherwise None
+        listId -- id of the display list being compiled, otherwise None
+        listState -- set of the state names set by the calls of the
+            display list being compiled ('*' if unknown)
+        lists -- map from display list id to the frozenset of state
+            names calling it may change
+        hits -- number of calls elided or queries answered (statistics)
+        misses -- number of calls/queries passed to the GL (statistics)
+    """
+    listMode = None
+    listId = None
+    hits = 0
+    misses = 0
+    def __init__( self ):
+        self.values = {}
+        self.listState = set()
+        self.lists = {}
+    def redundant( self, key, value ):
+        """Would setting key to value leave the GL state unchanged?"""
+        if self.listMode is None and key in self.values and self.values[key] == value:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+    def record( self, key, value ):
+        """Record that the GL state for key is now value"""
+        if self.listMode is not None:
+            self.listState.add( key[0] )
+        if self.listMode != full.GL_COMPILE:
+            self.values[key] = value
+    def invalidate( self, *names ):
+        """Forget the state with the given names (all state if none given)"""
+        if self.listMode is not None:
+            self.listState.update( names or ('*',) )
+        if not names:
+            self.values.clear()
+        else:
+            for key in [key for key in self.values if key[0] in names]:
+                del self.values[key]
+    def activeTexture( self ):
+        """Current texture unit (read through from the GL if unknown)"""
+        unit = self.values.get( ('activeTexture',) )
+        if unit is None:
+            unit = int( full.glGetIntegerv( GL_ACTIVE_TEXTURE ))
+            self.values[('activeTexture',)] = unit
+        return unit
+    def enableKey( self, cap ):
+        """Key under which glEnable state for cap is stored"""
+        if cap in TEXTURE_TARGETS:
+            return ('enable', cap, self.activeTexture())
+        return ('enable', cap)
+    def queryKey( self, pname ):
+        """Key and answering getters for glGet pname, or (None,())"""
+        if pname in TEXTURE_TARGETS.values():
+            for target,binding in TEXTURE_TARGETS.items():
+                if binding == pname:
+                    return ('texture', self.activeTexture(), target), _INTEGER
+        return QUERIES.get( pname, (None,()) )
+
+_getContext = _platform.GetCurrentContext
+_current = [None, None]
+def currentCache( ):
+    """Retrieve the StateCache for the current context (creating it if necessary)"""
+    context = _getContext()
+    if context and context == _current[0]:
+        return _current[1]
+    cache = contextdata.getValue( _CACHE_KEY, context=context )
+    if cache is None:
+        cache = StateCache()
+        contextdata.setValue( _CACHE_KEY, cache, context=context )
+    _current[:] = [context, cache]
+    return cache
+
+def invalidate( *names ):
+    """Forget shadowed state of the current context, e.g. after foreign code has run
+
+    names -- state names (see module docstring) to forget, if none are
+        given all shadowed state is forgotten
+    """
+    currentCache().invalidate( *names )
+
+def _setter( name, base, key, convert=None ):
+    """Produce a shadowing version of base which sets state key
+
+    convert -- if given base takes a single argument and the shadowed
+        value is convert( argument ), otherwise the argument tuple is
+        shadowed
+
+    The redundancy check is inlined (rather than using
+    StateCache.redundant) as this is the path the cache exists to make
+    cheap.
+    """
+    if convert is None:
+        def function( *args ):
+            context = _getContext()
+            cache = _current[1] if (context and context == _current[0]) else currentCache()
+            if cache.listMode is None and cache.values.get( key ) == args:
+                cache.hits += 1
+                return None
+            cache.misses += 1
+            result = base( *args )
+            cache.record( key, args )
+            return result
+    else:
+        def function( arg ):
+            context = _getContext()
+            cache = _current[1] if (context and context == _current[0]) else currentCache()
+            value = convert( arg )
+            if cache.listMode is None and cache.values.get( key ) == value:
+                cache.hits += 1
+                return None
+            cache.misses += 1
+            result = base( arg )
+            cache.record( key, value )
+            return result
+    function.__name__ = name
+    function.__doc__ = base.__doc__
+    function.baseFunction = base
+    return function
+
+glClearColor = _setter( 'glClearColor', full.glClearColor, ('clearColor',) )
+glViewport = _setter( 'glViewport', full.glViewport, ('viewport',) )
+glMatrixMode = _setter( 'glMatrixMode', full.glMatrixMode, ('matrixMode',), int )
+glShadeModel = _setter( 'glShadeModel', full.glShadeModel, ('shadeModel',), int )
+glBlendFunc = _setter( 'glBlendFunc', full.glBlendFunc, ('blendFunc',) )
+glDepthFunc = _setter( 'glDepthFunc', full.glDepthFunc, ('depthFunc',), int )
+glLineWidth = _setter( 'glLineWidth', full.glLineWidth, ('lineWidth',), float )
+glPointSize = _setter( 'glPointSize', full.glPointSize, ('pointSize',), float )
+glUseProgram = _setter( 'glUseProgram', _glUseProgram, ('program',), int )
+
+def _enabler( name, base, value ):
+    """Produce a shadowing version of glEnable/glDisable"""
+    def function( cap ):
+        context = _getContext()
+        cache = _current[1] if (context and context == _current[0]) else currentCache()
+        key = ('enable', cap, cache.activeTexture()) if cap in TEXTURE_TARGETS else ('enable', cap)
+        if cache.listMode is None and cache.values.get( key ) is value:
+            cache.hits += 1
+            return None
+        cache.misses += 1
+        result = base( cap )
+        cache.record( key, value )
+        return result
+    function.__name__ = name
+    function.__doc__ = base.__doc__
+    function.baseFunction = base
+    return function
+glEnable = _enabler( 'glEnable', full.glEnable, True )
+glDisable = _enabler( 'glDisable', full.glDisable, False )
+
+def glIsEnabled( cap ):
+    """Answer glIsEnabled from the shadow, reading through if unknown"""
+    cache = currentCache()
+    key = cache.enableKey( cap )
+    value = cache.values.get( key )
+    if value is not None:
+        cache.hits += 1
+        return int( value )
+    cache.misses += 1
+    value = bool( full.glIsEnabled( cap ))
+    cache.record( key, value )
+    return int( value )
+
+def glActiveTexture( texture ):
+    """Shadowing glActiveTexture"""
+    cache = currentCache()
+    key = ('activeTexture',)
+    if cache.redundant( key, int(texture) ):
+        return None
+    result = _glActiveTexture( texture )
+    cache.record( key, int(texture) )
+    return result
+
+def glBindBuffer( target, buffer ):
+    """Shadowing glBindBuffer"""
+    cache = currentCache()
+    key = ('buffer', int(target))
+    value = int(buffer)
+    if cache.redundant( key, value ):
+        return None
+    result = _glBindBuffer( target, buffer )
+    cache.record( key, value )
+    return result
+def glDeleteBuffers( *args ):
+    """glDeleteBuffers, forgetting buffer bindings (deleting a bound buffer unbinds it)"""
+    currentCache().invalidate( 'buffer' )
+    return _glDeleteBuffers( *args )
+
+def glBindTexture( target, texture ):
+    """Shadowing glBindTexture (per texture unit)"""
+    cache = currentCache()
+    key = ('texture', cache.activeTexture(), int(target))
+    value = int(texture)
+    if cache.redundant( key, value ):
+        return None
+    result = full.glBindTexture( target, texture )
+    cache.record( key, value )
+    return result
+def glDeleteTextures( *args ):
+    """glDeleteTextures, forgetting texture bindings (deleting a bound texture unbinds it)"""
+    currentCache().invalidate( 'texture' )
+    return full.glDeleteTextures( *args )
+
+def _getter( name, base, arrayType ):
+    """Produce a version of glGet*v answering shadowed pnames without a GL call
+
+    Answers are built once per (pname, value) and copied on return, the
+    array construction machinery otherwise costs as much as the query.
+    """
+    built = {}
+    def answer( pname, shadowed ):
+        value = shadowed
+        if pname == full.GL_BLEND_SRC:
+            value = value[0]
+        elif pname == full.GL_BLEND_DST:
+            value = value[1]
+        if not isinstance( value, tuple ):
+            value = (value,)
+        template = arrayType.zeros( (len(value),) )
+        template[:] = value
+        if len( built ) > 256:
+            built.clear()
+        built[(pname,shadowed)] = template
+        return template
+    def function( pname, *args ):
+        if args:
+            return base( pname, *args )
+        cache = currentCache()
+        key,getters = cache.queryKey( pname )
+        if name not in getters:
+            return base( pname )
+        value = cache.values.get( key )
+        if value is not None:
+            cache.hits += 1
+            template = built.get( (pname,value) )
+            if template is None:
+                template = answer( pname, value )
+            if len( template ) == 1 and _configflags.SIZE_1_ARRAY_UNPACK:
+                return template[0]
+            return template.copy()
+        cache.misses += 1
+        result = base( pname )
+        if pname not in (full.GL_BLEND_SRC,full.GL_BLEND_DST):
+            try:
+                value = tuple([x.item() if hasattr(x,'item') else x for x in result])
+            except TypeError:
+                value = result.item() if hasattr(result,'item') else result
+            if arrayType is GLintArray and isinstance( value, tuple ):
+                value = tuple([int(x) for x in value])
+            elif arrayType is GLintArray:
+                value = int( value )
+            cache.record( key, value )
+        return result
+    function.__name__ = name
+    function.__doc__ = base.__doc__
+    function.baseFunction = base
+    return function
+glGetIntegerv = _getter( 'glGetIntegerv', full.glGetIntegerv, GLintArray )
+glGetFloatv = _getter( 'glGetFloatv', full.glGetFloatv, GLfloatArray )
+glGetDoublev = _getter( 'glGetDoublev', full.glGetDoublev, GLdoubleArray )
+
+def _forgetting( name, base, *names ):
+    """Produce a version of base which forgets shadowed state (all if no names)"""
+    def function( *args ):
+        currentCache().invalidate( *names )
+        return base( *args )
+    function.__name__ = name
+    function.__doc__ = base.__doc__
+    function.baseFunction = base
+    return function
+glPopAttrib = _forgetting( 'glPopAttrib', full.glPopAttrib )
+glCallLists = _forgetting( 'glCallLists', full.glCallLists )
+
+def glCallList( list ):
+    """glCallList, forgetting the shadowed state the list may change"""
+    cache = currentCache()
+    names = cache.lists.get( int(list) )
+    if names is None:
+        cache.invalidate()
+    elif names:
+        cache.invalidate( *names )
+    return full.glCallList( list )
+
+def glNewList( list, mode ):
+    """Start a display list, passing state calls through while compiling"""
+    result = full.glNewList( list, mode )
+    cache = currentCache()
+    cache.listMode = mode
+    cache.listState = set()
+    cache.listId = int(list)
+    return result
+def glEndList( ):
+    """Finish a display list, resuming elision of redundant state calls"""
+    cache = currentCache()
+    if cache.listMode is not None:
+        if '*' in cache.listState:
+            cache.lists.pop( cache.listId, None )
+        else:
+            cache.lists[cache.listId] = frozenset( cache.listState )
+    cache.listMode = cache.listId = None
+    return full.glEndList()
+
+def _colorBase( name ):
+    """The glColor* implementation to forward to (batching-aware)"""
+    batching = sys.modules.get( 'OpenGL.GL.batching' )
+    if batching is not None:
+        return getattr( batching, name )
+    return getattr( full, name )
+
+def _color( name, count, scale ):
+    """Produce a shadowing version of the glColor entry point name"""
+    base = getattr( full, name )
+    key = ('color',)
+    def function( *args ):
+        cache = currentCache()
+        if scale == 1.0:
+            value = tuple(args) + (1.0,)*(4-count)
+        else:
+            value = tuple([x*scale for x in args]) + (1.0,)*(4-count)
+        if cache.redundant( key, value ):
+            return None
+        result = _colorBase( name )( *args )
+        cache.record( key, value )
+        return result
+    function.__name__ = name
+    function.__doc__ = base.__doc__
+    function.baseFunction = base
+    return function
+
+def _colorForgetting( name ):
+    """Produce a version of the glColor entry point name which forgets the shadowed colour"""
+    base = getattr( full, name )
+    def function( *args ):
+        currentCache().invalidate( 'color' )
+        return _colorBase( name )( *args )
+    function.__name__ = name
+    function.__doc__ = base.__doc__
+    function.baseFunction = base
+    return function
+
+for _count in (3,4):
+    for _suffix in ('b','d','f','i','s','ub','ui','us'):
+        for _vector in ('','v'):
+            _name = 'glColor%s%s%s'%( _count, _suffix, _vector )
+            if not _vector and _suffix in ('d','f','ub'):
+                globals()[_name] = _color( _name, _count, (1.0,1.0/255)[_suffix=='ub'] )
+            else:
+                globals()[_name] = _colorForgetting( _name )
+            __all__.append( _name )
+try:
+    del _count, _suffix, _vector, _name
+except NameError as err:
+    pass
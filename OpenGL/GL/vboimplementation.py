@@ -15,6 +15,7 @@ class Implementation( vbo.Implementation ):
                     found = True 
                     break 
             assert found, name
+        self.load_optional( GL_3_0 )
         if GL_1_5.glBufferData:
             self.available = True
 
@@ -1,5 +1,15 @@
 """OpenGL.EGL the portable interface to GL environments"""
-from OpenGL.raw.GLES2._types import *
-from OpenGL.GLES2.VERSION.GLES2_2_0 import *
+from OpenGL import _configflags
 
-from OpenGL.GLES2 import vboimplementation as _gles2_implementation
+if _configflags.LAZY_IMPORTS:
+    # names are imported from their (precomputed) source module on first use
+    from OpenGL import _lazyimport
+    from OpenGL.GLES2 import _lazyindex
+    _lazyimport.lazyNamespace( globals(), _lazyindex.SOURCES, None, _lazyindex.SUBMODULES )
+    from OpenGL.arrays import vbo as _vbo
+    _vbo.Implementation.register_module( 'OpenGL.GLES2.vboimplementation' )
+else:
+    from OpenGL.raw.GLES2._types import *
+    from OpenGL.GLES2.VERSION.GLES2_2_0 import *
+
+    from OpenGL.GLES2 import vboimplementation as _gles2_implementation
@@ -0,0 +1,426 @@
+"""NumPy emulation of the fixed-function matrix stacks
+
+Importing the names from this module *after* OpenGL.GL and OpenGL.GLU
+(and after OpenGL.GL.batching/OpenGL.GL.statecache, if those are used)
+replaces the fixed-function matrix entry points with versions which
+mirror the modelview and projection stacks (and the viewport) of the
+current context in NumPy arrays:
+
+    from OpenGL.GL import *
+    from OpenGL.GLU import *
+    from OpenGL.GLU.matrixstack import *
+
+    glMatrixMode( GL_PROJECTION )
+    glLoadIdentity()
+    gluPerspective( 45, 1.25, 0.1, 3000 )
+    ...
+    gluUnProject( x, y, 0.0 ) # no glGet* calls
+
+The OpenGL.GLU projection helpers (gluProject, gluUnProject,
+gluUnProject4, gluProjectArray, gluUnProjectArray) take the matrices
+and viewport they are not given from the mirror instead of querying
+the GL only when that is switched on, i.e. when the application routes
+all of its matrix changes through these entry points:
+
+    MatrixStack.projection = True # all contexts
+    currentStack().projection = True # the current context
+    with mirroredProjection():
+        gluUnProject( x, y, 0.0 ) # only within the block
+
+otherwise matrix changes made through the plain OpenGL.GL entry points
+would give stale results.  The matrices are in the layout glGetDoublev returns (i.e. the
+transpose of the mathematical matrix, rows of the array are columns of
+the matrix), so getMatrix() results may be passed anywhere the queried
+matrices could be.
+
+Matrices which have not been established through these entry points
+(e.g. the matrices current when the module was imported) are unknown,
+operations on an unknown matrix leave it unknown, and an unknown matrix
+is queried from the GL (once) when it is asked for.  A sequence which
+starts from glLoadIdentity/glLoadMatrix never queries the GL at all.
+
+By default every entry point also makes the corresponding GL call, so
+the GL does its own (single precision) arithmetic and the mirror only
+saves queries.  With MatrixStack.loadMatrix set (per context, or on the
+class for all contexts) the GL's current matrix is instead loaded from
+the mirror with glLoadMatrixd after each change and glPushMatrix /
+glPopMatrix do not reach the GL at all.
+
+glPopAttrib, glCallList(s) and display list compilation are handled as
+for OpenGL.GL.statecache.  Matrix changes made by any other route
+(code using the raw entry points, glMatrixMode( GL_TEXTURE ) stacks
+which are not mirrored) are not seen, call invalidate() after such
+code runs.
+"""
+import math, sys
+import numpy
+from OpenGL import contextdata, platform as _platform
+from OpenGL.GL.VERSION import GL_1_1 as full
+
+__all__ = [
+    'MatrixStack',
+    'currentStack',
+    'mirroredProjection',
+    'invalidate',
+    'getMatrix',
+    'getViewport',
+    'glMatrixMode',
+    'glViewport',
+    'glPushMatrix',
+    'glPopMatrix',
+    'glLoadIdentity',
+    'glLoadMatrixf',
+    'glLoadMatrixd',
+    'glMultMatrixf',
+    'glMultMatrixd',
+    'glTranslatef',
+    'glTranslated',
+    'glRotatef',
+    'glRotated',
+    'glScalef',
+    'glScaled',
+    'glOrtho',
+    'glFrustum',
+    'gluOrtho2D',
+    'gluPerspective',
+    'gluLookAt',
+    'glPopAttrib',
+    'glCallList',
+    'glCallLists',
+    'glNewList',
+    'glEndList',
+]
+
+_STACK_KEY = 'OpenGL.GLU.matrixstack'
+TRACKED_MODES = (full.GL_MODELVIEW, full.GL_PROJECTION)
+MATRIX_QUERIES = {
+    full.GL_MODELVIEW: full.GL_MODELVIEW_MATRIX,
+    full.GL_PROJECTION: full.GL_PROJECTION_MATRIX,
+}
+
+def identity( ):
+    """New 4x4 identity matrix"""
+    return numpy.identity( 4, dtype='d' )
+def translation( x, y, z ):
+    """glTranslate matrix (glGetDoublev layout)"""
+    matrix = identity()
+    matrix[3,:3] = (x,y,z)
+    return matrix
+def scaling( x, y, z ):
+    """glScale matrix (glGetDoublev layout)"""
+    return numpy.diag( (x,y,z,1.0) ).astype( 'd' )
+def rotation( angle, x, y, z ):
+    """glRotate matrix (glGetDoublev layout), angle in degrees"""
+    length = math.sqrt( x*x + y*y + z*z )
+    if not length:
+        return identity()
+    x,y,z = x/length, y/length, z/length
+    radians = math.radians( angle )
+    c,s = math.cos( radians ), math.sin( radians )
+    t = 1.0 - c
+    return numpy.array( [
+        [t*x*x + c,   t*x*y + s*z, t*x*z - s*y, 0.0],
+        [t*x*y - s*z, t*y*y + c,   t*y*z + s*x, 0.0],
+        [t*x*z + s*y, t*y*z - s*x, t*z*z + c,   0.0],
+        [0.0,         0.0,         0.0,         1.0],
+    ], dtype='d' )
+def ortho( left, right, bottom, top, near, far ):
+    """glOrtho matrix (glGetDoublev layout)"""
+    matrix = identity()
+    matrix[0,0] = 2.0/(right-left)
+    matrix[1,1] = 2.0/(top-bottom)
+    matrix[2,2] = -2.0/(far-near)
+    matrix[3,:3] = (
+        -(right+left)/float(right-left),
+        -(top+bottom)/float(top-bottom),
+        -(far+near)/float(far-near),
+    )
+    return matrix
+def frustum( left, right, bottom, top, near, far ):
+    """glFrustum matrix (glGetDoublev layout)"""
+    matrix = numpy.zeros( (4,4), dtype='d' )
+    matrix[0,0] = 2.0*near/(right-left)
+    matrix[1,1] = 2.0*near/(top-bottom)
+    matrix[2,0] = (right+left)/float(right-left)
+    matrix[2,1] = (top+bottom)/float(top-bottom)
+    matrix[2,2] = -(far+near)/float(far-near)
+    matrix[2,3] = -1.0
+    matrix[3,2] = -2.0*far*near/(far-near)
+    return matrix
+def perspective( fovy, aspect, near, far ):
+    """gluPerspective matrix (glGetDoublev layout)"""
+    top = near * math.tan( math.radians( fovy )/2.0 )
+    right = top * aspect
+    return frustum( -right, right, -top, top, near, far )
+def lookAt( eyeX, eyeY, eyeZ, centerX, centerY, centerZ, upX, upY, upZ ):
+    """gluLookAt matrix (glGetDoublev layout)"""
+    eye = numpy.array( (eyeX,eyeY,eyeZ), dtype='d' )
+    forward = numpy.array( (centerX,centerY,centerZ), dtype='d' ) - eye
+    forward /= numpy.linalg.norm( forward ) or 1.0
+    side = numpy.cross( forward, (upX,upY,upZ) )
+    side /= numpy.linalg.norm( side ) or 1.0
+    up = numpy.cross( side, forward )
+    matrix = identity()
+    matrix[:3,0] = side
+    matrix[:3,1] = up
+    matrix[:3,2] = -forward
+    return numpy.dot( translation( *(-eye) ), matrix )
+
+class MatrixStack( object ):
+    """Mirror of the matrix state of a single context
+
+    Attributes:
+
+        mode -- current matrix mode (None if unknown)
+        stacks -- map from tracked matrix mode to list of 4x4 matrices
+            (glGetDoublev layout), the last being the current matrix,
+            None entries are unknown
+        viewport -- (x,y,width,height) or None if unknown
+        listMode -- mode passed to glNewList while compiling a display
+            list, otherwise None
+        loadMatrix -- if True the GL's matrices are loaded from the
+            mirror instead of the GL doing its own arithmetic
+        projection -- if True the GLU projection helpers use the
+            mirror rather than querying the GL
+        queries -- number of times the GL had to be queried (statistics)
+    """
+    loadMatrix = False
+    projection = False
+    listMode = None
+    queries = 0
+    def __init__( self ):
+        self.mode = None
+        self.viewport = None
+        self.stacks = dict([(mode,[None]) for mode in TRACKED_MODES])
+    def invalidate( self ):
+        """Forget the current matrices, matrix mode and viewport"""
+        self.mode = None
+        self.viewport = None
+        for stack in self.stacks.values():
+            stack[-1] = None
+    def currentMode( self ):
+        """Current matrix mode (read through from the GL if unknown)"""
+        if self.mode is None:
+            self.queries += 1
+            self.mode = int( full.glGetIntegerv( full.GL_MATRIX_MODE ))
+        return self.mode
+    def getMatrix( self, mode=None ):
+        """Current matrix for mode (default the current mode), querying if unknown
+
+        returns the 4x4 matrix (glGetDoublev layout), callers must not
+        modify it
+        """
+        if mode is None:
+            mode = self.currentMode()
+        stack = self.stacks[mode]
+        if stack[-1] is None:
+            self.queries += 1
+            stack[-1] = numpy.array(
+                full.glGetDoublev( MATRIX_QUERIES[mode] ), dtype='d'
+            ).reshape( (4,4) )
+        return stack[-1]
+    def getViewport( self ):
+        """Current viewport (read through from the GL if unknown)"""
+        if self.viewport is None:
+            self.queries += 1
+            self.viewport = tuple([int(x) for x in full.glGetIntegerv( full.GL_VIEWPORT )])
+        return self.viewport
+    def current( self ):
+        """The tracked stack for the current mode or None if it is not tracked"""
+        return self.stacks.get( self.currentMode() )
+    def loading( self ):
+        """Should changes be applied by loading the mirrored matrix?"""
+        return self.loadMatrix and self.listMode is None
+
+_getContext = _platform.GetCurrentContext
+_current = [None, None]
+def currentStack( ):
+    """Retrieve the MatrixStack for the current context (creating it if necessary)"""
+    context = _getContext()
+    if context and context == _current[0]:
+        return _current[1]
+    stack = contextdata.getValue( _STACK_KEY, context=context )
+    if stack is None:
+        stack = MatrixStack()
+        contextdata.setValue( _STACK_KEY, stack, context=context )
+    _current[:] = [context, stack]
+    return stack
+
+class mirroredProjection( object ):
+    """Context manager using the mirror for the GLU projection helpers in its block
+
+    Sets projection on the current context's MatrixStack, restoring
+    the previous setting on exit.
+    """
+    def __enter__( self ):
+        self.state = currentStack()
+        self.previous = self.state.__dict__.get( 'projection' )
+        self.state.projection = True
+        return self.state
+    def __exit__( self, *args ):
+        if self.previous is None:
+            del self.state.projection
+        else:
+            self.state.projection = self.previous
+
+def invalidate( ):
+    """Forget the mirrored matrices of the current context, e.g. after foreign code has run"""
+    currentStack().invalidate()
+
+def getMatrix( mode=None ):
+    """Current matrix of the current context without a glGet (if it is known)
+
+    mode -- GL_MODELVIEW or GL_PROJECTION, default the current matrix mode
+
+    returns a copy of the 4x4 matrix in glGetDoublev layout
+    """
+    return currentStack().getMatrix( mode ).copy()
+def getViewport( ):
+    """Current viewport (x,y,width,height) of the current context without a glGet (if it is known)"""
+    return currentStack().getViewport()
+
+def _base( name ):
+    """The GL/GLU implementation to forward to (state-cache aware)"""
+    statecache = sys.modules.get( 'OpenGL.GL.statecache' )
+    if statecache is not None and name in statecache.__all__:
+        return getattr( statecache, name )
+    if name.startswith( 'glu' ):
+        return getattr( sys.modules['OpenGL.GLU'], name )
+    return getattr( full, name )
+
+def _transform( name, builder, doc ):
+    """Produce a mirroring version of a matrix-multiplying entry point
+
+    builder -- produces the 4x4 matrix (glGetDoublev layout) which
+        the current matrix is multiplied by from the call's arguments
+    """
+    def function( *args ):
+        state = currentStack()
+        stack = state.current()
+        if stack is None or state.listMode == full.GL_COMPILE:
+            return _base( name )( *args )
+        if state.loading():
+            stack[-1] = numpy.dot( builder( *args ), state.getMatrix() )
+            return full.glLoadMatrixd( stack[-1] )
+        result = _base( name )( *args )
+        if stack[-1] is not None:
+            stack[-1] = numpy.dot( builder( *args ), stack[-1] )
+        return result
+    function.__name__ = name
+    function.__doc__ = doc
+    return function
+
+def _multMatrix( matrix ):
+    return numpy.array( matrix, dtype='d' ).reshape( (4,4) )
+glMultMatrixf = _transform( 'glMultMatrixf', _multMatrix, """Mirroring glMultMatrixf""" )
+glMultMatrixd = _transform( 'glMultMatrixd', _multMatrix, """Mirroring glMultMatrixd""" )
+glTranslatef = _transform( 'glTranslatef', translation, """Mirroring glTranslatef""" )
+glTranslated = _transform( 'glTranslated', translation, """Mirroring glTranslated""" )
+glRotatef = _transform( 'glRotatef', rotation, """Mirroring glRotatef""" )
+glRotated = _transform( 'glRotated', rotation, """Mirroring glRotated""" )
+glScalef = _transform( 'glScalef', scaling, """Mirroring glScalef""" )
+glScaled = _transform( 'glScaled', scaling, """Mirroring glScaled""" )
+glOrtho = _transform( 'glOrtho', ortho, """Mirroring glOrtho""" )
+glFrustum = _transform( 'glFrustum', frustum, """Mirroring glFrustum""" )
+gluOrtho2D = _transform( 'gluOrtho2D', lambda left,right,bottom,top: ortho( left,right,bottom,top,-1.0,1.0 ), """Mirroring gluOrtho2D""" )
+gluPerspective = _transform( 'gluPerspective', perspective, """Mirroring gluPerspective""" )
+gluLookAt = _transform( 'gluLookAt', lookAt, """Mirroring gluLookAt""" )
+
+def _load( name, builder, doc ):
+    """Produce a mirroring version of a matrix-replacing entry point"""
+    def function( *args ):
+        state = currentStack()
+        stack = state.current()
+        if stack is None or state.listMode == full.GL_COMPILE:
+            return _base( name )( *args )
+        stack[-1] = builder( *args )
+        if state.loading():
+            return full.glLoadMatrixd( stack[-1] )
+        return _base( name )( *args )
+    function.__name__ = name
+    function.__doc__ = doc
+    return function
+glLoadIdentity = _load( 'glLoadIdentity', identity, """Mirroring glLoadIdentity""" )
+glLoadMatrixf = _load( 'glLoadMatrixf', _multMatrix, """Mirroring glLoadMatrixf""" )
+glLoadMatrixd = _load( 'glLoadMatrixd', _multMatrix, """Mirroring glLoadMatrixd""" )
+
+def glPushMatrix( ):
+    """Mirroring glPushMatrix (not sent to the GL with MatrixStack.loadMatrix)"""
+    state = currentStack()
+    stack = state.current()
+    if stack is None or state.listMode == full.GL_COMPILE:
+        return full.glPushMatrix()
+    if state.loading():
+        # the GL does not see the push, so the entry must be resolved now
+        stack.append( state.getMatrix() )
+        return None
+    stack.append( stack[-1] )
+    return full.glPushMatrix()
+def glPopMatrix( ):
+    """Mirroring glPopMatrix (not sent to the GL with MatrixStack.loadMatrix)"""
+    state = currentStack()
+    stack = state.current()
+    if stack is None or state.listMode == full.GL_COMPILE:
+        return full.glPopMatrix()
+    if len( stack ) == 1:
+        # pushed before we were tracking, the GL holds the matrix
+        stack[-1] = None
+        return full.glPopMatrix()
+    stack.pop()
+    if state.loading():
+        return full.glLoadMatrixd( state.getMatrix() )
+    return full.glPopMatrix()
+
+def glMatrixMode( mode ):
+    """Mirroring glMatrixMode"""
+    state = currentStack()
+    result = _base( 'glMatrixMode' )( mode )
+    if state.listMode != full.GL_COMPILE:
+        state.mode = int( mode )
+    return result
+def glViewport( x, y, width, height ):
+    """Mirroring glViewport"""
+    state = currentStack()
+    result = _base( 'glViewport' )( x, y, width, height )
+    if state.listMode != full.GL_COMPILE:
+        state.viewport = (int(x),int(y),int(width),int(height))
+    return result
+
+def _forgetting( name ):
+    """Produce a version of name which forgets the mirrored state"""
+    def function( *args ):
+        currentStack().invalidate()
+        return _base( name )( *args )
+    function.__name__ = name
+    function.__doc__ = """%s, forgetting the mirrored matrices"""%( name, )
+    return function
+glPopAttrib = _forgetting( 'glPopAttrib' )
+glCallList = _forgetting( 'glCallList' )
+glCallLists = _forgetting( 'glCallLists' )
+
+def glNewList( list, mode ):
+    """Start a display list, not mirroring matrix calls while compiling"""
+    result = _base( 'glNewList' )( list, mode )
+    currentStack().listMode = mode
+    return result
+def glEndList( ):
+    """Finish a display list, resuming mirroring"""
+    currentStack().listMode = None
+    return _base( 'glEndList' )()
+
+def projectionInputs( model=None, proj=None, view=None ):
+    """Fill in the unspecified matrices/viewport for the GLU projection helpers
+
+    returns None if the current context has not switched on
+    MatrixStack.projection
+    """
+    state = currentStack()
+    if not state.projection:
+        return None
+    if model is None:
+        model = state.getMatrix( full.GL_MODELVIEW )
+    if proj is None:
+        proj = state.getMatrix( full.GL_PROJECTION )
+    if view is None:
+        view = numpy.array( state.getViewport(), dtype='i' )
+    return model, proj, view
@@ -0,0 +1,306 @@
+"""Cached VBO meshes for the GLU quadrics and GLUT solids
+
+gluCylinder, gluSphere and the glutSolid*/glutWire* shapes tessellate
+their geometry again (in immediate mode) on every call, and code which
+creates a gluNewQuadric per call leaks the quadric as well.  This module
+builds the same shapes once as NumPy vertex, normal and index arrays,
+uploads them to VBOs and draws them with a single glDrawElements.
+Meshes are kept in a bounded (least-recently-used) per-context cache
+keyed on the shape's parameters:
+
+    from OpenGL.GLU import *
+    from OpenGL.GLUT import *
+    from OpenGL.GLU.meshes import *
+
+    gluCylinder( None, 4, 3.5, 15, 8, 1 ) # no quadric required
+    glutSolidSphere( 10, 16, 16 )
+
+The drop-in functions take the same arguments as the GLU/GLUT entry
+points they replace, and produce the same shapes (same orientation,
+outward-facing counter-clockwise polygons and smooth normals).
+
+Note:
+    The quadric argument of gluCylinder/gluSphere/gluDisk is accepted
+    for compatibility and ignored: draw style, normal style, orientation
+    and texture-coordinate generation set on a quadric are not honoured.
+
+Note:
+    Requires numpy and OpenGL 1.5 (or ARB_vertex_buffer_object).
+"""
+import ctypes
+from collections import OrderedDict
+import numpy
+from OpenGL import contextdata
+from OpenGL.arrays import vbo
+from OpenGL.GL.VERSION import GL_1_1 as full
+from OpenGL.raw.GL.VERSION import GL_1_1 as _simple
+from OpenGL.raw.GL.VERSION.GL_1_5 import (
+    glBindBuffer as _glBindBuffer, GL_ARRAY_BUFFER as _GL_ARRAY_BUFFER,
+    GL_ELEMENT_ARRAY_BUFFER as _GL_ELEMENT_ARRAY_BUFFER,
+)
+
+__all__ = [
+    'Mesh',
+    'MeshCache',
+    'meshCache',
+    'sphereMesh',
+    'wireSphereMesh',
+    'cylinderMesh',
+    'diskMesh',
+    'cubeMesh',
+    'torusMesh',
+    'gluSphere',
+    'gluCylinder',
+    'gluDisk',
+    'glutSolidSphere',
+    'glutWireSphere',
+    'glutSolidCube',
+    'glutSolidTorus',
+]
+
+# byte offsets into the bound buffers
+_START = ctypes.c_void_p( 0 )
+_NORMALS = ctypes.c_void_p( 12 )
+
+class Mesh( object ):
+    """Indexed mesh with interleaved position/normal data
+
+    Attributes:
+
+        mode -- primitive mode to draw the indices with (GL_TRIANGLES
+            or GL_LINES)
+        data -- (N,6) float32 array of x,y,z,nx,ny,nz rows
+        indices -- flat uint16 (or uint32 for large meshes) index array
+        buffers -- (vertex VBO, index VBO) once uploaded, otherwise None
+        names -- buffer names of the uploaded VBOs
+    """
+    buffers = names = None
+    def __init__( self, mode, vertices, normals, indices ):
+        self.mode = mode
+        self.data = numpy.ascontiguousarray(
+            numpy.hstack( (
+                numpy.reshape( vertices, (-1,3) ), numpy.reshape( normals, (-1,3) ),
+            ) ), dtype=numpy.float32
+        )
+        indexType = numpy.uint16 if len(self.data) <= 65536 else numpy.uint32
+        self.indices = numpy.ascontiguousarray( numpy.ravel( indices ), dtype=indexType )
+        self.count = len(self.indices)
+        self.indexType = (
+            full.GL_UNSIGNED_SHORT if indexType is numpy.uint16 else full.GL_UNSIGNED_INT
+        )
+    @property
+    def vertices( self ):
+        return self.data[:,:3]
+    @property
+    def normals( self ):
+        return self.data[:,3:]
+    def expanded( self ):
+        """Un-indexed (len(indices),6) copy of the data, for glDrawArrays"""
+        return self.data[self.indices]
+    def upload( self ):
+        """Create the VBOs holding the mesh in the current context"""
+        buffers = self.buffers = (
+            vbo.VBO( self.data, usage='GL_STATIC_DRAW' ),
+            vbo.VBO( self.indices, usage='GL_STATIC_DRAW', target='GL_ELEMENT_ARRAY_BUFFER' ),
+        )
+        for buffer in buffers:
+            buffer.bind()
+            buffer.unbind()
+        self.names = tuple([int(buffer) for buffer in buffers])
+        return buffers
+    def draw( self ):
+        """Draw the mesh (uploading it on first use) with glDrawElements"""
+        if self.buffers is None:
+            self.upload()
+        vertices,indices = self.names
+        # buffer bindings are part of the client vertex-array state, so
+        # popping it restores the caller's bindings as well as its arrays
+        _simple.glPushClientAttrib( full.GL_CLIENT_VERTEX_ARRAY_BIT )
+        try:
+            _glBindBuffer( _GL_ARRAY_BUFFER, vertices )
+            _glBindBuffer( _GL_ELEMENT_ARRAY_BUFFER, indices )
+            _simple.glEnableClientState( full.GL_VERTEX_ARRAY )
+            _simple.glEnableClientState( full.GL_NORMAL_ARRAY )
+            _simple.glVertexPointer( 3, full.GL_FLOAT, 24, _START )
+            _simple.glNormalPointer( full.GL_FLOAT, 24, _NORMALS )
+            _simple.glDrawElements( self.mode, self.count, self.indexType, _START )
+        finally:
+            _simple.glPopClientAttrib()
+    def delete( self ):
+        """Release the mesh's VBOs (requires the uploading context)"""
+        if self.buffers is not None:
+            for buffer in self.buffers:
+                buffer.delete()
+            self.buffers = self.names = None
+
+def _grid( rows, columns ):
+    """Triangle indices for a (rows+1,columns+1) vertex grid
+
+    The (i,j),(i+1,j),(i+1,j+1) triangle (and its partner) is
+    counter-clockwise when i increases to the "right" and j "up".
+    """
+    a = numpy.arange( rows*(columns+1) ).reshape( rows, columns+1 )[:,:-1]
+    b = a + 1
+    d = a + columns + 1
+    c = d + 1
+    return numpy.stack( (a,d,c,a,c,b), axis=-1 )
+
+def _ring( slices ):
+    theta = numpy.linspace( 0.0, 2*numpy.pi, slices+1 )
+    return numpy.cos( theta ), numpy.sin( theta )
+
+def _sphere( slices, stacks ):
+    """Unit sphere (z axis) as a (stacks+1,slices+1,3) grid, +z pole first"""
+    cos,sin = _ring( slices )
+    phi = numpy.linspace( 0.0, numpy.pi, stacks+1 )[:,numpy.newaxis]
+    return numpy.stack( (
+        numpy.sin( phi ) * cos,
+        numpy.sin( phi ) * sin,
+        numpy.repeat( numpy.cos( phi ), slices+1, axis=1 ),
+    ), axis=-1 )
+
+def sphereMesh( radius, slices, stacks ):
+    """Sphere centred on the origin with its poles on the z axis"""
+    unit = _sphere( slices, stacks )
+    return Mesh( full.GL_TRIANGLES, unit*radius, unit, _grid( stacks, slices ) )
+
+def wireSphereMesh( radius, slices, stacks ):
+    """Latitude/longitude lines of sphereMesh, as GL_LINES"""
+    unit = _sphere( slices, stacks )
+    grid = numpy.arange( (stacks+1)*(slices+1) ).reshape( stacks+1, slices+1 )
+    rings = numpy.stack( (grid[1:-1,:-1], grid[1:-1,1:]), axis=-1 )
+    meridians = numpy.stack( (grid[:-1,:-1], grid[1:,:-1]), axis=-1 )
+    return Mesh(
+        full.GL_LINES, unit*radius, unit,
+        numpy.concatenate( (rings.reshape(-1,2), meridians.reshape(-1,2)) ),
+    )
+
+def cylinderMesh( base, top, height, slices, stacks ):
+    """Open cone/cylinder along +z from z=0 (radius base) to z=height"""
+    cos,sin = _ring( slices )
+    z = numpy.linspace( 0.0, height, stacks+1 )[numpy.newaxis,:]
+    radius = base + (top - base) * numpy.linspace( 0.0, 1.0, stacks+1 )[numpy.newaxis,:]
+    cos,sin = cos[:,numpy.newaxis], sin[:,numpy.newaxis]
+    vertices = numpy.stack( numpy.broadcast_arrays( radius*cos, radius*sin, z ), axis=-1 )
+    slope = (base - top)/float(height) if height else 0.0
+    normals = numpy.stack( numpy.broadcast_arrays( cos, sin, slope*numpy.ones_like( z ) ), axis=-1 )
+    normals /= numpy.sqrt( (normals**2).sum( axis=-1 ) )[...,numpy.newaxis]
+    return Mesh( full.GL_TRIANGLES, vertices, normals, _grid( slices, stacks ) )
+
+def diskMesh( inner, outer, slices, loops ):
+    """Flat (annular) disk in the z=0 plane facing +z"""
+    cos,sin = _ring( slices )
+    radius = numpy.linspace( inner, outer, loops+1 )[:,numpy.newaxis]
+    vertices = numpy.stack( numpy.broadcast_arrays( radius*cos, radius*sin, 0.0 ), axis=-1 )
+    normals = numpy.zeros_like( vertices )
+    normals[...,2] = 1.0
+    return Mesh( full.GL_TRIANGLES, vertices, normals, _grid( loops, slices ) )
+
+def cubeMesh( size ):
+    """Axis-aligned cube of edge size centred on the origin"""
+    vertices = []
+    normals = []
+    for axis in range( 3 ):
+        for sign in (-1.0,1.0):
+            normal = [0.0,0.0,0.0]
+            normal[axis] = sign
+            u,v = [(axis+1)%3,(axis+2)%3][::int(sign)]
+            for cu,cv in ((-.5,-.5),(.5,-.5),(.5,.5),(-.5,.5)):
+                corner = [0.0,0.0,0.0]
+                corner[axis] = .5*sign
+                corner[u] = cu
+                corner[v] = cv
+                vertices.append( corner )
+                normals.append( normal )
+    faces = numpy.arange( 0, 24, 4 )[:,numpy.newaxis]
+    indices = faces + numpy.array( [0,1,2,0,2,3] )
+    return Mesh( full.GL_TRIANGLES, numpy.array( vertices )*size, normals, indices )
+
+def torusMesh( inner, outer, sides, rings ):
+    """Torus around the z axis, tube radius inner, centre-line radius outer"""
+    ringCos,ringSin = _ring( rings )
+    sideCos,sideSin = _ring( sides )
+    ringCos,ringSin = ringCos[:,numpy.newaxis],ringSin[:,numpy.newaxis]
+    normals = numpy.stack( numpy.broadcast_arrays(
+        sideCos*ringCos, sideCos*ringSin, sideSin,
+    ), axis=-1 )
+    centres = numpy.stack( numpy.broadcast_arrays(
+        outer*ringCos, outer*ringSin, 0.0*sideSin,
+    ), axis=-1 )
+    return Mesh( full.GL_TRIANGLES, centres + inner*normals, normals, _grid( rings, sides ) )
+
+BUILDERS = {
+    'sphere': sphereMesh,
+    'wireSphere': wireSphereMesh,
+    'cylinder': cylinderMesh,
+    'disk': diskMesh,
+    'cube': cubeMesh,
+    'torus': torusMesh,
+}
+
+class MeshCache( object ):
+    """Least-recently-used cache of Meshes keyed on (shape,parameters)
+
+    Attributes:
+
+        maxSize -- number of meshes kept, the least recently drawn mesh
+            is deleted (VBOs included) when a new one would exceed this
+        meshes -- OrderedDict of key to Mesh, most recently used last
+        hits, misses -- lookup statistics
+    """
+    hits = misses = 0
+    def __init__( self, maxSize=64 ):
+        self.maxSize = maxSize
+        self.meshes = OrderedDict()
+    def get( self, shape, *parameters ):
+        """Retrieve (building if necessary) the mesh for shape(*parameters)"""
+        key = (shape,)+parameters
+        meshes = self.meshes
+        mesh = meshes.get( key )
+        if mesh is None:
+            self.misses += 1
+            mesh = meshes[key] = BUILDERS[shape]( *parameters )
+            while len(meshes) > self.maxSize:
+                meshes.popitem( last=False )[1].delete()
+        else:
+            self.hits += 1
+            meshes.move_to_end( key )
+        return mesh
+    def clear( self ):
+        """Delete all cached meshes (requires the owning context)"""
+        while self.meshes:
+            self.meshes.popitem()[1].delete()
+
+def meshCache( context=None ):
+    """Retrieve the MeshCache for the (current) context"""
+    cache = contextdata.getValue( 'OpenGL.GLU.meshes', context=context )
+    if cache is None:
+        cache = MeshCache()
+        contextdata.setValue( 'OpenGL.GLU.meshes', cache, context=context )
+    return cache
+
+def gluSphere( quadric, radius, slices, stacks ):
+    """Cached-mesh gluSphere (quadric is ignored, may be None)"""
+    meshCache().get( 'sphere', float(radius), int(slices), int(stacks) ).draw()
+def gluCylinder( quadric, base, top, height, slices, stacks ):
+    """Cached-mesh gluCylinder (quadric is ignored, may be None)"""
+    meshCache().get(
+        'cylinder', float(base), float(top), float(height), int(slices), int(stacks)
+    ).draw()
+def gluDisk( quadric, inner, outer, slices, loops ):
+    """Cached-mesh gluDisk (quadric is ignored, may be None)"""
+    meshCache().get( 'disk', float(inner), float(outer), int(slices), int(loops) ).draw()
+def glutSolidSphere( radius, slices, stacks ):
+    """Cached-mesh glutSolidSphere"""
+    meshCache().get( 'sphere', float(radius), int(slices), int(stacks) ).draw()
+def glutWireSphere( radius, slices, stacks ):
+    """Cached-mesh glutWireSphere"""
+    meshCache().get( 'wireSphere', float(radius), int(slices), int(stacks) ).draw()
+def glutSolidCube( size ):
+    """Cached-mesh glutSolidCube"""
+    meshCache().get( 'cube', float(size) ).draw()
+def glutSolidTorus( innerRadius, outerRadius, sides, rings ):
+    """Cached-mesh glutSolidTorus"""
+    meshCache().get(
+        'torus', float(innerRadius), float(outerRadius), int(sides), int(rings)
+    ).draw()
@@ -3,8 +3,29 @@ from OpenGL.raw import GLU as _simple
 from OpenGL import GL
 from OpenGL.lazywrapper import lazy as _lazy
 import ctypes 
+import sys
 POINTER = ctypes.POINTER
 
+def _inputs( model, proj, view ):
+    """Fill in the matrices and viewport the caller did not provide
+
+    Uses the mirror in OpenGL.GLU.matrixstack (no glGet calls) when that
+    module is loaded and its use has been switched on (see 
+    MatrixStack.projection), otherwise queries the GL.
+    """
+    matrixstack = sys.modules.get( 'OpenGL.GLU.matrixstack' )
+    if matrixstack is not None:
+        inputs = matrixstack.projectionInputs( model, proj, view )
+        if inputs is not None:
+            return inputs
+    if model is None:
+        model = GL.glGetDoublev( GL.GL_MODELVIEW_MATRIX )
+    if proj is None:
+        proj = GL.glGetDoublev( GL.GL_PROJECTION_MATRIX )
+    if view is None:
+        view = GL.glGetIntegerv( GL.GL_VIEWPORT )
+    return model, proj, view
+
 @_lazy( _simple.gluProject )
 def gluProject( baseFunction, objX, objY, objZ, model=None, proj=None, view=None ):
     """Convenience wrapper for gluProject
@@ -14,12 +35,7 @@ def gluProject( baseFunction, objX, objY, objZ, model=None, proj=None, view=None
     
     returns (winX,winY,winZ) doubles
     """
-    if model is None:
-        model = GL.glGetDoublev( GL.GL_MODELVIEW_MATRIX )
-    if proj is None:
-        proj = GL.glGetDoublev( GL.GL_PROJECTION_MATRIX )
-    if view is None:
-        view = GL.glGetIntegerv( GL.GL_VIEWPORT )
+    model,proj,view = _inputs( model, proj, view )
     winX = _simple.GLdouble( 0.0 )
     winY = _simple.GLdouble( 0.0 )
     winZ = _simple.GLdouble( 0.0 )
@@ -43,12 +59,7 @@ def gluUnProject( baseFunction, winX, winY, winZ, model=None, proj=None, view=No
     
     returns (objX,objY,objZ) doubles
     """
-    if model is None:
-        model = GL.glGetDoublev( GL.GL_MODELVIEW_MATRIX )
-    if proj is None:
-        proj = GL.glGetDoublev( GL.GL_PROJECTION_MATRIX )
-    if view is None:
-        view = GL.glGetIntegerv( GL.GL_VIEWPORT )
+    model,proj,view = _inputs( model, proj, view )
     objX = _simple.GLdouble( 0.0 )
     objY = _simple.GLdouble( 0.0 )
     objZ = _simple.GLdouble( 0.0 )
@@ -74,27 +85,97 @@ def gluUnProject4(
     
     returns (objX,objY,objZ) doubles
     """
-    if model is None:
-        model = GL.glGetDoublev( GL.GL_MODELVIEW_MATRIX )
-    if proj is None:
-        proj = GL.glGetDoublev( GL.GL_PROJECTION_MATRIX )
-    if view is None:
-        view = GL.glGetIntegerv( GL.GL_VIEWPORT )
+    model,proj,view = _inputs( model, proj, view )
     objX = _simple.GLdouble( 0.0 )
     objY = _simple.GLdouble( 0.0 )
     objZ = _simple.GLdouble( 0.0 )
     objW = _simple.GLdouble( 0.0 )
     result = baseFunction( 
-        winX,winY,winZ,
+        winX,winY,winZ,clipW,
         model,proj,view,
+        near,far,
         ctypes.byref(objX),ctypes.byref(objY),ctypes.byref(objZ),ctypes.byref(objW)
     )
     if not result:
         raise ValueError( """Projection failed!""" )
     return objX.value, objY.value, objZ.value, objW.value
 
+def gluProjectArray( points, model=None, proj=None, view=None ):
+    """Vectorised gluProject over an array of object-space points
+
+    points -- (N,3) array of object coordinates
+    model, proj, view -- as for gluProject, filled in the same way
+        if not provided
+
+    Performs the same (double precision) arithmetic as the GLU
+    implementation, but for all points in a single set of numpy
+    operations rather than a ctypes call per point.
+
+    raises ValueError if any point projects to w == 0 (where
+        gluProject would fail)
+
+    returns (N,3) double array of (winX,winY,winZ)
+    """
+    import numpy
+    model,proj,view = _inputs( model, proj, view )
+    points = numpy.asarray( points, dtype='d' ).reshape( (-1,3) )
+    model = numpy.asarray( model, dtype='d' ).reshape( (4,4) )
+    proj = numpy.asarray( proj, dtype='d' ).reshape( (4,4) )
+    view = numpy.asarray( view, dtype='d' ).reshape( (4,) )
+    homogeneous = numpy.empty( (len(points),4), dtype='d' )
+    homogeneous[:,:3] = points
+    homogeneous[:,3] = 1.0
+    # matrices are in glGetDoublev (column-major) layout, so row-vector
+    # products apply them in the GL's order
+    clip = numpy.dot( numpy.dot( homogeneous, model ), proj )
+    w = clip[:,3]
+    if not numpy.all( w ):
+        raise ValueError( """Projection failed!""" )
+    ndc = clip[:,:3] / w[:,numpy.newaxis] * 0.5 + 0.5
+    result = numpy.empty( (len(points),3), dtype='d' )
+    result[:,0] = ndc[:,0] * view[2] + view[0]
+    result[:,1] = ndc[:,1] * view[3] + view[1]
+    result[:,2] = ndc[:,2]
+    return result
+
+def gluUnProjectArray( points, model=None, proj=None, view=None ):
+    """Vectorised gluUnProject over an array of window-space points
+
+    points -- (N,3) array of window coordinates (winX,winY,winZ)
+    model, proj, view -- as for gluUnProject, filled in the same way
+        if not provided
+
+    raises ValueError if the combined matrix is singular or any point
+        unprojects to w == 0 (where gluUnProject would fail)
+
+    returns (N,3) double array of (objX,objY,objZ)
+    """
+    import numpy
+    model,proj,view = _inputs( model, proj, view )
+    points = numpy.asarray( points, dtype='d' ).reshape( (-1,3) )
+    model = numpy.asarray( model, dtype='d' ).reshape( (4,4) )
+    proj = numpy.asarray( proj, dtype='d' ).reshape( (4,4) )
+    view = numpy.asarray( view, dtype='d' ).reshape( (4,) )
+    try:
+        inverse = numpy.linalg.inv( numpy.dot( model, proj ) )
+    except numpy.linalg.LinAlgError:
+        raise ValueError( """Projection failed!""" )
+    ndc = numpy.empty( (len(points),4), dtype='d' )
+    ndc[:,0] = (points[:,0] - view[0]) / view[2]
+    ndc[:,1] = (points[:,1] - view[1]) / view[3]
+    ndc[:,2] = points[:,2]
+    ndc[:,:3] = ndc[:,:3] * 2 - 1
+    ndc[:,3] = 1.0
+    obj = numpy.dot( ndc, inverse )
+    w = obj[:,3]
+    if not numpy.all( w ):
+        raise ValueError( """Projection failed!""" )
+    return obj[:,:3] / w[:,numpy.newaxis]
+
 __all__ = (
     'gluProject',
     'gluUnProject',
     'gluUnProject4',
+    'gluProjectArray',
+    'gluUnProjectArray',
 )
@@ -0,0 +1,394 @@
+"""Texture-atlas rendering of the GLUT bitmap fonts
+
+glutBitmapCharacter issues one glBitmap per character, and every
+string needs its own glRasterPos (normally with the matrix stacks
+pushed, re-loaded and popped around it), so a heads-up display of a
+dozen strings costs hundreds of GL calls per frame.  This module
+rasterises a GLUT bitmap font (via glutBitmapCharacter itself, so the
+glyphs are pixel-identical) into a texture once per context, after which
+whole strings, or whole batches of strings, are drawn as textured quads
+with a single glDrawArrays per font:
+
+    from OpenGL.GLUT import GLUT_BITMAP_HELVETICA_18
+    from OpenGL.GLUT.atlas import TextBatch
+
+    batch = TextBatch()
+    batch.add( 10, 770, 'SCORE: 0', GLUT_BITMAP_HELVETICA_18, (1,1,1) )
+    batch.add( 10, 745, 'LIFE: 100', GLUT_BITMAP_HELVETICA_18, (.2,1,.2) )
+    batch.draw( 1000, 800 ) # one draw for both strings
+
+Positions are window coordinates of the baseline origin (i.e. what you
+would pass to glRasterPos2f under a gluOrtho2D(0,width,0,height) matching
+the viewport).  Each string carries its own colour; unlike glBitmap text
+the colour is not passed through the lighting equation, so it shows even
+if GL_LIGHTING is enabled.
+
+Note:
+    Building an atlas requires framebuffer objects (GL 3.0,
+    ARB_framebuffer_object or EXT_framebuffer_object).
+"""
+import ctypes
+from array import array
+from OpenGL import contextdata
+from OpenGL.GL.VERSION import GL_1_1 as full
+from OpenGL.raw.GL.VERSION import GL_1_1 as _simple
+from OpenGL.raw.GL.VERSION.GL_1_5 import (
+    glBindBuffer as _glBindBuffer, GL_ARRAY_BUFFER as _GL_ARRAY_BUFFER,
+)
+from OpenGL.raw.GL.VERSION.GL_2_0 import (
+    glUseProgram as _glUseProgram, GL_CURRENT_PROGRAM as _GL_CURRENT_PROGRAM,
+)
+from OpenGL.GL import framebufferobjects as _fbo
+from OpenGL.raw.GL.VERSION.GL_1_0 import glReadPixels as _glReadPixels
+from OpenGL.raw.GLUT import glutBitmapCharacter, glutBitmapWidth
+from OpenGL.GLUT.freeglut import glutBitmapHeight
+
+__all__ = [
+    'FontAtlas',
+    'TextBatch',
+    'fontAtlas',
+    'drawText',
+]
+
+# used for the glyph cell height if glutBitmapHeight is not available
+DEFAULT_HEIGHT = 32
+# floats per vertex: x,y, s,t, r,g,b,a
+VERTEX_SIZE = 8
+_STRIDE = VERTEX_SIZE * 4
+
+class FontAtlas( object ):
+    """Single texture holding every glyph of a GLUT bitmap font
+
+    Attributes:
+
+        font -- the GLUT font "constant" (e.g. GLUT_BITMAP_HELVETICA_18)
+        first, last -- range of character codes rasterised
+        texture -- texture name holding the glyph cells (0 until built)
+        size -- (width,height) of the texture in texels
+        glyphs -- map from character code to (advance,x,y) where x,y is
+            the texel offset of the glyph's cell in the texture
+        cell -- (padding,baseline,height) of a glyph cell, baseline is the
+            distance from the bottom of the cell to the glyph's origin
+        boxes -- map from character code to the inked box of the glyph,
+            (x0,y0,x1,y1) relative to the glyph origin followed by the
+            (s0,t0,s1,t1) texture coordinates of the box, None if blank
+        cacheSize -- maximum number of packed strings memoized by quads
+    """
+    texture = 0
+    size = (0,0)
+    PADDING = 2
+    WIDTH = 512
+    cacheSize = 512
+    def __init__( self, font, first=32, last=255 ):
+        self.font = font
+        self.first = first
+        self.last = last
+        self.glyphs = {}
+        self.boxes = {}
+        self.cache = {}
+    def layout( self ):
+        """Assign each glyph a cell, returning the texture (width,height)"""
+        font = self.font
+        height = (glutBitmapHeight and glutBitmapHeight( font )) or DEFAULT_HEIGHT
+        pad = self.PADDING
+        # glyph origin has the descent below it, which GLUT does not report,
+        # so leave room for a full glyph height on either side of the baseline
+        self.cell = (pad, pad + height, 2*height + 2*pad)
+        cellHeight = self.cell[2]
+        width = self.WIDTH
+        x = y = 0
+        glyphs = self.glyphs
+        glyphs.clear()
+        for code in range( self.first, self.last+1 ):
+            advance = glutBitmapWidth( font, code )
+            if advance <= 0:
+                continue
+            cellWidth = advance + 2*pad
+            if x + cellWidth > width:
+                x = 0
+                y += cellHeight
+            glyphs[code] = (advance,x,y)
+            x += cellWidth
+        total = 1
+        while total < y + cellHeight:
+            total *= 2
+        return (width,total)
+    def build( self ):
+        """Rasterise the font into a new texture in the current context"""
+        width,height = self.size = self.layout()
+        pad,baseline,cellHeight = self.cell
+        program = full.glGetIntegerv( _GL_CURRENT_PROGRAM ) if _glUseProgram else 0
+        framebuffer = full.glGetIntegerv( _fbo.GL_FRAMEBUFFER_BINDING )
+        _simple.glPushAttrib( full.GL_ALL_ATTRIB_BITS )
+        _simple.glPushClientAttrib( full.GL_CLIENT_PIXEL_STORE_BIT )
+        try:
+            texture = full.glGenTextures( 1 )
+            full.glBindTexture( full.GL_TEXTURE_2D, texture )
+            full.glTexParameteri( full.GL_TEXTURE_2D, full.GL_TEXTURE_MIN_FILTER, full.GL_NEAREST )
+            full.glTexParameteri( full.GL_TEXTURE_2D, full.GL_TEXTURE_MAG_FILTER, full.GL_NEAREST )
+            full.glTexParameteri( full.GL_TEXTURE_2D, full.GL_TEXTURE_WRAP_S, full.GL_CLAMP )
+            full.glTexParameteri( full.GL_TEXTURE_2D, full.GL_TEXTURE_WRAP_T, full.GL_CLAMP )
+            full.glTexImage2D(
+                full.GL_TEXTURE_2D, 0, full.GL_RGBA8, width, height, 0,
+                full.GL_RGBA, full.GL_UNSIGNED_BYTE, None
+            )
+            target = _fbo.glGenFramebuffers( 1 )
+            _fbo.glBindFramebuffer( _fbo.GL_FRAMEBUFFER, target )
+            try:
+                _fbo.glFramebufferTexture2D(
+                    _fbo.GL_FRAMEBUFFER, _fbo.GL_COLOR_ATTACHMENT0,
+                    full.GL_TEXTURE_2D, texture, 0
+                )
+                _fbo.checkFramebufferStatus()
+                if program:
+                    _glUseProgram( 0 )
+                for cap in (
+                    full.GL_LIGHTING, full.GL_DEPTH_TEST, full.GL_FOG,
+                    full.GL_TEXTURE_2D, full.GL_BLEND, full.GL_ALPHA_TEST,
+                    full.GL_STENCIL_TEST, full.GL_SCISSOR_TEST,
+                ):
+                    _simple.glDisable( cap )
+                _simple.glViewport( 0, 0, width, height )
+                _simple.glClearColor( 0, 0, 0, 0 )
+                _simple.glClear( full.GL_COLOR_BUFFER_BIT )
+                _simple.glColor4f( 1, 1, 1, 1 )
+                _matrices( width, height )
+                try:
+                    font = self.font
+                    for code,(advance,x,y) in self.glyphs.items():
+                        _simple.glRasterPos2i( x + pad, y + baseline )
+                        glutBitmapCharacter( font, code )
+                finally:
+                    _restoreMatrices()
+                _simple.glPixelStorei( full.GL_PACK_ALIGNMENT, 1 )
+                # read into our own buffer, the wrapped glReadPixels returns
+                # whatever the array output handler produces (bytes only if
+                # UNSIGNED_BYTE_IMAGES_AS_STRING is set)
+                pixels = ctypes.create_string_buffer( width*height )
+                _glReadPixels(
+                    0, 0, width, height, full.GL_ALPHA, full.GL_UNSIGNED_BYTE,
+                    pixels
+                )
+            finally:
+                _fbo.glBindFramebuffer( _fbo.GL_FRAMEBUFFER, framebuffer )
+                _fbo.glDeleteFramebuffers( 1, [target] )
+                if program:
+                    _glUseProgram( program )
+        finally:
+            _simple.glPopClientAttrib()
+            _simple.glPopAttrib()
+        self._trim( pixels.raw )
+        self.texture = texture
+        self.cache.clear()
+        return texture
+    def delete( self ):
+        """Release the atlas texture (requires the building context)"""
+        if self.texture:
+            full.glDeleteTextures( [self.texture] )
+            self.texture = 0
+            self.cache.clear()
+    def width( self, text ):
+        """Advance (in pixels) of text, as glutBitmapLength would report"""
+        if not self.glyphs:
+            self.layout()
+        glyphs = self.glyphs
+        return sum([
+            glyphs[code][0] for code in _codes( text ) if code in glyphs
+        ])
+    def quads( self, x, y, text, color ):
+        """Packed (x,y,s,t,r,g,b,a) quad vertices for text at x,y
+
+        Results are memoized per (x,y,text,color), as the same strings
+        tend to be drawn at the same place frame after frame.
+        """
+        key = (x,y,text,color)
+        packed = self.cache.get( key )
+        if packed is None:
+            if not self.texture:
+                self.build()
+            cache = self.cache
+            if len(cache) >= self.cacheSize:
+                cache.clear()
+            cache[key] = packed = self._pack( x, y, text, color )
+        return packed
+    def _pack( self, x, y, text, color ):
+        if len(color) == 3:
+            r,g,b = color
+            a = 1.0
+        else:
+            r,g,b,a = color
+        glyphs = self.glyphs
+        boxes = self.boxes
+        values = []
+        for code in _codes( text ):
+            glyph = glyphs.get( code )
+            if glyph is None:
+                continue
+            box = boxes[code]
+            if box is not None:
+                x0,y0,x1,y1,s0,t0,s1,t1 = box
+                left,right = x + x0, x + x1
+                bottom,top = y + y0, y + y1
+                values.extend((
+                    left,bottom,s0,t0,r,g,b,a,
+                    right,bottom,s1,t0,r,g,b,a,
+                    right,top,s1,t1,r,g,b,a,
+                    left,top,s0,t1,r,g,b,a,
+                ))
+            x += glyph[0]
+        return array( 'f', values )
+    def _trim( self, pixels ):
+        """Find the inked box of each glyph from the atlas' alpha values (bytes)
+
+        Only the inked texels are drawn, the cells themselves are mostly
+        empty (they have to allow for any descent/ascent) and drawing them
+        whole would multiply the fill cost.
+        """
+        width,height = self.size
+        pad,baseline,cellHeight = self.cell
+        boxes = self.boxes
+        boxes.clear()
+        for code,(advance,u,v) in self.glyphs.items():
+            cellWidth = advance + 2*pad
+            rows = [
+                pixels[offset:offset+cellWidth]
+                for offset in range( v*width + u, (v+cellHeight)*width + u, width )
+            ]
+            inked = [i for (i,row) in enumerate( rows ) if row.strip( b'\0' )]
+            if not inked:
+                boxes[code] = None
+                continue
+            left = min([len(rows[i]) - len(rows[i].lstrip( b'\0' )) for i in inked])
+            right = max([len(rows[i].rstrip( b'\0' )) for i in inked])
+            bottom,top = inked[0],inked[-1]+1
+            # offsets from the glyph origin, texture coordinates of the box
+            boxes[code] = (
+                left-pad, bottom-baseline, right-pad, top-baseline,
+                (u+left)/float(width), (v+bottom)/float(height),
+                (u+right)/float(width), (v+top)/float(height),
+            )
+
+def _codes( text ):
+    if isinstance( text, bytes ):
+        return bytearray( text )
+    return [ord(c) for c in text]
+
+def _matrices( width, height ):
+    """Push both matrix stacks, setting up a window-coordinate ortho"""
+    _simple.glMatrixMode( full.GL_PROJECTION )
+    _simple.glPushMatrix()
+    _simple.glLoadIdentity()
+    _simple.glOrtho( 0, width, 0, height, -1, 1 )
+    _simple.glMatrixMode( full.GL_MODELVIEW )
+    _simple.glPushMatrix()
+    _simple.glLoadIdentity()
+def _restoreMatrices():
+    _simple.glPopMatrix()
+    _simple.glMatrixMode( full.GL_PROJECTION )
+    _simple.glPopMatrix()
+    _simple.glMatrixMode( full.GL_MODELVIEW )
+
+def _fontKey( font ):
+    """Hashable key for a GLUT font "constant" (ctypes pointers are not)"""
+    return getattr( font, 'value', font )
+
+def fontAtlas( font ):
+    """Retrieve the (lazily built) FontAtlas for font in the current context"""
+    key = ('OpenGL.GLUT.atlas', _fontKey( font ))
+    atlas = contextdata.getValue( key )
+    if atlas is None:
+        atlas = FontAtlas( font )
+        contextdata.setValue( key, atlas )
+    return atlas
+
+class TextBatch( object ):
+    """Set of strings to be drawn together, one glDrawArrays per font
+
+    Attributes:
+
+        pending -- map from font key to list of FontAtlas instance and the
+            packed vertex arrays of the strings added for that font
+        buffer -- reusable array('f') the pending strings are joined into
+        drawCount -- number of glDrawArrays calls issued (statistics)
+    """
+    drawCount = 0
+    def __init__( self ):
+        self.pending = {}
+        self.buffer = array( 'f' )
+    def add( self, x, y, text, font, color=(1.0,1.0,1.0,1.0) ):
+        """Queue text with its baseline origin at window coordinates x,y"""
+        key = _fontKey( font )
+        record = self.pending.get( key )
+        if record is None:
+            self.pending[key] = record = [fontAtlas( font )]
+        record.append( record[0].quads( x, y, text, tuple(color) ) )
+    def clear( self ):
+        """Discard all pending strings"""
+        self.pending.clear()
+    def draw( self, width=None, height=None ):
+        """Draw (and clear) all pending strings
+
+        width, height -- size of the window-coordinate space, defaults
+            to the size of the current viewport
+        """
+        if not self.pending:
+            return
+        if width is None or height is None:
+            width,height = [int(x) for x in full.glGetIntegerv( full.GL_VIEWPORT )][2:]
+        program = full.glGetIntegerv( _GL_CURRENT_PROGRAM ) if _glUseProgram else 0
+        buffer = self.buffer
+        _simple.glPushAttrib(
+            full.GL_ENABLE_BIT|full.GL_TEXTURE_BIT|full.GL_COLOR_BUFFER_BIT|full.GL_CURRENT_BIT|
+            full.GL_TRANSFORM_BIT
+        )
+        _simple.glPushClientAttrib( full.GL_CLIENT_VERTEX_ARRAY_BIT )
+        try:
+            if program:
+                _glUseProgram( 0 )
+            for cap in (
+                full.GL_LIGHTING, full.GL_DEPTH_TEST, full.GL_FOG,
+                full.GL_CULL_FACE,
+            ):
+                _simple.glDisable( cap )
+            _simple.glEnable( full.GL_TEXTURE_2D )
+            _simple.glEnable( full.GL_BLEND )
+            _simple.glBlendFunc( full.GL_SRC_ALPHA, full.GL_ONE_MINUS_SRC_ALPHA )
+            _simple.glEnable( full.GL_ALPHA_TEST )
+            _simple.glAlphaFunc( full.GL_GREATER, 0.0 )
+            _simple.glTexEnvi( full.GL_TEXTURE_ENV, full.GL_TEXTURE_ENV_MODE, full.GL_MODULATE )
+            if _glBindBuffer:
+                _glBindBuffer( _GL_ARRAY_BUFFER, 0 )
+            _simple.glEnableClientState( full.GL_VERTEX_ARRAY )
+            _simple.glEnableClientState( full.GL_TEXTURE_COORD_ARRAY )
+            _simple.glEnableClientState( full.GL_COLOR_ARRAY )
+            _matrices( width, height )
+            try:
+                for record in self.pending.values():
+                    atlas = record[0]
+                    del buffer[:]
+                    for packed in record[1:]:
+                        buffer.extend( packed )
+                    count = len(buffer)//VERTEX_SIZE
+                    if not count:
+                        continue
+                    base = buffer.buffer_info()[0]
+                    _simple.glBindTexture( full.GL_TEXTURE_2D, atlas.texture )
+                    _simple.glVertexPointer( 2, full.GL_FLOAT, _STRIDE, ctypes.c_void_p( base ) )
+                    _simple.glTexCoordPointer( 2, full.GL_FLOAT, _STRIDE, ctypes.c_void_p( base + 8 ) )
+                    _simple.glColorPointer( 4, full.GL_FLOAT, _STRIDE, ctypes.c_void_p( base + 16 ) )
+                    full.glDrawArrays( full.GL_QUADS, 0, count )
+                    self.drawCount += 1
+            finally:
+                _restoreMatrices()
+        finally:
+            _simple.glPopClientAttrib()
+            _simple.glPopAttrib()
+            if program:
+                _glUseProgram( program )
+        self.pending.clear()
+
+def drawText( x, y, text, font, color=(1.0,1.0,1.0,1.0), width=None, height=None ):
+    """Draw a single string with one glDrawArrays (see TextBatch.add/draw)"""
+    batch = TextBatch()
+    batch.add( x, y, text, font, color )
+    batch.draw( width, height )
@@ -350,3 +350,21 @@ def glutDestroyWindow( window ):
         _log.error( """Error attempting to clean up context data for GLUT window %s: %s""", window, result )
     return _base_glutDestroyWindow( window )
 glutDestroyWindow.wrappedOperation = _simple.glutDestroyWindow
+
+if error.DEFERRED_CHECKING is not None:
+    from OpenGL.lazywrapper import lazy as _lazy
+    @_lazy( _simple.glutSwapBuffers )
+    def glutSwapBuffers( baseFunction ):
+        """Swap buffers, first checking for errors deferred during the frame"""
+        error.checkpoint()
+        return baseFunction()
+
+if error.DEBUG_OUTPUT is not None:
+    _base_glutCreateWindow = globals().get( 'glutCreateWindow', _simple.glutCreateWindow )
+    def glutCreateWindow( title ):
+        """Create window with given title, installing the GL debug message callback"""
+        from OpenGL.GL import debugmessages
+        window = _base_glutCreateWindow( title )
+        debugmessages.installDebugCallback()
+        return window
+    glutCreateWindow.wrappedOperation = _simple.glutCreateWindow
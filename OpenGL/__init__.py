@@ -33,6 +33,35 @@ import occurs the flags should no longer be changed.
         i.e. where you are explicitly checking for errors
         everywhere they can occur in your code.
 
+        Can also be set to one of the following strings (or via
+        the PYOPENGL_ERROR_CHECKING environment variable) to defer
+        the glGetError round-trip to explicit checkpoints:
+
+            'deferred' -- only poll for errors when glutSwapBuffers
+                is called or the application calls
+                OpenGL.error.checkpoint()
+
+            'every:N' -- as 'deferred', but also poll after every N
+                error-checked calls
+
+        In the deferred modes a GLError raised at a checkpoint
+        reports the range of calls made since the last checkpoint
+        (callRange) rather than the exact failing call, re-run
+        with ERROR_CHECKING=True to pin-point the failing call.
+
+        Drivers supporting KHR_debug (or ARB_debug_output) can
+        report errors without any glGetError round-trips:
+
+            'debug' -- install a glDebugMessageCallback when the
+                context is created (glutCreateWindow, or call
+                OpenGL.GL.debugmessages.installDebugCallback())
+                which logs messages to the OpenGL.errors logger,
+                GL entry points do no per-call error checking
+
+            'debug:sync' -- as 'debug', but with synchronous debug
+                output, so that GL_DEBUG_TYPE_ERROR messages raise
+                GLError from the offending call
+
         Default: True
 
     ERROR_LOGGING -- If True, then wrap array-handler
@@ -164,6 +193,47 @@ import occurs the flags should no longer be changed.
         operations.
 
         Default: True
+
+    GENERATED_WRAPPERS -- if True (and OpenGL_accelerate is not in
+        use) wrapped entry points get a __call__ compiled from
+        generated straight-line Python source specialised to their
+        argument-converter layout, rather than the generic closures
+        which build each argument tuple with a generator.
+
+        Default: True
+
+    LAZY_IMPORTS -- if True, OpenGL.GL and OpenGL.GLES2 only import
+        the (VERSION) modules which provide a name when that name
+        is first accessed (via a PEP 562 module __getattr__), rather
+        than importing every core version at import time.  This
+        cuts start-up time and memory use for applications which
+        use "from OpenGL import GL" and only touch a small part of
+        the API, "from OpenGL.GL import *" still works, but
+        necessarily imports everything.
+
+        Default: False
+
+    FRAME_PROFILING -- if True, every entry point constructed by the
+        platform (GL, GLU, GLUT...) is wrapped to count its calls for
+        OpenGL.profiler, which reports GL calls per frame and the most
+        called functions alongside its per-phase frame timings.  Must
+        be set (normally via PYOPENGL_FRAME_PROFILING=1) before the
+        API modules are imported, functions constructed earlier are
+        not counted.
+
+        Default: False
+
+    COPY_STATS -- if True, the array format handlers (lists, numpy,
+        numbers, buffers) report every implicit conversion/copy of
+        an argument to OpenGL.arrays.copystats, which tallies them
+        (and the bytes copied) by GL entry point and calling line,
+        STATS.top() then lists the worst offenders per frame.  This
+        is the non-fatal counterpart of ERROR_ON_COPY for finding
+        copies in a running application, it must be set (normally
+        via PYOPENGL_COPY_STATS=1) before the array handlers are
+        imported and slows every conversion down.
+
+        Default: False
     
     MODULE_ANNOTATIONS -- if True, attempt to annotate alternates() and 
         constants to track in which module they are defined (only useful 
@@ -182,18 +252,22 @@ from OpenGL.version import __version__
 import os
 
 
-def environ_key(name, default):
+def environ_key(name, default, modes=()):
     composed = "PYOPENGL_%s" % name.upper()
     if composed in os.environ:
         value = os.environ[composed]
         if value.lower() in ("1", "true"):
             return True
+        elif value.lower().split(":")[0] in modes:
+            return value.lower()
         else:
             return False
     return os.environ.get(composed, default)
 
 
-ERROR_CHECKING = environ_key("ERROR_CHECKING", True)
+ERROR_CHECKING = environ_key(
+    "ERROR_CHECKING", True, modes=("deferred", "every", "debug")
+)
 ERROR_LOGGING = environ_key("ERROR_LOGGING", False)
 ERROR_ON_COPY = environ_key("ERROR_ON_COPY", False)
 ARRAY_SIZE_CHECKING = environ_key("ARRAY_SIZE_CHECKING", True)
@@ -209,6 +283,10 @@ ALLOW_NUMPY_SCALARS = environ_key("ALLOW_NUMPY_SCALARS", False)
 UNSIGNED_BYTE_IMAGES_AS_STRING = environ_key("UNSIGNED_BYTE_IMAGES_AS_STRING", True)
 MODULE_ANNOTATIONS = False
 TYPE_ANNOTATIONS = False
+GENERATED_WRAPPERS = environ_key("GENERATED_WRAPPERS", True)
+LAZY_IMPORTS = environ_key("LAZY_IMPORTS", False)
+FRAME_PROFILING = environ_key("FRAME_PROFILING", False)
+COPY_STATS = environ_key("COPY_STATS", False)
 
 
 # Declarations of plugins provided by PyOpenGL itself
@@ -16,4 +16,8 @@ from OpenGL import (
     UNSIGNED_BYTE_IMAGES_AS_STRING,
     MODULE_ANNOTATIONS,
     TYPE_ANNOTATIONS,
+    GENERATED_WRAPPERS,
+    LAZY_IMPORTS,
+    FRAME_PROFILING,
+    COPY_STATS,
 )
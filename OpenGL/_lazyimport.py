@@ -0,0 +1,188 @@
+"""PEP 562 lazy loading of package namespaces (OpenGL.LAZY_IMPORTS)
+
+With OpenGL.LAZY_IMPORTS set, OpenGL.GL and OpenGL.GLES2 do not import
+their VERSION modules (and thereby the thousands of raw constants and
+entry points they declare) at import time.  Instead a module-level
+__getattr__ imports the module providing a name on first access and
+caches the value in the package namespace.  The map from name to
+providing module is precomputed (the package's _lazyindex module), so
+__all__ (and thus import *) matches the eager namespace.
+
+The vendor extension packages (OpenGL.GL.ARB and friends) always get a
+__getattr__ which imports the extension module on attribute access, so
+that e.g. OpenGL.GL.ARB.imaging works without an explicit import.
+
+To regenerate the indices after changing the eager imports run (with
+PYOPENGL_LAZY_IMPORTS unset):
+
+    python -m OpenGL._lazyimport
+"""
+import importlib, os, sys
+
+# package: ordered modules star-imported by the package's eager __init__
+EAGER_SOURCES = {
+    'OpenGL.GL': [
+        'OpenGL.GL.VERSION.GL_1_1',
+        'OpenGL.GL.pointers',
+        'OpenGL.GL.images',
+        'OpenGL.GL.exceptional',
+        'OpenGL.GL.glget',
+    ] + [
+        'OpenGL.GL.VERSION.GL_%s'%( version, )
+        for version in (
+            '1_2','1_3','1_4','1_5','2_0','2_1','3_0','3_1','3_2','3_3',
+            '4_0','4_1','4_2','4_3','4_4','4_5','4_6',
+        )
+    ] + [
+        'OpenGL.error',
+    ],
+    'OpenGL.GLES2': [
+        'OpenGL.raw.GLES2._types',
+        'OpenGL.GLES2.VERSION.GLES2_2_0',
+    ],
+}
+
+def loadIndex( sources ):
+    """Convert generated (module, names) pairs into a {name: module} map"""
+    index = {}
+    for module,names in sources:
+        for name in names.split():
+            index[name] = module
+    return index
+
+def lazyNamespace( namespace, sources, aliases=None, submodules=() ):
+    """Install lazy __getattr__, __dir__ and __all__ into a package namespace
+
+    namespace -- the package's globals()
+    sources -- sequence of (module name, space-separated names) pairs
+        from the package's generated _lazyindex (SOURCES)
+    aliases -- {alias: name} for names which are aliases of other names
+        in the package (e.g. glRotate for glRotated)
+    submodules -- names of the package's sub-packages/modules which the
+        eager namespace exposes (_lazyindex.SUBMODULES)
+    """
+    index = loadIndex( sources )
+    aliases = aliases or {}
+    package = namespace['__name__']
+    def __getattr__( name ):
+        if name in aliases:
+            value = getattr( sys.modules[package], aliases[name] )
+        elif name in index:
+            value = getattr( importlib.import_module( index[name] ), name )
+        elif name in submodules:
+            value = importlib.import_module( '%s.%s'%( package, name ))
+        else:
+            raise AttributeError( """module %r has no attribute %r"""%( package, name ))
+        namespace[name] = value
+        return value
+    def __dir__( ):
+        return sorted( set( namespace ) | set( index ) | set( aliases ) | set( submodules ))
+    namespace['__getattr__'] = __getattr__
+    namespace['__dir__'] = __dir__
+    namespace['__all__'] = sorted( set( index ) | set( aliases ) | set( submodules ))
+    return namespace
+
+def extensionPackage( namespace ):
+    """Install a submodule-importing __getattr__ and __dir__ into an extension package
+
+    namespace -- the package's globals(), the package's __path__ is
+        scanned (once, on first use) for the available extension modules
+    """
+    package = namespace['__name__']
+    found = []
+    def available( ):
+        if not found:
+            for directory in namespace['__path__']:
+                for filename in os.listdir( directory ):
+                    name,ext = os.path.splitext( filename )
+                    if ext == '.py' and name != '__init__':
+                        found.append( name )
+            found.sort()
+        return found
+    def __getattr__( name ):
+        if name.startswith( '_' ) or name not in available():
+            raise AttributeError( """module %r has no attribute %r"""%( package, name ))
+        return importlib.import_module( '%s.%s'%( package, name ))
+    def __dir__( ):
+        return sorted( set( namespace ) | set( available() ))
+    namespace['__getattr__'] = __getattr__
+    namespace['__dir__'] = __dir__
+    return namespace
+
+def _starNames( module ):
+    """Names that "from module import *" would bind"""
+    names = getattr( module, '__all__', None )
+    if names is None:
+        names = [name for name in vars( module ) if not name.startswith( '_' )]
+    return names
+
+def generateIndex( package, aliases=(), sources=None ):
+    """Produce the _lazyindex source for package by inspecting its eager namespace
+
+    Each public name in the (eagerly imported) package is attributed to
+    the last of the star-imported sources which provides the identical
+    object, i.e. the module the eager import actually took it from.
+    Names in aliases and sub-packages of the package are skipped.
+
+    returns (source code, names which could not be attributed)
+    """
+    from OpenGL import _configflags
+    if _configflags.LAZY_IMPORTS:
+        raise RuntimeError( """Indices must be generated with OpenGL.LAZY_IMPORTS disabled""" )
+    sources = sources or EAGER_SOURCES[package]
+    namespace = vars( importlib.import_module( package ))
+    modules = [importlib.import_module( source ) for source in sources]
+    exported = [set( _starNames( module )) for module in modules]
+    attribution = dict([(source,[]) for source in sources])
+    missing = []
+    for name,value in sorted( namespace.items() ):
+        if name.startswith( '_' ) or name in aliases:
+            continue
+        if getattr( value, '__name__', None ) == '%s.%s'%( package, name ):
+            continue
+        for source,module,names in reversed( list( zip( sources, modules, exported ))):
+            if name in names and vars( module ).get( name ) is value:
+                attribution[source].append( name )
+                break
+        else:
+            missing.append( name )
+    lines = [
+        '"""Generated by OpenGL._lazyimport.generateIndex for %s, do not edit"""'%( package, ),
+        'SOURCES = (',
+    ]
+    for source in sources:
+        names = attribution[source]
+        lines.append( '    (%r, """'%( source, ))
+        line = ''
+        for name in names:
+            if len( line ) + len( name ) > 72:
+                lines.append( line.rstrip() )
+                line = ''
+            line += name + ' '
+        if line:
+            lines.append( line.rstrip() )
+        lines.append( '"""),' )
+    lines.append( ')' )
+    lines.append( 'SUBMODULES = %r'%( tuple( _submodules( package )), ))
+    return "\n".join( lines ) + "\n", missing
+
+def _submodules( package ):
+    """Sub-packages/modules of package bound in its eager namespace"""
+    module = importlib.import_module( package )
+    return sorted([
+        name for (name,value) in vars( module ).items()
+        if getattr( value, '__name__', None ) == '%s.%s'%( package, name )
+    ])
+
+if __name__ == "__main__":
+    import logging
+    logging.basicConfig()
+    for package in EAGER_SOURCES:
+        module = importlib.import_module( package )
+        source,missing = generateIndex( package, getattr( module, '_ALIASES', () ))
+        filename = os.path.join( os.path.dirname( module.__file__ ), '_lazyindex.py' )
+        with open( filename, 'w' ) as handle:
+            handle.write( source )
+        print( '%s: wrote %s'%( package, filename ))
+        if missing:
+            print( '  not attributed (set directly by the package?): %s'%( missing, ))
@@ -1,5 +1,5 @@
 """Array data-type implementations (abstraction points for GL array types"""
-import ctypes
+import ctypes, weakref
 import OpenGL
 
 assert OpenGL
@@ -16,7 +16,7 @@ except NameError:
 
 from OpenGL import acceleratesupport
 
-ADT = None
+ADT = HandlerCache = None
 if acceleratesupport.ACCELERATE_AVAILABLE:
     try:
         from OpenGL_accelerate.arraydatatype import ArrayDatatype as ADT
@@ -24,6 +24,46 @@ if acceleratesupport.ACCELERATE_AVAILABLE:
         _log.warning("Unable to load ArrayDatatype accelerator from OpenGL_accelerate")
 if ADT is None:
     # Python-coded version
+    class HandlerCache(object):
+        """Monomorphic inline cache of HandlerRegistry lookups for one call-site
+
+        entry is (type, handler) for the last type looked up, call-sites
+        which keep seeing the same array type (the usual case) skip the
+        registry entirely with:
+
+            entry = cache.entry
+            if value.__class__ is entry[0]:
+                handler = entry[1]
+            else:
+                handler = cache.lookup(value)
+
+        (a single tuple, so concurrent lookups never pair a type with the
+        wrong handler).  The registry clears its caches whenever a handler
+        is registered.
+        """
+
+        __slots__ = ("registry", "entry", "__weakref__")
+
+        def __init__(self, registry):
+            self.registry = registry
+            self.entry = (None, None)
+
+        def lookup(self, value):
+            """Lookup handler for value in the registry, caching it for value's type"""
+            handler = self.registry(value)
+            self.entry = (value.__class__, handler)
+            return handler
+
+        def __call__(self, value):
+            """Lookup of handler for given value"""
+            entry = self.entry
+            if value.__class__ is entry[0]:
+                return entry[1]
+            return self.lookup(value)
+
+        def clear(self):
+            self.entry = (None, None)
+
     class HandlerRegistry(dict):
         GENERIC_OUTPUT_PREFERENCES = ["numpy", "ctypesarrays"]
 
@@ -32,6 +72,7 @@ if ADT is None:
             self.output_handler = None
             self.preferredOutput = None
             self.all_output_handlers = []
+            self.caches = weakref.WeakSet()
 
         def __call__(self, value):
             """Lookup of handler for given value"""
@@ -55,13 +96,18 @@ if ADT is None:
                             if hasattr(handler, "registerEquivalent"):
                                 handler.registerEquivalent(typ, base)
                             return handler
-                print(self.keys())
                 raise TypeError(
                     """No array-type handler for type %s.%s (value: %s) registered"""
                     % (typ.__module__, typ.__name__, repr(value)[:50])
                 )
             return handler
 
+        def cache(self):
+            """Create a HandlerCache of our lookups (cleared when handlers are registered)"""
+            cache = HandlerCache(self)
+            self.caches.add(cache)
+            return cache
+
         def handler_by_plugin_name(self, name):
             plugin = plugins.FormatHandler.by_name(name)
             if plugin:
@@ -96,6 +142,8 @@ if ADT is None:
                 types = [types]
             for type in types:
                 self[type] = handler
+            for cache in list(self.caches):
+                cache.clear()
             if handler.isOutput:
                 self.all_output_handlers.append(handler)
 
@@ -121,7 +169,7 @@ if ADT is None:
 
         typeConstant = None
         handler = GLOBAL_REGISTRY
-        getHandler = GLOBAL_REGISTRY.__call__
+        handlerCache = GLOBAL_REGISTRY.cache()  # each array type gets its own, see below
         returnHandler = GLOBAL_REGISTRY.get_output_handler
         isAccelerated = False
 
@@ -130,9 +178,14 @@ if ADT is None:
             """Get our handler registry"""
             return cls.handler
 
+        @classmethod
+        def getHandler(cls, value):
+            """Lookup of handler for given value (via our HandlerCache)"""
+            return cls.handlerCache(value)
+
         def from_param(cls, value, typeConstant=None):
             """Given a value in a known data-pointer type, convert to a ctypes pointer"""
-            return cls.getHandler(value).from_param(value, cls.typeConstant)
+            return cls.handlerCache(value).from_param(value, cls.typeConstant)
 
         from_param = classmethod(logs.logOnFail(from_param, _log))
 
@@ -168,7 +221,9 @@ if ADT is None:
 
         def asArray(cls, value, typeCode=None):
             """Given a value, convert to preferred array representation"""
-            return cls.getHandler(value).asArray(value, typeCode or cls.typeConstant)
+            return cls.handlerCache(value).asArray(
+                value, typeCode or cls.typeConstant
+            )
 
         asArray = classmethod(logs.logOnFail(asArray, _log))
 
@@ -329,6 +384,11 @@ if ADT is None:
         baseType = _types.GLfixed
         typeConstant = _types.GL_FIXED
 
+    # a (monomorphic) handler cache per array type, each is a separate call-site
+    for _arrayType in ArrayDatatype.__subclasses__():
+        _arrayType.handlerCache = GLOBAL_REGISTRY.cache()
+    del _arrayType
+
 else:
     # Cython-coded array handler
     _log.debug("Using accelerated ArrayDatatype")
@@ -46,11 +46,18 @@ if AsArrayTypedSizeChecked is None:
         def __init__( self, arrayName='pointer', typeName='type' ):
             self.arrayName = arrayName
             self.typeName = typeName 
+            self.handlerCache = arraydatatype.GLOBAL_REGISTRY.cache()
         def __call__( self, arg, wrappedOperation, args):
             """Get the arg as an array of the appropriate type"""
             type = args[ self.typeIndex ]
             arrayType = arraydatatype.GL_CONSTANT_TO_ARRAY_TYPE[ type ]
-            return arrayType.asArray( arg )
+            # inlined HandlerCache check, this is the gl*Pointer hot path
+            entry = self.handlerCache.entry
+            if arg.__class__ is entry[0]:
+                handler = entry[1]
+            else:
+                handler = self.handlerCache.lookup( arg )
+            return handler.asArray( arg, arrayType.typeConstant )
     class AsArrayTyped( converters.PyConverter ):
         """Given arrayName and arrayType, convert arrayName to array of type
         
@@ -65,33 +72,76 @@ if AsArrayTypedSizeChecked is None:
         def __init__( self, arrayName='pointer', arrayType=None ):
             self.arrayName = arrayName
             self.arrayType = arrayType
+            self.handlerCache = arraydatatype.GLOBAL_REGISTRY.cache()
+            # (type, handler) of our last result, see AsArrayTypedSize
+            self.resultEntry = (None, None)
         def __call__( self, arg, wrappedOperation, args):
             """Get the arg as an array of the appropriate type"""
-            return self.arrayType.asArray( arg )
+            handler = self.handlerCache( arg )
+            result = handler.asArray( arg, self.arrayType.typeConstant )
+            if result.__class__ is not self.resultEntry[0]:
+                self.resultEntry = (result.__class__, handler)
+            return result
     class AsArrayTypedSize( converters.CConverter ):
         """Given arrayName and arrayType, determine size of arrayName
+
+        source -- the AsArrayTyped converter for arrayName, if given 
+            the handler which converted the array sizes it, rather 
+            than being looked up again
         """
         argNames = ( 'arrayName','arrayType' )
         indexLookups = ( 
             ('arrayIndex', 'arrayName','pyArgIndex'),
         )
-        def __init__( self, arrayName='pointer', arrayType=None ):
+        def __init__( self, arrayName='pointer', arrayType=None, source=None ):
             self.arrayName = arrayName
             self.arrayType = arrayType
+            self.source = source
+            self.handlerCache = arraydatatype.GLOBAL_REGISTRY.cache()
         def __call__( self, pyArgs, index, wrappedOperation ):
             """Get the arg as an array of the appropriate type"""
-            return self.arrayType.arraySize( pyArgs[self.arrayIndex ] )
+            arg = pyArgs[self.arrayIndex ]
+            if self.source is not None:
+                entry = self.source.resultEntry
+                if arg.__class__ is entry[0]:
+                    return entry[1].arraySize( arg, self.arrayType.typeConstant )
+            return self.handlerCache( arg ).arraySize( arg, self.arrayType.typeConstant )
+    def asArrayTypedWithSize( arrayName, arrayType ):
+        """Create (AsArrayTyped, AsArrayTypedSize) for arrayName sharing one handler lookup"""
+        typed = AsArrayTyped( arrayName, arrayType )
+        return typed, AsArrayTypedSize( arrayName, arrayType, source=typed )
 else:
     returnPointer = returnPyArgumentIndex( 0 )
+    def asArrayTypedWithSize( arrayName, arrayType ):
+        """Create (AsArrayTyped, AsArrayTypedSize) for arrayName"""
+        return AsArrayTyped( arrayName, arrayType ), AsArrayTypedSize( arrayName, arrayType )
 
-if not _configflags.ERROR_ON_COPY:
+if _configflags.ERROR_ON_COPY:
+    def asArrayType( typ, size=None ):
+        """No converter required"""
+        return None
+elif arraydatatype.HandlerCache is None:
     def asArrayType( typ, size=None ):
         """Create PyConverter to get first argument as array of type"""
         return converters.CallFuncPyConverter( typ.asArray )
 else:
     def asArrayType( typ, size=None ):
-        """No converter required"""
-        return None
+        """Create PyConverter function to get first argument as array of type
+
+        Produces a raw function with its own HandlerCache, so that the
+        handler is only looked up when the argument's type changes
+        """
+        cache = arraydatatype.GLOBAL_REGISTRY.cache()
+        dataType = typ.typeConstant
+        def asArray( incoming, function, args ):
+            # inlined HandlerCache check, this is the gl*v hot path
+            entry = cache.entry
+            if incoming.__class__ is entry[0]:
+                handler = entry[1]
+            else:
+                handler = cache.lookup( incoming )
+            return handler.asArray( incoming, dataType )
+        return asArray
 
 if not _configflags.ARRAY_SIZE_CHECKING:
     asArrayTypeSize = asArrayType
@@ -104,12 +154,11 @@ else:
             
             Produces a raw function, not a PyConverter instance
             """
-            asArray = typ.asArray
+            cache = arraydatatype.GLOBAL_REGISTRY.cache()
             dataType = typ.typeConstant
-            arraySize = typ.arraySize
             expectedBytes = ctypes.sizeof( typ.baseType ) * size
             def asArraySize( incoming, function, args ):
-                handler = typ.getHandler( incoming )
+                handler = cache( incoming )
                 result = handler.asArray( incoming, dataType )
                 # check that the number of bytes expected is present...
                 byteSize = handler.arrayByteCount( result )
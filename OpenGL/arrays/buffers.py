@@ -36,6 +36,7 @@ if not BufferHandler:
         """Buffer-protocol data-type handler for OpenGL"""
         isOutput=False
         ERROR_ON_COPY = _configflags.ERROR_ON_COPY
+        COPY_STATS = _configflags.COPY_STATS
         if sys.version_info[0] >= 3:
             @classmethod
             def from_param( cls, value, typeCode=None ):
@@ -88,6 +89,10 @@ if not BufferHandler:
         def asArray( cls, value, typeCode=None ):
             """Convert given value to an array value of given typeCode"""
             buf = _buffers.Py_buffer.from_object( value )
+            if cls.COPY_STATS and not isinstance( value, _buffers.Py_buffer ):
+                # wraps value's memory, a conversion but not a copy
+                from OpenGL.arrays import copystats
+                copystats.record( cls, value, buf, nbytes=0 )
             return buf
         @classmethod
         def dimensions( cls, value, typeCode=None ):
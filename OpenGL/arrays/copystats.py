@@ -0,0 +1,157 @@
+"""Accounting of implicit array conversions/copies (OpenGL.COPY_STATS)
+
+ERROR_ON_COPY turns every copy made by the format handlers into a
+CopyError, which is fine in a test suite but not in a running
+application.  With OpenGL.COPY_STATS (environment PYOPENGL_COPY_STATS=1)
+set before the array handlers are imported, the handlers instead
+report each conversion here, and STATS tallies the number of
+conversions and the bytes copied by:
+
+    entry point -- the outermost PyOpenGL function on the stack, i.e.
+        the GL (GLU, GLUT, VBO...) call the application made
+    call site -- file:line (function) of the application code making it
+    handler -- the format handler which did the conversion
+    source -- the type of the value which had to be converted
+
+Call STATS.endFrame() once per frame (FrameProfiler.endFrame does this
+for you when COPY_STATS is set), then
+
+    from OpenGL.arrays.copystats import STATS
+    for record in STATS.top( 10 ):
+        print( record['bytes_per_frame'], record['entry_point'], record['call_site'] )
+
+to find the hot paths worth converting to pre-built, correctly-typed
+(zero-copy) arrays.
+
+Note: the buffer-protocol handler wraps values without copying them,
+its conversions are counted with 0 bytes; the OpenGL_accelerate
+(Cython) handlers do not report conversions at all.
+"""
+import ctypes, os, sys
+from collections import OrderedDict
+
+__all__ = [
+    'CopyStatistics',
+    'STATS',
+    'record',
+]
+
+_PACKAGE = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+
+def _byteCount( value ):
+    """Size in bytes of converted value (numpy/ctypes array, scalar...)"""
+    try:
+        return value.nbytes
+    except AttributeError:
+        pass
+    try:
+        return ctypes.sizeof( value )
+    except TypeError:
+        return 0
+
+def _origin( frame ):
+    """Find (entry point, call site) for a conversion made in frame
+
+    Walks out of the PyOpenGL package (including generated wrapper
+    code), the outermost PyOpenGL frame names the entry point, the
+    frame which called it is the call site.
+    """
+    entry = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not (filename.startswith( _PACKAGE ) or filename.startswith( '<OpenGL' )):
+            break
+        entry = frame
+        frame = frame.f_back
+    if entry is None:
+        name = '<unknown>'
+    else:
+        name = getattr( entry.f_locals.get( 'self' ), '__name__', None )
+        if not isinstance( name, str ):
+            name = entry.f_code.co_name
+    if frame is None:
+        site = '<unknown>'
+    else:
+        site = '%s:%s (%s)'%( frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name )
+    return name, site
+
+class CopyStatistics( object ):
+    """Conversion counts and copied bytes per (entry point, call site, handler, source)
+
+    Attributes:
+
+        records -- dict of key to [conversions, bytes]
+        frameCount -- number of endFrame calls since the last reset
+    """
+    def __init__( self ):
+        self.reset()
+    def reset( self ):
+        """Discard all records and restart frame counting"""
+        self.records = {}
+        self.frameCount = 0
+    def record( self, handler, value, result=None, nbytes=None, depth=2 ):
+        """Count conversion of value by handler into result
+
+        nbytes -- bytes copied, default is the size of result
+        depth -- stack frames between the conversion and this method
+        """
+        if nbytes is None:
+            nbytes = _byteCount( result )
+        entry, site = _origin( sys._getframe( depth ) )
+        key = (
+            entry, site,
+            getattr( handler, '__name__', None ) or handler.__class__.__name__,
+            type( value ).__name__,
+        )
+        counts = self.records.get( key )
+        if counts is None:
+            self.records[key] = [1,nbytes]
+        else:
+            counts[0] += 1
+            counts[1] += nbytes
+    def endFrame( self ):
+        """Mark the end of a frame (for the per-frame figures of top)"""
+        self.frameCount += 1
+    def top( self, count=10 ):
+        """Top count records by bytes (then conversions), JSON-compatible
+
+        per-frame figures are averages over the frames ended since the
+        last reset (the totals if no frame has been ended)
+        """
+        frames = float( max( self.frameCount, 1 ) )
+        ordered = sorted(
+            self.records.items(),
+            key = lambda item: (item[1][1],item[1][0]),
+            reverse=True,
+        )[:count]
+        return [
+            OrderedDict([
+                ('entry_point',entry),
+                ('call_site',site),
+                ('handler',handler),
+                ('source',source),
+                ('conversions',conversions),
+                ('bytes',nbytes),
+                ('conversions_per_frame',conversions/frames),
+                ('bytes_per_frame',nbytes/frames),
+            ])
+            for ((entry,site,handler,source),(conversions,nbytes)) in ordered
+        ]
+    def report( self, count=10 ):
+        """Format top( count ) as a human-readable table"""
+        lines = [
+            '%12s %10s  %s'%( 'bytes/frame', 'copies/fr', 'entry point <- call site [handler: source]' ),
+        ]
+        for record in self.top( count ):
+            lines.append( '%12.1f %10.2f  %s <- %s [%s: %s]'%(
+                record['bytes_per_frame'], record['conversions_per_frame'],
+                record['entry_point'], record['call_site'],
+                record['handler'], record['source'],
+            ))
+        return '\n'.join( lines )
+
+STATS = CopyStatistics()
+
+def record( handler, value, result=None, nbytes=None ):
+    """Count a conversion in STATS (called by the format handlers)"""
+    STATS.record( handler, value, result, nbytes, depth=3 )
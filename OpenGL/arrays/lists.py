@@ -12,11 +12,12 @@ import ctypes, _ctypes
 from OpenGL.raw.GL import _types 
 from OpenGL.arrays import _arrayconstants as GL_1_1
 from OpenGL import constant, error
-from OpenGL._configflags import ERROR_ON_COPY
+from OpenGL._configflags import ERROR_ON_COPY, COPY_STATS
 from OpenGL.arrays import formathandler
 from OpenGL._bytes import bytes,unicode,as_8_bit
 HANDLED_TYPES = (list,tuple)
-import operator
+import operator, itertools
+from array import array as _array
 
 def err_on_copy( func ):
     """Decorator which raises informative error if we try to copy while ERROR_ON_COPY"""
@@ -134,16 +135,67 @@ class ListHandler( formathandler.FormatHandler ):
     def asArray( cls, value, typeCode=None ):
         """Convert given value to a ctypes array value of given typeCode
         
-        This does a *lot* of work just to get the data into the correct
-        format.  It's not going to be anywhere near as fast as a numpy
-        or similar approach!
+        Uniformly nested lists/tuples of numbers are packed in bulk
+        (packedArray), anything else is converted element by element
+        (copiedArray).  Either way this is a copy, it's not going to be
+        anywhere near as fast as passing a numpy or similar array!
         """
         if typeCode is None:
             raise NotImplementedError( """Haven't implemented type-inference for lists yet""" )
         arrayType = GL_TYPE_TO_ARRAY_MAPPING[ typeCode ]
+        result = None
+        if isinstance( value, (list,tuple)):
+            result = cls.packedArray( value, arrayType )
+        if result is None:
+            result = cls.copiedArray( value, arrayType )
+        if COPY_STATS:
+            from OpenGL.arrays import copystats
+            copystats.record( cls, value, result )
+        return result
+    @classmethod
+    def packedArray( cls, value, arrayType ):
+        """Bulk-convert uniformly nested value to (nested) ctypes arrayType
+
+        Walks value one nesting level at a time, checking that each level
+        is made up entirely of lists/tuples of a single length, then packs
+        the flattened leaves with the array module and copies the buffer
+        into the ctypes array.  Produces the same result type as
+        copiedArray, i.e. arrayType * dims[-1] * ... * dims[0].
+
+        returns None for ragged, empty or non-numeric input, or if the
+        array module would reject values ctypes accepts (e.g. out of range
+        integers), in which case the caller falls back to copiedArray
+        """
+        code = ARRAY_TYPE_TO_TYPECODE.get( arrayType )
+        if code is None:
+            return None
+        dims = [ len(value) ]
+        items = value
+        while items:
+            if not isinstance( items[0], (list,tuple) ):
+                break
+            if not set( map( type, items ) ).issubset( HANDLED_TYPES ):
+                return None
+            lengths = set( map( len, items ) )
+            if len(lengths) != 1:
+                return None
+            dims.append( lengths.pop() )
+            items = list( itertools.chain.from_iterable( items ) )
+        if not items:
+            return None
+        try:
+            packed = _array( code, items )
+        except (TypeError,ValueError,OverflowError) as err:
+            return None
+        for dim in dims[::-1]:
+            arrayType *= dim
+        return arrayType.from_buffer_copy( packed )
+    @classmethod
+    def copiedArray( cls, value, arrayType ):
+        """Recursively convert value to ctypes arrayType, element by element"""
         if isinstance( value, (list,tuple)):
             subItems = [
-                cls.asArray( item, typeCode )
+                cls.copiedArray( item, arrayType )
                 for item in value
             ]
             if subItems:
@@ -204,3 +256,10 @@ GL_TYPE_TO_ARRAY_MAPPING = {
     'B': _types.GLubyte,
     's': _types.GLchar,
 }
+# array-module typecodes for bulk conversion in ListHandler.packedArray
+ARRAY_TYPE_TO_TYPECODE = dict([
+    (arrayType,code)
+    for (code,arrayType) in GL_TYPE_TO_ARRAY_MAPPING.items()
+    if isinstance( code, str ) and code != 's'
+    and _array( code ).itemsize == ctypes.sizeof( arrayType )
+])
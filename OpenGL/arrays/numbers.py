@@ -4,6 +4,7 @@ REGISTRY_NAME = 'numbers'
 from OpenGL.raw.GL import _types
 from OpenGL.raw.GL.VERSION import GL_1_1
 from OpenGL.arrays import formathandler
+from OpenGL._configflags import COPY_STATS
 import ctypes
 from OpenGL._bytes import long, integer_types
 
@@ -73,7 +74,12 @@ class NumberHandler(formathandler.FormatHandler):
             return value
         targetType = CONSTANT_TO_TYPE.get(typeCode)
         if targetType is not None:
-            return targetType(value)
+            result = targetType(value)
+            if COPY_STATS:
+                from OpenGL.arrays import copystats
+
+                copystats.record(self, value, result)
+            return result
         raise TypeError(
             """Don't know how to convert %r to an array type""" % (typeCode,)
         )
@@ -107,6 +107,7 @@ if NumpyHandler is None:
         dataPointer = dataPointer
         isOutput = True
         ERROR_ON_COPY = _configflags.ERROR_ON_COPY
+        COPY_STATS = _configflags.COPY_STATS
         @classmethod
         def zeros( cls, dims, typeCode ):
             """Return Numpy array of zeros in given size"""
@@ -171,9 +172,13 @@ if NumpyHandler is None:
                 contiguous = source.flags.contiguous
             except AttributeError:
                 if typeCode:
-                    return numpy.ascontiguousarray( source, typeCode )
+                    result = numpy.ascontiguousarray( source, typeCode )
                 else:
-                    return numpy.ascontiguousarray( source )
+                    result = numpy.ascontiguousarray( source )
+                if cls.COPY_STATS:
+                    from OpenGL.arrays import copystats
+                    copystats.record( cls, source, result )
+                return result
             else:
                 if contiguous and (typeCode is None or typeCode==source.dtype.char):
                     return source
@@ -197,7 +202,11 @@ if NumpyHandler is None:
                         )
                     if typeCode is None:
                         typeCode = source.dtype.char
-                    return numpy.ascontiguousarray( source, typeCode )
+                    result = numpy.ascontiguousarray( source, typeCode )
+                    if cls.COPY_STATS:
+                        from OpenGL.arrays import copystats
+                        copystats.record( cls, source, result )
+                    return result
         @classmethod
         def unitSize( cls, value, typeCode=None ):
             """Determine unit size of an array (if possible)"""
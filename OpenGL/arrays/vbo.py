@@ -39,21 +39,28 @@ import ctypes,logging
 _log = logging.getLogger( 'OpenGL.arrays.vbo' )
 from OpenGL._bytes import long, integer_types
 
-import weakref
-__all__ = ('VBO','VBOHandler','mapVBO')
+import weakref, importlib
+__all__ = ('VBO','VBOHandler','mapVBO','StreamingBuffer')
 
 class Implementation( object ):
     """Abstraction point for the various implementations that can be used
     """
     IMPLEMENTATION_CLASSES = []
+    IMPLEMENTATION_MODULES = []
     CHOSEN = None
     @classmethod
     def register( cls ):
         cls.IMPLEMENTATION_CLASSES.append( cls )
+    @classmethod
+    def register_module( cls, name ):
+        """Register module name to be imported (registering its implementation) on first use"""
+        cls.IMPLEMENTATION_MODULES.append( name )
     
     @classmethod 
     def get_implementation( cls, *args ):
         if cls.CHOSEN is None:
+            while cls.IMPLEMENTATION_MODULES:
+                importlib.import_module( cls.IMPLEMENTATION_MODULES.pop(0) )
             for possible in cls.IMPLEMENTATION_CLASSES:
                 implementation = possible()
                 if possible:
@@ -82,7 +89,21 @@ class Implementation( object ):
     GL_UNIFORM_BUFFER
     GL_TEXTURE_BUFFER
     GL_TRANSFORM_FEEDBACK_BUFFER'''.split()
+    # used for partial updates where available, None otherwise
+    OPTIONAL_NAMES = '''glMapBufferRange
+    GL_MAP_WRITE_BIT
+    GL_MAP_INVALIDATE_RANGE_BIT
+    GL_MAP_UNSYNCHRONIZED_BIT'''.split()
+    glMapBufferRange = None
     available = False
+    def load_optional( self, *sources ):
+        """Set each of OPTIONAL_NAMES from the first source providing it"""
+        for name in self.OPTIONAL_NAMES:
+            for source in sources:
+                value = getattr( source, name, None )
+                if value is not None:
+                    setattr( self, name, value )
+                    break
     def _arbname( self, name ):
         return (
             (name.startswith( 'gl' ) and name.endswith( 'ARB' )) or
@@ -103,6 +124,7 @@ class Implementation( object ):
         # these values are stored here to avoid them being cleaned up 
         # to non during module deletion and causing errors to be raised
         nfe = error.NullFunctionError
+        argumentError = ctypes.ArgumentError
         gluint = _types.GLuint
         def doBufferDeletion( *args, **named ):
             while buffers:
@@ -116,7 +138,7 @@ class Implementation( object ):
                         # we have to pass an array-compatible type here...
                         buf = gluint( buffer )
                         self.glDeleteBuffers(1, buf)
-                    except (AttributeError, nfe, TypeError) as err:
+                    except (AttributeError, nfe, TypeError, argumentError) as err:
                         pass
             try:
                 self._DELETERS_.pop( key )
@@ -151,6 +173,15 @@ if VBO is None:
         """
         copied = False
         _no_cache_ = True # do not cache in context data arrays
+        # dirty ranges closer than this many bytes are uploaded as one
+        coalesce_gap = 256
+        # partial updates of at least this many bytes (or of several
+        # ranges) are written through glMapBufferRange where available
+        map_threshold = 65536
+        # set True only if the GL is known not to be using the buffer
+        # when it is updated, to map without GL_MAP_UNSYNCHRONIZED_BIT's
+        # implicit synchronisation
+        unsynchronized = False
         def __init__(
             self, data, usage='GL_DYNAMIC_DRAW',
             target='GL_ARRAY_BUFFER', size=None,
@@ -196,7 +227,8 @@ if VBO is None:
             self.set_array( data, size )
             self.target = target
             self.buffers = []
-            self._copy_segments = []
+            self._dirty = []
+            self.reset_upload_stats()
         _I_ = None
         implementation = property( get_implementation, )
         def resolve( self, value ):
@@ -232,6 +264,10 @@ if VBO is None:
             of state-aware changes to correctly map the source into the low-level
             OpenGL view of the buffer (which is just bytes as far as the GL
             is concerned).
+
+            Once the VBO has been copied, only the byte range of the
+            assignment is marked dirty, the dirty ranges are merged and
+            uploaded from our data-array by the next bind (copy_data).
             """
             if slice.step and not slice.step == 1:
                 raise NotImplemented( """Don't know how to map stepped arrays yet""" )
@@ -246,12 +282,14 @@ if VBO is None:
             if stop < 0:
                 stop += len(self.data)
                 stop = max((stop,0))
+            stop = min((stop,len(self.data)))
             self.data[ slice ] = data
             if self.copied and self.buffers:
-                if start-stop == len(self.data):
+                if stop-start >= len(self.data):
                     # re-copy the whole data-set
                     self.copied = False
-                elif len(data):
+                    self._dirty = []
+                elif stop > start:
                     # now the fun part, we need to make the array match the
                     # structure of the array we're going to copy into and make
                     # the "size" parameter match the value we're going to copy in,
@@ -262,18 +300,14 @@ if VBO is None:
                     size = ArrayDatatype.arrayByteCount( self.data[0] )
                     #baseSize = ArrayDatatype.unitSize( data )
                     # now create the start and distance values...
-                    start *= size
-                    stop *= size
                     # wait until the last moment (bind) to copy the data...
-                    self._copy_segments.append(
-                        (start,(stop-start), data)
-                    )
+                    self._dirty.append( (int(start*size), int(stop*size)) )
         def __len__( self ):
             """Delegate length/truth checks to our data-array"""
             return len( self.data )
         def __getattr__( self, key ):
             """Delegate failing attribute lookups to our data-array"""
-            if key not in ('data','usage','target','buffers', 'copied','_I_','implementation','_copy_segments' ):
+            if key not in ('data','usage','target','buffers', 'copied','_I_','implementation','_dirty','upload_stats' ):
                 return getattr( self.data, key )
             else:
                 raise AttributeError( key )
@@ -291,15 +325,12 @@ if VBO is None:
             Ensures that the GL's version of the data in the VBO matches our 
             internal view of the data, either by copying the entire data-set 
             over with glBufferData or by updating the already-transferred 
-            data with glBufferSubData.
+            data with the dirty ranges left by __setitem__ (see copy_ranges).
             """
             assert self.buffers, """Should do create_buffers before copy_data"""
             if self.copied:
-                if self._copy_segments:
-                    while self._copy_segments:
-                        start,size,data  = self._copy_segments.pop(0)
-                        dataptr = ArrayDatatype.voidDataPointer( data )
-                        self.implementation.glBufferSubData(self.target, start, size, dataptr)
+                if self._dirty:
+                    self.copy_ranges()
             else:
                 if self.data is not None and self.size is None:
                     self.size = ArrayDatatype.arrayByteCount( self.data )
@@ -310,6 +341,90 @@ if VBO is None:
                     self.usage,
                 )
                 self.copied = True
+                self._dirty = []
+                stats = self.upload_stats
+                stats['full_uploads'] += 1
+                stats['bytes'] += self.size or 0
+        def coalesced_ranges( self ):
+            """Merge the pending dirty ranges into sorted, disjoint [start,stop) byte ranges
+
+            Overlapping ranges, and ranges less than coalesce_gap bytes
+            apart, become a single range.
+            """
+            merged = []
+            for start,stop in sorted( self._dirty ):
+                if merged and start <= merged[-1][1] + self.coalesce_gap:
+                    if stop > merged[-1][1]:
+                        merged[-1][1] = stop
+                else:
+                    merged.append( [start,stop] )
+            return merged
+        def copy_ranges( self ):
+            """Upload the (coalesced) dirty ranges of our data-array
+
+            A single small range is written with glBufferSubData.  Several
+            ranges, or a large one, are written through one
+            glMapBufferRange (GL_MAP_INVALIDATE_RANGE_BIT, plus
+            GL_MAP_UNSYNCHRONIZED_BIT if unsynchronized is set) over the
+            span covering them, as long as that span is no more than twice
+            the dirty bytes, otherwise each range gets a glBufferSubData.
+            Data-arrays which are not contiguous are re-copied entirely.
+            """
+            segments = len( self._dirty )
+            ranges = self.coalesced_ranges()
+            self._dirty = []
+            flags = getattr( self.data, 'flags', None )
+            if flags is not None and not flags.c_contiguous:
+                self.copied = False
+                return self.copy_data()
+            implementation = self.implementation
+            base = ArrayDatatype.dataPointer( self.data )
+            dirty = sum( [stop-start for (start,stop) in ranges] )
+            first,last = ranges[0][0],ranges[-1][1]
+            span = last - first
+            stats = self.upload_stats
+            stats['partial_uploads'] += 1
+            stats['segments'] += segments
+            stats['ranges'] += len(ranges)
+            if (
+                implementation.glMapBufferRange and
+                (len(ranges) > 1 or dirty >= self.map_threshold) and
+                span <= 2 * dirty
+            ):
+                access = implementation.GL_MAP_WRITE_BIT|implementation.GL_MAP_INVALIDATE_RANGE_BIT
+                if self.unsynchronized:
+                    access |= implementation.GL_MAP_UNSYNCHRONIZED_BIT
+                pointer = implementation.glMapBufferRange( self.target, first, span, access )
+                if pointer:
+                    # the whole span is invalidated, so (re-)write all of it
+                    ctypes.memmove( pointer, base + first, span )
+                    if not implementation.glUnmapBuffer( self.target ):
+                        # store was corrupted while mapped, start over next time
+                        self.copied = False
+                    stats['mapped_uploads'] += 1
+                    stats['bytes'] += span
+                    return
+            for start,stop in ranges:
+                implementation.glBufferSubData(
+                    self.target, start, stop-start, ctypes.c_void_p( base + start )
+                )
+            stats['bytes'] += dirty
+        def reset_upload_stats( self ):
+            """Reset upload_stats, e.g. once per frame
+
+            upload_stats counts:
+
+                full_uploads -- glBufferData copies of the whole data-array
+                partial_uploads -- copy_ranges calls (binds with dirty ranges)
+                segments -- __setitem__ assignments uploaded by those
+                ranges -- coalesced ranges they were merged into
+                mapped_uploads -- partial uploads done via glMapBufferRange
+                bytes -- total bytes sent to the GL
+            """
+            self.upload_stats = dict(
+                full_uploads=0, partial_uploads=0, segments=0, ranges=0,
+                mapped_uploads=0, bytes=0,
+            )
         def delete( self ):
             """Delete this buffer explicitly"""
             if self.buffers:
@@ -463,3 +578,197 @@ def mapVBO( vbo, access=0x88BA ): # GL_READ_WRITE
     array = frombuffer( vp_array, 'B' )
     _cleaners[vbo] = weakref.ref( array, _cleaner( vbo ))
     return array
+
+class StreamingBuffer( object ):
+    """Persistently-mapped, fenced ring buffer for streaming per-frame data
+
+    Requires OpenGL 4.4 or GL_ARB_buffer_storage (and numpy).  The buffer
+    holds regions (default 3) regions of size bytes, allocated once with
+    glBufferStorage and mapped once with GL_MAP_PERSISTENT_BIT and
+    GL_MAP_COHERENT_BIT, so data written into the numpy view of a region
+    reaches the GL with neither glBufferData nor glBufferSubData.  Each
+    frame uses the next region: end() puts a glFenceSync behind the
+    frame's commands and begin() waits on the fence of the region it is
+    about to reuse, which with three regions has normally long been
+    signalled, so neither side stalls:
+
+        stream = vbo.StreamingBuffer( 1024*1024 )
+        ...
+        with stream: # begin(), ..., end()
+            offset = stream.write( particle_vertices )
+            glVertexPointer( 3, GL_FLOAT, 0, offset )
+            glDrawArrays( GL_POINTS, 0, len(particle_vertices) )
+            view,offset = stream.allocate( (count,3), 'f' )
+            view[:] = ... # fill in place, no copy at all
+            glVertexPointer( 3, GL_FLOAT, 0, offset )
+            ...
+
+    allocate() and write() hand out consecutive (aligned) parts of the
+    current region as VBOOffset instances, usable wherever an offset into
+    a bound VBO is.
+
+    Attributes:
+
+        size -- bytes per region
+        regions -- number of regions in the ring
+        target -- buffer target bound by begin()/bind()
+        alignment -- byte alignment of allocations (e.g. 256 for
+            uniform buffer ranges)
+        timeout -- nanoseconds per glClientWaitSync attempt
+        mapped -- numpy uint8 view of the whole mapping
+        views -- numpy uint8 view of each region
+        region -- index of the current region
+        cursor -- bytes already allocated in the current region
+        frames -- number of begin() calls
+        stalls -- number of begin() calls which had to wait for the GL
+    """
+    _no_cache_ = True # do not cache in context data arrays
+    def __init__(
+        self, size, regions=3, target='GL_ARRAY_BUFFER', alignment=16,
+        timeout=1000000000,
+    ):
+        self.alignment = alignment
+        self.size = -(-size//alignment) * alignment
+        self.regions = regions
+        self.target = target
+        self.timeout = timeout
+        self.buffers = []
+        self.mapped = None
+        self.views = []
+        self.fences = [None]*regions
+        self.region = regions - 1
+        self.cursor = 0
+        self.frames = 0
+        self.stalls = 0
+    implementation = property( get_implementation, )
+    def resolve( self, value ):
+        """Resolve string constant to constant"""
+        if isinstance( value, (bytes,unicode)):
+            return getattr( self.implementation, self.implementation.basename( value ) )
+        return value
+    @property
+    def data( self ):
+        """View of the current region (for VBOOffset's handlers)"""
+        return self.views[self.region] if self.views else None
+    def create_buffers( self ):
+        """Create the buffer's immutable storage and map it persistently"""
+        assert not self.buffers, """Already created the buffer"""
+        from numpy import frombuffer
+        from OpenGL.raw.GL.ARB.buffer_storage import (
+            glBufferStorage, GL_MAP_WRITE_BIT, GL_MAP_PERSISTENT_BIT, GL_MAP_COHERENT_BIT,
+        )
+        from OpenGL.raw.GL.VERSION.GL_3_0 import glMapBufferRange
+        if not glBufferStorage:
+            raise error.NullFunctionError(
+                """StreamingBuffer requires glBufferStorage (OpenGL 4.4 or ARB_buffer_storage)"""
+            )
+        implementation = self.implementation
+        self.target = self.resolve( self.target )
+        self.buffers = [ long(implementation.glGenBuffers(1)) ]
+        implementation._DELETERS_[ id(self) ] = weakref.ref( self, implementation.deleter( self.buffers, id(self) ))
+        total = self.size * self.regions
+        flags = GL_MAP_WRITE_BIT|GL_MAP_PERSISTENT_BIT|GL_MAP_COHERENT_BIT
+        implementation.glBindBuffer( self.target, self.buffers[0] )
+        glBufferStorage( self.target, total, None, flags )
+        pointer = glMapBufferRange( self.target, 0, total, flags )
+        if not pointer:
+            raise error.GLError( description="""Unable to map StreamingBuffer storage""" )
+        self.mapped = frombuffer( (ctypes.c_ubyte*total).from_address( pointer ), 'B' )
+        self.views = [
+            self.mapped[i*self.size:(i+1)*self.size]
+            for i in range( self.regions )
+        ]
+        return self.buffers
+    def __int__( self ):
+        """Get our buffer id"""
+        if not self.buffers:
+            self.create_buffers()
+        return self.buffers[0]
+    def bind( self ):
+        """Bind the buffer to our target (creating it if necessary)"""
+        if not self.buffers:
+            self.create_buffers()
+        self.implementation.glBindBuffer( self.target, self.buffers[0] )
+    def unbind( self ):
+        """Unbind the buffer (make normal array operations active)"""
+        self.implementation.glBindBuffer( self.target, 0 )
+    def begin( self ):
+        """Start a frame: move to the next region (once the GL is done with it) and bind"""
+        self.bind()
+        self.region = (self.region + 1) % self.regions
+        self.cursor = 0
+        self.frames += 1
+        fence = self.fences[self.region]
+        if fence is not None:
+            self.fences[self.region] = None
+            self._wait( fence )
+        return self
+    def _wait( self, fence ):
+        from OpenGL.raw.GL.ARB.sync import (
+            glClientWaitSync, glDeleteSync, GL_SYNC_FLUSH_COMMANDS_BIT,
+            GL_ALREADY_SIGNALED, GL_CONDITION_SATISFIED, GL_WAIT_FAILED,
+        )
+        try:
+            result = glClientWaitSync( fence, 0, 0 )
+            if result != GL_ALREADY_SIGNALED:
+                self.stalls += 1
+                while result not in (GL_ALREADY_SIGNALED,GL_CONDITION_SATISFIED):
+                    if result == GL_WAIT_FAILED:
+                        raise error.GLError( result=result, description="""glClientWaitSync failed""" )
+                    result = glClientWaitSync( fence, GL_SYNC_FLUSH_COMMANDS_BIT, self.timeout )
+        finally:
+            glDeleteSync( fence )
+    def end( self ):
+        """End the frame: fence the current region behind the commands issued so far"""
+        from OpenGL.raw.GL.ARB.sync import glFenceSync, GL_SYNC_GPU_COMMANDS_COMPLETE
+        self.fences[self.region] = glFenceSync( GL_SYNC_GPU_COMMANDS_COMPLETE, 0 )
+        self.unbind()
+    __enter__ = begin
+    def __exit__( self, exc_type=None, exc_val=None, exc_tb=None ):
+        """Context manager exit"""
+        self.end()
+        return False # do not supress exceptions...
+    def allocate( self, shape, dtype='B' ):
+        """Allocate an array of shape/dtype in the current region
+
+        returns (numpy view into the mapping, VBOOffset of its start),
+        raises ValueError if the region is out of space
+        """
+        from numpy import dtype as _dtype
+        dtype = _dtype( dtype )
+        count = 1
+        for dim in (shape if isinstance( shape, tuple ) else (shape,)):
+            count *= dim
+        nbytes = count * dtype.itemsize
+        start = -(-self.cursor//self.alignment) * self.alignment
+        if start + nbytes > self.size:
+            raise ValueError(
+                """StreamingBuffer region of %s bytes cannot fit %s more bytes at %s"""%(
+                    self.size, nbytes, start,
+                )
+            )
+        self.cursor = start + nbytes
+        view = self.views[self.region][start:start+nbytes].view( dtype ).reshape( shape )
+        return view, VBOOffset( self, self.region*self.size + start )
+    def write( self, array ):
+        """Copy array (numpy-compatible) into the current region, returns its VBOOffset"""
+        from numpy import asarray
+        array = asarray( array )
+        view,offset = self.allocate( array.shape, array.dtype )
+        view[...] = array
+        return offset
+    def delete( self ):
+        """Unmap and delete the buffer and any pending fences explicitly"""
+        from OpenGL.raw.GL.ARB.sync import glDeleteSync
+        for i,fence in enumerate( self.fences ):
+            if fence is not None:
+                glDeleteSync( fence )
+                self.fences[i] = None
+        self.views = []
+        self.mapped = None
+        while self.buffers:
+            buffer = self.buffers.pop(0)
+            try:
+                self.implementation.glDeleteBuffers(1, _types.GLuint( buffer ))
+            except (AttributeError,error.NullFunctionError) as err:
+                pass
@@ -6,6 +6,13 @@ such as TypeError or ValueError when appropriate.
 ErrorChecker is an _ErrorChecker instance that allows you
 to register a new error-checking function for use 
 throughout the system.
+
+checkpoint() polls for errors which have been deferred when
+OpenGL.ERROR_CHECKING is set to 'deferred' or 'every:N'.
+
+When OpenGL.ERROR_CHECKING is 'debug' or 'debug:sync' errors are
+reported via a KHR_debug message callback (see OpenGL.GL.debugmessages)
+rather than by polling glGetError after every call.
 """
 import logging
 _log = logging.getLogger( 'OpenGL.error' )
@@ -57,7 +64,11 @@ class GLError( Error ):
         cArguments -- ctypes-level arguments to the operation,
             often raw integers for pointers and the like
         description -- OpenGL description of the error (textual)
+        callRange -- for errors found at a deferred-checking
+            checkpoint, (firstOperation, lastOperation, count) of
+            the calls made since the previous checkpoint
     """
+    callRange = None
     def __init__( 
         self, 
         err=None, 
@@ -86,6 +97,7 @@ class GLError( Error ):
         'cArgs',
         'cArguments',
         'result', 
+        'callRange',
     )
     def __str__( self ):
         """Create a fully formatted representation of the error"""
@@ -145,6 +157,15 @@ class GLError( Error ):
             return r
         else:
             return r[:117] + '...'
+    def format_callRange( self, property, value ):
+        """Format a deferred-checking call range for display"""
+        first,last,count = value
+        return '%s = %s ... %s (%s calls since last checkpoint)'%(
+            property,
+            getattr( first, '__name__', first ),
+            getattr( last, '__name__', last ),
+            count,
+        )
     def format_baseOperation( self, property, value ):
         """Format a baseOperation reference for display"""
         if hasattr( value, '__name__' ):
@@ -160,10 +181,68 @@ class GLUTError( Error ):
 class EGLError( GLError ):
     """EGL error implementation class"""
 
+def _deferredInterval( mode ):
+    """Parse ERROR_CHECKING mode into deferred-checking interval
+
+    returns None for immediate checking, 0 for checkpoint-only
+    ('deferred') checking and N for 'every:N' checking
+    """
+    if not isinstance( mode, str ) or _debugOutput( mode ):
+        return None
+    if mode == 'deferred':
+        return 0
+    if mode.startswith( 'every:' ):
+        try:
+            interval = int( mode[6:] )
+        except ValueError:
+            raise ValueError( """Expected ERROR_CHECKING='every:N' with integer N, got %r"""%( mode, ))
+        if interval < 1:
+            raise ValueError( """ERROR_CHECKING='every:N' requires N >= 1, got %r"""%( mode, ))
+        return interval
+    raise ValueError( """Unrecognised ERROR_CHECKING mode %r"""%( mode, ))
+
+def _debugOutput( mode ):
+    """Parse ERROR_CHECKING mode into debug-output mode
+
+    returns None for glGetError-based checking, 'async' for 'debug'
+    and 'sync' for 'debug:sync'
+    """
+    if not isinstance( mode, str ) or mode.split(':')[0] != 'debug':
+        return None
+    if mode == 'debug':
+        return 'async'
+    if mode == 'debug:sync':
+        return 'sync'
+    raise ValueError( """Expected ERROR_CHECKING='debug' or 'debug:sync', got %r"""%( mode, ))
+
+DEBUG_OUTPUT = _debugOutput( _configflags.ERROR_CHECKING )
+DEFERRED_CHECKING = _deferredInterval( _configflags.ERROR_CHECKING )
+_DEFERRED_CHECKERS = []
+# (id, message) for GL_DEBUG_TYPE_ERROR messages reported by a synchronous
+# debug callback which have not yet been raised by the offending call
+_DEBUG_ERRORS = []
+# err for debug-output errors which left no glGetError flag set
+_GL_INVALID_OPERATION = 0x0502
+
+def checkpoint( ):
+    """Poll for GL errors which have been deferred since the last checkpoint
+
+    Only does anything if OpenGL.ERROR_CHECKING is 'deferred' or 'every:N',
+    raises GLError (with callRange set) if an error flag was set by
+    any of the calls made since the last checkpoint.
+
+    Note: glutSwapBuffers calls this automatically in the deferred modes.
+    """
+    for checker in _DEFERRED_CHECKERS:
+        checker.checkpoint()
+
 if _configflags.ERROR_CHECKING:
     from OpenGL import acceleratesupport
     _ErrorChecker = None
-    if acceleratesupport.ACCELERATE_AVAILABLE:
+    if (
+        acceleratesupport.ACCELERATE_AVAILABLE and 
+        DEFERRED_CHECKING is None and DEBUG_OUTPUT is None
+    ):
         try:
             from OpenGL_accelerate.errorchecker import _ErrorChecker
         except ImportError as err:
@@ -176,8 +255,21 @@ if _configflags.ERROR_CHECKING:
                 _registeredChecker -- the checking function enabled when 
                     not doing onBegin/onEnd processing
                 _currentChecker -- currently active checking function
+                _interval -- for deferred checking, number of calls 
+                    between automatic checkpoints (0 for none)
+                _pending -- for deferred checking, number of calls 
+                    made since the last checkpoint
+                _inBegin -- True between onBegin and onEnd, while 
+                    glGetError may not be called
+                checkPerCall -- if False the platform does not install 
+                    glCheckError as the errcheck of entry points (errors 
+                    are reported by the asynchronous debug callback)
             """
             _getErrors = None
+            checkPerCall = True
+            _pending = 0
+            _inBegin = False
+            _firstOperation = _lastOperation = None
             def __init__( self, platform, baseOperation=None, noErrorResult=0, errorClass=GLError ):
                 """Initialize from a platform module/reference"""
                 self._isValid = platform.CurrentContextIsValid
@@ -192,6 +284,21 @@ if _configflags.ERROR_CHECKING:
                 else:
                     self._registeredChecker = self.nullGetError
                 self._currentChecker = self._registeredChecker
+                # EGL errors are not sticky (eglGetError only reports the
+                # most recent call) so they can't be deferred...
+                if (
+                    DEFERRED_CHECKING is not None and self._getErrors and 
+                    not issubclass( errorClass, EGLError )
+                ):
+                    self._interval = DEFERRED_CHECKING
+                    self.glCheckError = self.deferredCheckError
+                    _DEFERRED_CHECKERS.append( self )
+                elif (
+                    DEBUG_OUTPUT is not None and self._getErrors and 
+                    not issubclass( errorClass, EGLError )
+                ):
+                    self.glCheckError = self.debugCheckError
+                    self.checkPerCall = DEBUG_OUTPUT == 'sync'
             def __bool__( self ):
                 """We are "true" if we actually do anything"""
                 if self._registeredChecker is self.nullGetError:
@@ -234,11 +341,77 @@ if _configflags.ERROR_CHECKING:
                         baseOperation = baseOperation,
                     )
                 return result
+            def deferredCheckError( 
+                self,
+                result,
+                baseOperation=None,
+                cArguments=None,
+                *args
+            ):
+                """Deferred-mode errcheck, records the call without a glGetError
+
+                Every self._interval calls (if non-0) does a checkpoint()
+                """
+                self._pending += 1
+                if self._pending == 1:
+                    self._firstOperation = baseOperation
+                self._lastOperation = baseOperation
+                if self._interval and self._pending >= self._interval:
+                    # >= as checkpoints inside glBegin/glEnd are skipped
+                    self.checkpoint()
+                return result
+            def debugCheckError( 
+                self,
+                result,
+                baseOperation=None,
+                cArguments=None,
+                *args
+            ):
+                """Debug-output errcheck, raises errors queued by a synchronous debug callback
+
+                Does not call glGetError unless the callback reported an 
+                error for this call (to retrieve and clear the error flag),
+                if no error flag is set err is GL_INVALID_OPERATION.  The 
+                driver's message id is kept in the description.
+                """
+                if _DEBUG_ERRORS:
+                    id,message = _DEBUG_ERRORS[0]
+                    del _DEBUG_ERRORS[:]
+                    err = self._currentChecker()
+                    if err == self._noErrorResult or err is None:
+                        err = _GL_INVALID_OPERATION
+                    raise self._errorClass(
+                        err,
+                        result,
+                        cArguments = cArguments,
+                        baseOperation = baseOperation,
+                        description = '%s (debug message id 0x%x)'%( message, id ),
+                    )
+                return result
+            def checkpoint( self ):
+                """Poll for an error raised by the calls since the last checkpoint
+
+                Does nothing if no calls are pending or we are inside 
+                a glBegin/glEnd pair (the calls stay pending).
+                """
+                if not self._pending or self._inBegin:
+                    return None
+                callRange = (self._firstOperation, self._lastOperation, self._pending)
+                self._pending = 0
+                self._firstOperation = self._lastOperation = None
+                err = self._currentChecker()
+                if err != self._noErrorResult and err is not None:
+                    error = self._errorClass( err )
+                    error.callRange = callRange
+                    raise error
+                return None
             def onBegin( self ):
                 """Called by glBegin to record the fact that glGetError won't work"""
+                self._inBegin = True
                 self._currentChecker = self.nullGetError
             def onEnd( self ):
                 """Called by glEnd to record the fact that glGetError will work"""
+                self._inBegin = False
                 self._currentChecker = self._registeredChecker
 else:
     _ErrorChecker = None
@@ -17,6 +17,7 @@ of a platform implementation.  See the various platform
 specific modules for examples to use when porting.
 """
 import os, sys
+from types import FunctionType
 from OpenGL.plugins import PlatformPlugin
 from OpenGL import _configflags
 
@@ -96,3 +97,75 @@ def createFunction( function, dll,extension, deprecated=False, error_checker=Non
         error_checker = error_checker,
         force_extension = force_extension or getattr(function,'force_extension',force_extension),
     )
+
+RESOLVE_PACKAGES = ('OpenGL.raw.GL','OpenGL.raw.GLU','OpenGL.raw.GLUT')
+
+def _null_pointers( modules ):
+    """Yield (module,pointer) for the unique _NullFunctionPointer instances in modules"""
+    from OpenGL.platform.baseplatform import _NullFunctionPointer
+    from OpenGL.wrapper import Wrapper
+    seen = set()
+    for module in modules:
+        for value in list(vars( module ).values()):
+            # only look through our own wrappers, arbitrary module values 
+            # (e.g. ctypes library loaders) have "magic" attribute lookup
+            if isinstance( value, Wrapper ):
+                wrapped = value.wrappedOperation
+            elif isinstance( value, FunctionType ):
+                wrapped = value.__dict__.get( 'wrappedOperation' )
+            else:
+                wrapped = None
+            for candidate in (value, wrapped):
+                if isinstance( candidate, _NullFunctionPointer ) and id(candidate) not in seen:
+                    seen.add( id(candidate) )
+                    yield module, candidate
+
+def resolve_all( modules=None ):
+    """Resolve every lazily-loaded entry point in the given modules in one pass
+
+    modules -- sequence of module objects and/or dotted package names,
+        names select every already-imported module in that package,
+        default RESOLVE_PACKAGES (the imported GL, GLU and GLUT
+        namespaces)
+
+    Entry points are normally resolved (via the platform's
+    getExtensionProcedure) on their first call, which makes the first
+    frames of an application stutter.  Calling this once a context
+    is current does all of the resolution up-front, after which calls
+    go straight to the ctypes function pointer.
+
+    Note: deprecated entry points (FORWARD_COMPATIBLE_ONLY) are never 
+    resolved and are reported as unavailable.
+
+    raises OpenGL.error.NoContext if there is no current context
+
+    returns (resolved, unavailable) sorted lists of qualified function 
+    names (module.function, e.g. 'OpenGL.raw.GL.ARB.imaging.glHistogram')
+    """
+    if not PLATFORM.GetCurrentContext():
+        from OpenGL import error
+        raise error.NoContext(
+            """resolve_all requires a current context to check extension availability"""
+        )
+    if modules is None:
+        modules = RESOLVE_PACKAGES
+    selected = []
+    for module in modules:
+        if isinstance( module, str ):
+            prefix = module + '.'
+            selected.extend([
+                loaded for (name,loaded) in list(sys.modules.items())
+                if loaded is not None and (name == module or name.startswith( prefix ))
+            ])
+        else:
+            selected.append( module )
+    resolved, unavailable = set(), set()
+    for module,pointer in _null_pointers( selected ):
+        name = '%s.%s'%( module.__name__, pointer.__name__ )
+        if pointer.deprecated:
+            unavailable.add( name )
+        elif pointer.resolved or pointer.load():
+            resolved.add( name )
+        else:
+            unavailable.add( name )
+    return sorted(resolved), sorted(unavailable)
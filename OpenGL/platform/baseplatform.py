@@ -108,7 +108,10 @@ class BasePlatform( object ):
     def errorChecking( self, func, dll, error_checker=None ):
         """Add error checking to the function if appropriate"""
         from OpenGL import error
-        if error_checker and _configflags.ERROR_CHECKING:
+        if (
+            error_checker and _configflags.ERROR_CHECKING and 
+            getattr( error_checker, 'checkPerCall', True )
+        ):
             #GLUT spec says error-checking is basically undefined...
             # there *may* be GL errors on GLUT calls that e.g. render 
             # geometry, but that's all basically "maybe" stuff...
@@ -126,6 +129,12 @@ class BasePlatform( object ):
     def wrapLogging( self, func ):
         """Wrap function with logging operations if appropriate"""
         return logs.logOnFail( func, logs.getLog( 'OpenGL.errors' ))
+    def wrapProfiling( self, func ):
+        """Wrap function with call-counting for OpenGL.profiler if appropriate"""
+        if _configflags.FRAME_PROFILING:
+            from OpenGL import profiler
+            return profiler.CountedFunction( func )
+        return func
     
     def finalArgType( self, typ ):
         """Retrieve a final type for arg-type"""
@@ -181,12 +190,12 @@ class BasePlatform( object ):
         func.DLL = dll
         func.extension = extension
         func.deprecated = deprecated
-        func = self.wrapLogging( 
+        func = self.wrapProfiling( self.wrapLogging( 
             self.wrapContextCheck(
                 self.errorChecking( func, dll, error_checker=error_checker ),
                 dll,
             )
-        )
+        ))
         if MODULE_ANNOTATIONS:
             if not module:
                 module = _find_module( )
@@ -322,24 +331,27 @@ class BasePlatform( object ):
         error_checker = None,
         force_extension = False,
     ):
-        """Construct a "null" function pointer"""
+        """Construct a "null" function pointer
+
+        All null functions share a single (__slots__) class, a per-function
+        class is only created when the function is resolved (see 
+        _NullFunctionPointer.load).
+        """
         if deprecated:
             base = _DeprecatedFunctionPointer
         else:
             base = _NullFunctionPointer
-        cls = type( functionName, (base,), {
-            '__doc__': doc,
-            'deprecated': deprecated,
-        } )
+        result = base(
+            functionName, dll, resultType, argTypes, argNames, extension=extension, doc=doc,
+            deprecated = deprecated,
+            error_checker = error_checker, force_extension=force_extension,
+        )
         if MODULE_ANNOTATIONS:
             if not module:
                 module = _find_module( )
             if module:
-                cls.__module__ = module
-        return cls(
-            functionName, dll, resultType, argTypes, argNames, extension=extension, doc=doc,
-            error_checker = error_checker, force_extension=force_extension,
-        )
+                result.__module__ = module
+        return result
     def GetCurrentContext( self ):
         """Retrieve opaque pointer for the current context"""
         raise NotImplementedError( 
@@ -357,14 +369,45 @@ class BasePlatform( object ):
     @lazy_property
     def OpenGL(self): return self.GL
 
+class _FunctionDoc( object ):
+    """__doc__ of null function pointers, the doc slot of the instance
+
+    Accessed on the class it is the class' own docstring, so the
+    implementation documentation stays available to help()/pydoc.
+    """
+    def __init__( self, classDoc ):
+        self.classDoc = classDoc
+    def __get__( self, instance, owner ):
+        if instance is None:
+            return self.classDoc
+        return instance.doc
+    def __set__( self, instance, doc ):
+        instance.doc = doc
+
 class _NullFunctionPointer( object ):
-    """Function-pointer-like object for undefined functions"""
+    """Function-pointer-like object for undefined functions
+
+    Unresolved functions are instances of this (shared) class, on 
+    resolution the instance's class is switched to a per-function 
+    (layout-compatible) subclass whose __call__ is the resolved 
+    ctypes function, so resolved calls do not pass through any 
+    Python-level code.  The instance __dict__ is only allocated if 
+    extra attributes (e.g. wrapper annotations) are set.
+
+    The function's own documentation is stored in the doc slot, 
+    instances report it as their __doc__ (see _FunctionDoc).
+    """
+    __doc__ = _FunctionDoc( __doc__ )
+    __slots__ = (
+        '__name__', 'DLL', 'argNames', 'argtypes', 'errcheck', 'restype',
+        'extension', 'doc', 'deprecated', 'error_checker', 'force_extension',
+        '__dict__',
+    )
     def __init__( 
         self, name, dll, resultType, argTypes, argNames, 
         extension=None, doc=None, deprecated=False,
         error_checker = None, force_extension=None,
     ):
-        from OpenGL import error
         self.__name__ = name
         self.DLL = dll
         self.argNames = argNames
@@ -377,6 +420,8 @@ class _NullFunctionPointer( object ):
         self.error_checker = error_checker
         self.force_extension = force_extension
     resolved = False
+    def __repr__( self ):
+        return '<%s.%s object at %s>'%( __name__, self.__name__, hex(id(self)) )
     def __nonzero__( self ):
         """Make this object appear to be NULL"""
         if (not self.resolved) and (self.extension or self.force_extension):
@@ -406,8 +451,12 @@ class _NullFunctionPointer( object ):
             return None 
         else:
             # now short-circuit so that we don't need to check again...
-            self.__class__.__call__ = staticmethod( func.__call__ )
-            self.resolved = True
+            self.__class__ = type( self.__name__, (self.__class__,), {
+                '__slots__': (),
+                '__doc__': _FunctionDoc( self.doc ),
+                '__call__': staticmethod( func.__call__ ),
+                'resolved': True,
+            })
             return func
         return None
     def __call__( self, *args, **named ):
@@ -427,7 +476,9 @@ class _NullFunctionPointer( object ):
                 )
 
 class _DeprecatedFunctionPointer( _NullFunctionPointer ):
-    deprecated = True
+    """Null function pointer for entry points removed in FORWARD_COMPATIBLE_ONLY mode"""
+    __doc__ = _FunctionDoc( __doc__ )
+    __slots__ = ()
     def __call__( self, *args, **named ):
         from OpenGL import error
         raise error.NullFunctionError(
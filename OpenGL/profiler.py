@@ -0,0 +1,310 @@
+"""Frame-phase profiling for interactive (e.g. GLUT) render loops
+
+A FrameProfiler keeps ring buffers of per-frame timings for named
+phases of the application's frame (simulation, scene, text, swap...)
+and of the number of GL calls made in each frame:
+
+    from OpenGL.profiler import PROFILER
+
+    def display():
+        with PROFILER.phase( 'scene' ):
+            drawScene()
+        with PROFILER.phase( 'swap' ):
+            glutSwapBuffers()
+        PROFILER.endFrame()
+    ...
+    PROFILER.dump( 'profile.json' ) # p50/p95/p99 statistics
+
+Phases may nest, time spent in an inner phase is not charged to the
+outer one.  GL call counts are only collected when OpenGL.FRAME_PROFILING
+(environment PYOPENGL_FRAME_PROFILING=1) is set before OpenGL.GL (GLU,
+GLUT...) is imported: BasePlatform.constructFunction then wraps each
+entry point in a CountedFunction, which tallies calls by name in CALLS.
+Calls made from the profiler's own overlay are counted as well.  With
+OpenGL.COPY_STATS set, endFrame also ends the frame of the array-copy
+accounting in OpenGL.arrays.copystats, and the statistics include its
+top offenders.
+"""
+import json, math, time
+from array import array
+from collections import deque, OrderedDict
+from OpenGL import _configflags
+
+__all__ = [
+    'CALLS',
+    'CountedFunction',
+    'FrameProfiler',
+    'PROFILER',
+]
+
+# map from entry-point name to number of calls (when FRAME_PROFILING)
+CALLS = {}
+
+class CountedFunction( object ):
+    """Proxy for a platform function which counts its calls in CALLS"""
+    def __init__( self, base ):
+        self.__dict__[''] = base
+        self.__dict__['__name__'] = base.__name__
+    def __setattr__( self, key, value ):
+        if key != '':
+            setattr( self.__dict__[''], key, value )
+        else:
+            self.__dict__[''] = value
+    def __getattr__( self, key ):
+        if key == '':
+            return self.__dict__['']
+        return getattr( self.__dict__[''], key )
+    def __call__( self, *args, **named ):
+        attributes = self.__dict__
+        name = attributes['__name__']
+        CALLS[name] = CALLS.get( name, 0 ) + 1
+        return attributes['']( *args, **named )
+
+class _Phase( object ):
+    """Context manager produced by FrameProfiler.phase"""
+    __slots__ = ('profiler','name')
+    def __init__( self, profiler, name ):
+        self.profiler = profiler
+        self.name = name
+    def __enter__( self ):
+        self.profiler.begin( self.name )
+        return self
+    def __exit__( self, *args ):
+        self.profiler.end()
+
+def _percentiles( values, scale=1.0 ):
+    """Nearest-rank p50/p95/p99 (plus mean and max) of values, times scale"""
+    if not values:
+        return None
+    ordered = sorted( values )
+    count = len(ordered)
+    result = OrderedDict()
+    for percent in (50,95,99):
+        rank = max( 0, int( math.ceil( percent/100.0 * count )) - 1 )
+        result['p%d'%(percent,)] = ordered[rank] * scale
+    result['mean'] = sum( ordered ) / float(count) * scale
+    result['max'] = ordered[-1] * scale
+    return result
+
+class FrameProfiler( object ):
+    """Ring-buffered per-phase frame timings and GL call counts
+
+    Attributes:
+
+        size -- number of frames kept in the ring buffers
+        frames -- deque of frame intervals (seconds between endFrame
+            calls, i.e. including any time spent waiting), newest last
+        phases -- OrderedDict of phase name to deque of per-frame phase
+            durations (seconds), aligned with frames
+        calls -- deque of counted entry-point calls per frame
+        frameCount -- number of frames ended since the last reset
+        clock -- timer used for all measurements
+        COLORS -- overlay colours, assigned to phases in order of appearance
+    """
+    clock = staticmethod( time.perf_counter )
+    COLORS = [
+        (0.2,0.6,1.0), (0.3,0.9,0.3), (1.0,0.8,0.2), (1.0,0.3,0.3),
+        (0.8,0.4,1.0), (0.3,0.9,0.9), (1.0,0.6,0.8), (0.7,0.7,0.7),
+    ]
+    def __init__( self, size=600 ):
+        self.size = size
+        self.reset()
+    def reset( self ):
+        """Discard all timings and restart call counting from now"""
+        self.frames = deque( maxlen=self.size )
+        self.phases = OrderedDict()
+        self.calls = deque( maxlen=self.size )
+        self.frameCount = 0
+        self.frameStart = None
+        self.current = {}
+        self.stack = []
+        self.callBase = dict( CALLS )
+        self.callTotal = sum( CALLS.values() )
+    def begin( self, name ):
+        """Start timing phase name (pausing the enclosing phase, if any)"""
+        now = self.clock()
+        if self.frameStart is None:
+            self.frameStart = now
+        stack = self.stack
+        if stack:
+            outer = stack[-1]
+            self.current[outer[0]] = self.current.get( outer[0], 0.0 ) + now - outer[1]
+        stack.append( [name,now] )
+    def end( self ):
+        """Stop timing the innermost phase (resuming the enclosing phase)"""
+        now = self.clock()
+        stack = self.stack
+        name,started = stack.pop()
+        self.current[name] = self.current.get( name, 0.0 ) + now - started
+        if stack:
+            stack[-1][1] = now
+    def phase( self, name ):
+        """Context manager timing its body as phase name"""
+        return _Phase( self, name )
+    def wrap( self, name, function ):
+        """Wrap function so that each call is timed as phase name"""
+        def profiled( *args, **named ):
+            self.begin( name )
+            try:
+                return function( *args, **named )
+            finally:
+                self.end()
+        profiled.__name__ = getattr( function, '__name__', name )
+        profiled.__doc__ = getattr( function, '__doc__', None )
+        return profiled
+    def endFrame( self ):
+        """Close the current frame, recording its phase timings and calls"""
+        now = self.clock()
+        current = self.current
+        for record in self.stack:
+            # still-open phases continue into the next frame
+            current[record[0]] = current.get( record[0], 0.0 ) + now - record[1]
+            record[1] = now
+        if self.frameStart is None:
+            self.frameStart = now
+        self.frames.append( now - self.frameStart )
+        phases = self.phases
+        for name in current:
+            if name not in phases:
+                phases[name] = deque( [0.0]*(len(self.frames)-1), maxlen=self.size )
+        for name,ring in phases.items():
+            ring.append( current.get( name, 0.0 ) )
+        total = sum( CALLS.values() )
+        self.calls.append( total - self.callTotal )
+        self.callTotal = total
+        current.clear()
+        self.frameStart = now
+        self.frameCount += 1
+        if _configflags.COPY_STATS:
+            from OpenGL.arrays import copystats
+            copystats.STATS.endFrame()
+    def colorFor( self, name ):
+        """Overlay colour of phase name"""
+        names = list( self.phases )
+        index = names.index( name ) if name in names else len(names)
+        return self.COLORS[ index % len(self.COLORS) ]
+    def statistics( self, top=10 ):
+        """Percentile statistics of the buffered frames (JSON-compatible)
+
+        Times are reported in milliseconds, busy is the sum of the
+        phases for each frame, top_functions is the top entries of
+        CALLS (since the last reset) by count, top_copies the top
+        array conversions by bytes (None unless COPY_STATS).
+        """
+        busy = [
+            sum( values ) for values in zip( *self.phases.values() )
+        ] if self.phases else []
+        counting = bool( _configflags.FRAME_PROFILING )
+        base = self.callBase
+        functions = sorted(
+            [
+                (count - base.get( name, 0 ), name)
+                for (name,count) in CALLS.items()
+                if count > base.get( name, 0 )
+            ],
+            reverse=True,
+        )[:top]
+        result = OrderedDict()
+        result['frames'] = self.frameCount
+        result['window'] = len(self.frames)
+        result['frame_ms'] = _percentiles( self.frames, 1000.0 )
+        result['busy_ms'] = _percentiles( busy, 1000.0 )
+        result['phases_ms'] = OrderedDict([
+            (name,_percentiles( ring, 1000.0 ))
+            for (name,ring) in self.phases.items()
+        ])
+        result['call_counting'] = counting
+        result['calls_per_frame'] = _percentiles( self.calls ) if counting else None
+        result['top_functions'] = [
+            OrderedDict([('name',name),('calls',count)])
+            for (count,name) in functions
+        ]
+        if _configflags.COPY_STATS:
+            from OpenGL.arrays import copystats
+            result['top_copies'] = copystats.STATS.top( top )
+        else:
+            result['top_copies'] = None
+        return result
+    def dump( self, filename, top=10 ):
+        """Write statistics( top ) to filename as JSON"""
+        with open( filename, 'w' ) as target:
+            json.dump( self.statistics( top ), target, indent=2 )
+            target.write( '\n' )
+    def drawOverlay( self, x, y, width, height, window=None, scale=1.0/30 ):
+        """Draw a stacked per-phase graph of the most recent frames
+
+        x,y,width,height -- graph rectangle in window coordinates, one
+            pixel column per frame (newest on the right)
+        window -- (width,height) of the window, defaults to the viewport
+        scale -- frame time (seconds) mapped to the full graph height,
+            a line is drawn at 1/60s
+        """
+        from OpenGL.GL.VERSION import GL_1_1 as full
+        from OpenGL.raw.GL.VERSION import GL_1_1 as _simple
+        import ctypes
+        self.begin( 'overlay' )
+        try:
+            if window is None:
+                window = [int(v) for v in full.glGetIntegerv( full.GL_VIEWPORT )][2:]
+            count = min( int(width), len(self.frames) )
+            pixels = height / float( scale )
+            values = []
+            # background, then one vertical line segment per frame and phase
+            background = [
+                x,y,0.,0.,0.,.5, x+width,y,0.,0.,0.,.5,
+                x+width,y+height,0.,0.,0.,.5, x,y+height,0.,0.,0.,.5,
+            ]
+            rings = [
+                (list( ring )[-count:] if count else [], self.colorFor( name ))
+                for (name,ring) in self.phases.items()
+            ]
+            left = x + width - count + .5
+            bottoms = [y]*count
+            for ring,(r,g,b) in rings:
+                for i,value in enumerate( ring ):
+                    bottom = bottoms[i]
+                    top = min( bottom + value*pixels, y + height )
+                    values.extend( (left+i,bottom,r,g,b,1.,left+i,top,r,g,b,1.) )
+                    bottoms[i] = top
+            budget = y + min( height, pixels/60.0 )
+            values.extend( (x,budget,1.,1.,1.,1.,x+width,budget,1.,1.,1.,1.) )
+            data = array( 'f', background + values )
+            base = data.buffer_info()[0]
+            _simple.glPushAttrib(
+                full.GL_ENABLE_BIT|full.GL_CURRENT_BIT|full.GL_COLOR_BUFFER_BIT|full.GL_TRANSFORM_BIT
+            )
+            _simple.glPushClientAttrib( full.GL_CLIENT_VERTEX_ARRAY_BIT )
+            try:
+                for cap in (
+                    full.GL_LIGHTING, full.GL_DEPTH_TEST, full.GL_TEXTURE_2D,
+                    full.GL_FOG, full.GL_CULL_FACE,
+                ):
+                    _simple.glDisable( cap )
+                _simple.glEnable( full.GL_BLEND )
+                _simple.glBlendFunc( full.GL_SRC_ALPHA, full.GL_ONE_MINUS_SRC_ALPHA )
+                _simple.glMatrixMode( full.GL_PROJECTION )
+                _simple.glPushMatrix()
+                _simple.glLoadIdentity()
+                _simple.glOrtho( 0, window[0], 0, window[1], -1, 1 )
+                _simple.glMatrixMode( full.GL_MODELVIEW )
+                _simple.glPushMatrix()
+                _simple.glLoadIdentity()
+                try:
+                    _simple.glEnableClientState( full.GL_VERTEX_ARRAY )
+                    _simple.glEnableClientState( full.GL_COLOR_ARRAY )
+                    _simple.glVertexPointer( 2, full.GL_FLOAT, 24, ctypes.c_void_p( base ) )
+                    _simple.glColorPointer( 4, full.GL_FLOAT, 24, ctypes.c_void_p( base + 8 ) )
+                    full.glDrawArrays( full.GL_QUADS, 0, 4 )
+                    full.glDrawArrays( full.GL_LINES, 4, len(values)//6 )
+                finally:
+                    _simple.glPopMatrix()
+                    _simple.glMatrixMode( full.GL_PROJECTION )
+                    _simple.glPopMatrix()
+                    _simple.glMatrixMode( full.GL_MODELVIEW )
+            finally:
+                _simple.glPopClientAttrib()
+                _simple.glPopAttrib()
+        finally:
+            self.end()
+
+PROFILER = FrameProfiler()
@@ -1,8 +1,9 @@
 """The wrapping code for providing natural ctypes-based OpenGL interface"""
-import ctypes, logging
+import ctypes, logging, linecache
 from OpenGL import platform, error
 assert platform
 from OpenGL._configflags import STORE_POINTERS, ERROR_ON_COPY, SIZE_1_ARRAY_UNPACK
+from OpenGL._configflags import GENERATED_WRAPPERS
 from OpenGL import converters
 from OpenGL.converters import DefaultCConverter
 from OpenGL.converters import returnCArgument,returnPyArgument
@@ -42,6 +43,152 @@ def none_or_pass( incoming, function, arguments ):
     return incoming
 none_or_pass.optional=True
 
+def _argumentCountError( wrapper, required, args ):
+    """Produce the ValueError for too few Python arguments to wrapper"""
+    return ValueError(
+        """%s requires %r arguments (%s), received %s: %r"""%(
+            wrapper.wrappedOperation.__name__,
+            required,
+            ", ".join( wrapper.pyConverterNames ),
+            len(args),
+            args
+        )
+    )
+
+def _tupleSource( names ):
+    """Source for a tuple of the given variable names"""
+    if not names:
+        return '()'
+    return '(%s,)'%( ", ".join( names ))
+
+# map from converter layout: compiled factory producing wrapperCall
+_GENERATED_FACTORIES = {}
+
+def generatedFactory( layout ):
+    """Retrieve (compiling if necessary) the wrapperCall factory for layout
+
+    layout -- (pyLayout, pyRequired, cLayout, rLayout, storeValues, returnValues)
+        where pyLayout is a tuple of (converter is None) per pyConverter,
+        pyRequired the count of non-optional pyConverters, cLayout
+        a tuple of (callable(converter)) per cConverter, rLayout a tuple
+        of (resolver is None) per cResolver and the last two are
+        booleans, see Wrapper.generatedCall
+
+    The generated code is straight-line, calling each converter by
+    index, so a call does no looping, generator or tuple creation save
+    for the tuples the converters/storeValues/returnValues receive
+    and the error annotations (which are only built on failure).
+    """
+    factory = _GENERATED_FACTORIES.get( layout )
+    if factory is not None:
+        return factory
+    pyLayout, pyRequired, cLayout, rLayout, store, ret = layout
+    lines = [
+        'def factory( wrappedOperation, self, pyConverters, cConverters, cResolvers, storeValues, returnValues ):',
+    ]
+    w = lines.append
+    for i,isNone in enumerate( pyLayout ):
+        if not isNone:
+            w( '    pc%d = pyConverters[%d]'%( i,i ))
+    for i in range( len( cLayout )):
+        w( '    cc%d = cConverters[%d]'%( i,i ))
+    for i,isNone in enumerate( rLayout ):
+        if not isNone:
+            w( '    cr%d = cResolvers[%d]'%( i,i ))
+    w( '    def wrapperCall( *args ):' )
+    # pyArgs stage, names are None for "use args itself"
+    pyNames = cNames = rNames = None
+    pyArgs = cArgs = 'args'
+    if pyLayout:
+        if pyRequired:
+            w( '        if %d > len(args):'%( pyRequired, ))
+            w( '            raise _argumentCountError( self, %d, args )'%( pyRequired, ))
+        pyNames = []
+        for i,isNone in enumerate( pyLayout ):
+            if isNone:
+                w( '        p%d = args[%d]'%( i,i ))
+            else:
+                w( '        try:' )
+                w( '            p%d = pc%d( args[%d], self, args )'%( i,i,i ))
+                w( '        except IndexError as err:' )
+                w( '            p%d = NULL'%( i, ))
+                w( '        except Exception as err:' )
+                w( '            if hasattr( err, "args" ):' )
+                w( '                err.args += ( pc%d, )'%( i, ))
+                w( '            raise' )
+            pyNames.append( 'p%d'%( i, ))
+        pyArgs = _tupleSource( pyNames )
+        if (cLayout and True in cLayout) or store or ret:
+            w( '        pyArgs = %s'%( pyArgs, ))
+            pyArgs = 'pyArgs'
+    cNames, cArgs = pyNames, pyArgs
+    if cLayout:
+        cNames = []
+        for i,canCall in enumerate( cLayout ):
+            if canCall:
+                w( '        try:' )
+                w( '            c%d = cc%d( %s, %d, self )'%( i,i,pyArgs,i ))
+                w( '        except Exception as err:' )
+                w( '            if hasattr( err, "args" ):' )
+                w( '                err.args += ( """Failure in cConverter %%r"""%%( cc%d, ), %s, %d, self )'%( i,pyArgs,i ))
+                w( '            raise' )
+                cNames.append( 'c%d'%( i, ))
+            else:
+                cNames.append( 'cc%d'%( i, ))
+        cArgs = _tupleSource( cNames )
+        if store or ret:
+            w( '        cArgs = %s'%( cArgs, ))
+            cArgs = 'cArgs'
+    rNames = cNames
+    if rLayout:
+        rNames = []
+        for i,isNone in enumerate( rLayout ):
+            source = cNames[i] if cNames is not None else 'args[%d]'%( i, )
+            if isNone:
+                rNames.append( source )
+            else:
+                w( '        try:' )
+                w( '            r%d = cr%d( %s )'%( i,i,source ))
+                w( '        except Exception as err:' )
+                w( '            err.args += ( cr%d, )'%( i, ))
+                w( '            raise' )
+                rNames.append( 'r%d'%( i, ))
+    if rNames is None:
+        call, cArguments = '*args', 'args'
+    else:
+        call, cArguments = ", ".join( rNames ), _tupleSource( rNames )
+    w( '        try:' )
+    w( '            result = wrappedOperation( %s )'%( call, ))
+    w( '        except ArgumentError as err:' )
+    w( '            err.args = err.args + ( %s, )'%( cArguments, ))
+    w( '            raise err' )
+    w( '        except GLError as err:' )
+    w( '            err.cArgs = %s'%( cArgs, ))
+    w( '            err.pyArgs = %s'%( pyArgs, ))
+    w( '            raise err' )
+    if store:
+        w( '        storeValues( result, self, %s, %s )'%( pyArgs, cArgs ))
+    if ret:
+        w( '        return returnValues( result, self, %s, %s )'%( pyArgs, cArgs ))
+    else:
+        w( '        return result' )
+    w( '    return wrapperCall' )
+    source = "\n".join( lines ) + "\n"
+    filename = '<OpenGL.wrapper generated %s>'%( len( _GENERATED_FACTORIES ), )
+    # register the source so tracebacks through generated code are readable
+    linecache.cache[filename] = ( len(source), None, source.splitlines( True ), filename )
+    namespace = {
+        'NULL': NULL,
+        'ArgumentError': ctypes.ArgumentError,
+        'GLError': error.GLError,
+        '_argumentCountError': _argumentCountError,
+    }
+    exec( compile( source, filename, 'exec' ), namespace )
+    factory = namespace['factory']
+    factory.source = source
+    _GENERATED_FACTORIES[layout] = factory
+    return factory
+
 class Wrapper( LateBind ):
     """Wrapper around a ctypes cFunction object providing SWIG-like hooks
 
@@ -405,6 +552,30 @@ class Wrapper( LateBind ):
             self.setFinalCall( callFunction )
             return callFunction
         #return self
+    def generatedCall( self ):
+        """Produce a compiled straight-line __call__ for this wrapper's converter layout
+
+        The compiled factory is cached by layout (see generatedFactory), so
+        wrappers with the same argument-conversion "shape" share code.
+        """
+        pyConverters = getattr( self, 'pyConverters', None ) or ()
+        cConverters = getattr( self, 'cConverters', None ) or ()
+        cResolvers = getattr( self, 'cResolvers', None ) or ()
+        storeValues = getattr( self, 'storeValues', None )
+        returnValues = getattr( self, 'returnValues', None )
+        layout = (
+            tuple([converter is None for converter in pyConverters]),
+            len([p for p in pyConverters if not getattr( p, 'optional', False)]),
+            tuple([hasattr( converter, '__call__' ) for converter in cConverters]),
+            tuple([converter is None for converter in cResolvers]),
+            bool( storeValues ),
+            bool( returnValues ),
+        )
+        return generatedFactory( layout )(
+            self.wrappedOperation, self,
+            pyConverters, cConverters, cResolvers,
+            storeValues, returnValues,
+        )
     def finaliseCall( self ):
         """Produce specialised versions of call for finalised wrapper object
 
@@ -412,8 +583,12 @@ class Wrapper( LateBind ):
         required by the particular wrapper object
 
         This is essentially a huge set of expanded nested functions, very
-        inelegant...
+        inelegant...  Without OpenGL_accelerate the generated straight-line 
+        version from generatedCall is normally used instead (see the 
+        GENERATED_WRAPPERS flag).
         """
+        if GENERATED_WRAPPERS and not cWrapper:
+            return self.generatedCall()
         pyConverters = getattr( self, 'pyConverters', None )
         cConverters = getattr( self, 'cConverters', None )
         cResolvers = getattr( self, 'cResolvers', None )
@@ -0,0 +1,73 @@
+#! /usr/bin/env python
+"""Microbenchmark of array-handler dispatch in the argument converters
+
+Times (min of repeats) and counts the Python-level calls (cProfile) of
+the converters which turn a numpy array argument into the array passed
+to ctypes:
+
+    glVertexPointer pointer converter (AsArrayOfType)
+    glUniformMatrix4fv value converter (asArrayType)
+    glDrawElementsus indices/count converters (AsArrayTyped/Size)
+    GLfloatArray.asArray and GLfloatArray.from_param
+
+No GL context is needed, only the converters are called.  Run it on a
+checkout from before and after a dispatch change to compare, e.g.:
+
+    PYTHONPATH=. python benchmarks/array_dispatch.py --number 100000 --repeat 15
+"""
+import argparse, cProfile, pstats, timeit
+import numpy
+from OpenGL import GL
+from OpenGL.arrays import arraydatatype
+
+def converter( function, name, kind='pyConverters' ):
+    """Retrieve the named (Python or C) argument converter of a wrapper"""
+    function.finalise()
+    converters = getattr( function, kind )
+    if kind == 'pyConverters':
+        return converters[ function.pyConverterNames.index( name ) ]
+    return converters[ list( function.wrappedOperation.argNames ).index( name ) ]
+
+def cases( ):
+    """Produce (name, callable) for each benchmarked conversion"""
+    vertices = numpy.zeros( (1000,3), 'f' )
+    matrix = numpy.identity( 4, 'f' )
+    indices = numpy.arange( 600, dtype='H' )
+    pointer = converter( GL.glVertexPointer, 'pointer' )
+    pointerArgs = (3, GL.GL_FLOAT, 0, vertices)
+    value = converter( GL.glUniformMatrix4fv, 'value' )
+    valueArgs = (0, 1, GL.GL_FALSE, matrix)
+    typed = converter( GL.glDrawElementsus, 'indices' )
+    size = converter( GL.glDrawElementsus, 'count', 'cConverters' )
+    elementArgs = (GL.GL_TRIANGLES, indices)
+    return [
+        ('glVertexPointer pointer', lambda: pointer( vertices, GL.glVertexPointer, pointerArgs )),
+        ('glUniformMatrix4fv value', lambda: value( matrix, GL.glUniformMatrix4fv, valueArgs )),
+        ('glDrawElementsus indices', lambda: typed( indices, GL.glDrawElementsus, elementArgs )),
+        ('glDrawElementsus count', lambda: size( elementArgs, 1, GL.glDrawElementsus )),
+        ('GLfloatArray.asArray', lambda: arraydatatype.GLfloatArray.asArray( matrix )),
+        ('GLfloatArray.from_param', lambda: arraydatatype.GLfloatArray.from_param( matrix )),
+    ]
+
+def calls( function ):
+    """Number of Python-level calls made by one call of function"""
+    profile = cProfile.Profile()
+    profile.enable()
+    function()
+    profile.disable()
+    # do not count the benchmark's own lambda
+    return pstats.Stats( profile ).total_calls - 1
+
+def main( ):
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[0] )
+    parser.add_argument( '--number', type=int, default=100000, help='calls per repeat' )
+    parser.add_argument( '--repeat', type=int, default=15, help='repeats (the minimum is reported)' )
+    options = parser.parse_args()
+    print( '%-28s %10s %6s'%( 'conversion', 'ns/call', 'calls' ))
+    for name,function in cases():
+        function() # warm the handler caches
+        best = min( timeit.repeat( function, number=options.number, repeat=options.repeat ))
+        print( '%-28s %10.0f %6d'%( name, best/options.number*1e9, calls( function )))
+
+if __name__ == "__main__":
+    main()
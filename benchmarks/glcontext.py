@@ -0,0 +1,44 @@
+"""Create a GL context for the benchmarks which need one
+
+With PYOPENGL_PLATFORM=egl an off-screen pbuffer context is created
+(e.g. EGL_PLATFORM=surfaceless for headless machines), otherwise a
+GLUT window, which requires a display.
+"""
+import ctypes, os
+
+def createContext( width=64, height=64 ):
+    """Create and make current a GL context of the given (surface) size"""
+    if os.environ.get( 'PYOPENGL_PLATFORM' ) == 'egl':
+        return _eglContext( width, height )
+    return _glutContext( width, height )
+
+def _eglContext( width, height ):
+    from OpenGL import EGL
+    display = EGL.eglGetDisplay( EGL.EGL_DEFAULT_DISPLAY )
+    major, minor = EGL.EGLint(), EGL.EGLint()
+    EGL.eglInitialize( display, ctypes.pointer( major ), ctypes.pointer( minor ))
+    attributes = [
+        EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+        EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+        EGL.EGL_DEPTH_SIZE, 24,
+        EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+        EGL.EGL_NONE,
+    ]
+    attributes = (EGL.EGLint*len(attributes))( *attributes )
+    config, count = EGL.EGLConfig(), EGL.EGLint()
+    EGL.eglChooseConfig( display, attributes, ctypes.pointer( config ), 1, ctypes.pointer( count ))
+    size = (EGL.EGLint*5)( EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE )
+    surface = EGL.eglCreatePbufferSurface( display, config, size )
+    EGL.eglBindAPI( EGL.EGL_OPENGL_API )
+    context = EGL.eglCreateContext( display, config, EGL.EGL_NO_CONTEXT, None )
+    EGL.eglMakeCurrent( display, surface, surface, context )
+    return context
+
+def _glutContext( width, height ):
+    from OpenGL import GLUT
+    GLUT.glutInit()
+    GLUT.glutInitDisplayMode( GLUT.GLUT_RGBA | GLUT.GLUT_DEPTH | GLUT.GLUT_DOUBLE )
+    GLUT.glutInitWindowSize( width, height )
+    window = GLUT.glutCreateWindow( b'benchmark' )
+    GLUT.glutHideWindow()
+    return window
@@ -0,0 +1,61 @@
+#! /usr/bin/env python
+"""Benchmark of converting Python sequences to GL_FLOAT arrays
+
+Compares, for N xyz vertices given as a flat list, a list of lists, a
+tuple of tuples and a numpy array:
+
+    packed -- ListHandler.packedArray, the bulk fast path
+    copied -- ListHandler.copiedArray, the element-by-element path
+        (which ragged/non-numeric input still takes)
+    asArray -- GLfloatArray.asArray, i.e. the handler dispatch plus
+        whichever path applies (numpy arrays need no copy)
+
+and checks that the packed and copied results are byte-identical.  No
+GL context is needed:
+
+    PYTHONPATH=. python benchmarks/list_packing.py --count 10000
+"""
+import argparse, ctypes, timeit
+import numpy
+from OpenGL.arrays import arraydatatype
+from OpenGL.arrays.lists import ListHandler
+from OpenGL.raw.GL import _types
+
+def inputs( count ):
+    """Produce (name, value) for each benchmarked input of count vertices"""
+    vertices = numpy.random.RandomState( 1 ).rand( count, 3 ).astype( 'f' )
+    nested = vertices.tolist()
+    return [
+        ('flat list', vertices.ravel().tolist()),
+        ('list of lists', nested),
+        ('tuple of tuples', tuple( [tuple( vertex ) for vertex in nested] )),
+        ('numpy array', vertices),
+    ]
+
+def best( function, repeat ):
+    """Best time of repeat calls of function in milliseconds"""
+    return min( timeit.repeat( function, number=1, repeat=repeat )) * 1000.0
+
+def main( ):
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[0] )
+    parser.add_argument( '--count', type=int, default=10000, help='number of vertices' )
+    parser.add_argument( '--repeat', type=int, default=5, help='repeats (the minimum is reported)' )
+    options = parser.parse_args()
+    arrayType = _types.GLfloat
+    print( '%-16s %10s %10s %10s %8s'%( 'input', 'packed ms', 'copied ms', 'asArray ms', 'same' ))
+    for name,value in inputs( options.count ):
+        asArray = best( lambda: arraydatatype.GLfloatArray.asArray( value ), options.repeat )
+        if isinstance( value, numpy.ndarray ):
+            print( '%-16s %10s %10s %10.3f %8s'%( name, '-', '-', asArray, '-' ))
+            continue
+        packed = best( lambda: ListHandler.packedArray( value, arrayType ), options.repeat )
+        copied = best( lambda: ListHandler.copiedArray( value, arrayType ), options.repeat )
+        same = ctypes.string_at(
+            ListHandler.packedArray( value, arrayType ), options.count*12
+        ) == ctypes.string_at(
+            ListHandler.copiedArray( value, arrayType ), options.count*12
+        )
+        print( '%-16s %10.3f %10.3f %10.3f %8s'%( name, packed, copied, asArray, same ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#! /usr/bin/env python
+"""Benchmark of gluProjectArray/gluUnProjectArray against per-point GLU calls
+
+Projects (and unprojects) N random points with a perspective and a
+modelview matrix, once with a gluProject/gluUnProject call per point
+and once with the vectorised array functions, and reports the times
+and the largest difference between the results.  The matrices and
+viewport are passed explicitly, so no GL context is needed:
+
+    PYTHONPATH=. python benchmarks/projection.py --count 5000
+"""
+import argparse, timeit
+import numpy
+from OpenGL.GLU import gluProject, gluUnProject
+from OpenGL.GLU.projection import gluProjectArray, gluUnProjectArray
+from OpenGL.GLU import matrixstack
+
+def best( function, repeat ):
+    """Best time of repeat calls of function in milliseconds"""
+    return min( timeit.repeat( function, number=1, repeat=repeat )) * 1000.0
+
+def main( ):
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[0] )
+    parser.add_argument( '--count', type=int, default=5000, help='number of points' )
+    parser.add_argument( '--repeat', type=int, default=5, help='repeats (the minimum is reported)' )
+    options = parser.parse_args()
+    proj = matrixstack.perspective( 45.0, 1.25, 0.1, 100.0 )
+    model = numpy.dot(
+        matrixstack.rotation( 30.0, 0.0, 1.0, 0.0 ), matrixstack.translation( 0.0, 0.0, -20.0 ),
+    )
+    view = numpy.array( (0,0,1000,800), dtype='i' )
+    random = numpy.random.RandomState( 1 )
+    points = random.uniform( -5.0, 5.0, (options.count,3) )
+    windows = numpy.column_stack( (
+        random.uniform( 0, 1000, options.count ),
+        random.uniform( 0, 800, options.count ),
+        random.uniform( 0.1, 0.9, options.count ),
+    ))
+    cases = [
+        (
+            'project', points,
+            lambda: [gluProject( x,y,z, model, proj, view ) for (x,y,z) in points],
+            lambda: gluProjectArray( points, model, proj, view ),
+        ),
+        (
+            'unproject', windows,
+            lambda: [gluUnProject( x,y,z, model, proj, view ) for (x,y,z) in windows],
+            lambda: gluUnProjectArray( windows, model, proj, view ),
+        ),
+    ]
+    print( '%-10s %10s %10s %8s %12s %12s'%( 'operation', 'loop ms', 'array ms', 'speedup', 'max abs diff', 'max rel diff' ))
+    for name,values,loop,vectorised in cases:
+        looped = best( loop, options.repeat )
+        array = best( vectorised, options.repeat )
+        expected = numpy.array( loop() )
+        difference = numpy.abs( vectorised() - expected )
+        relative = difference / numpy.maximum( numpy.abs( expected ), 1e-12 )
+        print( '%-10s %10.2f %10.3f %8.0f %12.2g %12.2g'%(
+            name, looped, array, looped/array, difference.max(), relative.max(),
+        ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#! /usr/bin/env python
+"""Per-frame OpenGL.GL.statecache hit rate while rendering bracuMario
+
+Loads bracuMario with the state-shadowing entry points of
+OpenGL.GL.statecache in place of the standard ones (as
+"from OpenGL.GL.statecache import *" after its other imports would),
+then runs the simulation and renders its 3D scene (draw_scene, which
+calls the static-world display list, i.e. everything but the GLUT
+bitmap-font HUD) for a number of frames.  Reports the calls elided
+(hits) and passed to the GL (misses) per frame, and the GL state
+calls made per frame with and without the cache.
+
+Needs a GL context, see glcontext.py, e.g.:
+
+    PYOPENGL_PLATFORM=egl EGL_PLATFORM=surfaceless \\
+        PYTHONPATH=. python benchmarks/statecache_frames.py --frames 600
+"""
+import argparse, random, sys
+import glcontext
+
+def main( ):
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[0] )
+    parser.add_argument( '--frames', type=int, default=600, help='frames rendered' )
+    parser.add_argument( '--seed', type=int, default=7, help='random seed of the game' )
+    options = parser.parse_args()
+    glcontext.createContext( 1000, 800 )
+    sys.argv = sys.argv[:1]
+    import bracuMario as game
+    from OpenGL.GL import statecache
+    for name in statecache.__all__:
+        if hasattr( game, name ):
+            setattr( game, name, getattr( statecache, name ))
+    rng = random.Random( options.seed )
+    random.seed( options.seed )
+    game.init_gl()
+    game.restart_game()
+    cache = statecache.currentCache()
+    cache.hits = cache.misses = 0
+    hits = []
+    misses = []
+    for frame in range( options.frames ):
+        game.random_input( rng )
+        game.simulation_step()
+        game.interpolate_view( 1.0 )
+        before = (cache.hits, cache.misses)
+        game.draw_scene()
+        hits.append( cache.hits - before[0] )
+        misses.append( cache.misses - before[1] )
+    game.glFinish()
+    frames = float( options.frames )
+    total = sum( hits ) + sum( misses )
+    print( 'frames:                  %d'%( options.frames, ))
+    print( 'shadowed calls/frame:    %.1f'%( total/frames, ))
+    print( 'elided (hits)/frame:     %.1f'%( sum( hits )/frames, ))
+    print( 'passed (misses)/frame:   %.1f'%( sum( misses )/frames, ))
+    print( 'hit rate:                %.1f%%'%( 100.0*sum( hits )/max( total, 1 ), ))
+    print( 'display lists recorded:  %s'%( dict( getattr( cache, 'lists', {} )), ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#! /usr/bin/env python
+"""Benchmark of wrapped entry-point call overhead (pure-Python wrappers)
+
+Times (min of repeats) a few common wrapped calls and a synthetic
+4-argument wrapper (a pyConverter and a cResolver on every argument)
+against the raw ctypes function it wraps.  --compare runs the
+benchmark twice, with PYOPENGL_GENERATED_WRAPPERS=0 (the generic
+closures) and =1 (the generated calls), and prints both.  Needs a GL
+context, see glcontext.py, e.g.:
+
+    PYOPENGL_PLATFORM=egl EGL_PLATFORM=surfaceless \\
+        PYTHONPATH=. python benchmarks/wrapper_calls.py --compare
+"""
+import argparse, os, subprocess, sys, timeit
+
+STATEMENTS = [
+    'raw.glClearColor( 0,0,0,0 )',
+    'synthetic( 0,0,0,0 )',
+    'GL.glGetIntegerv( GL.GL_VIEWPORT )',
+    'GL.glVertexPointer( 3, GL.GL_FLOAT, 0, vertices )',
+    'GL.glLoadMatrixf( matrix )',
+]
+
+def passThrough( arg, wrapper, args ):
+    return arg
+
+def run( number, repeat ):
+    """Print us/call of each of STATEMENTS"""
+    import glcontext
+    glcontext.createContext()
+    import numpy
+    from OpenGL import GL, wrapper, _configflags
+    from OpenGL.raw.GL.VERSION import GL_1_0 as raw
+    synthetic = wrapper.wrapper( raw.glClearColor )
+    for name in ('red','green','blue','alpha'):
+        synthetic.setPyConverter( name, passThrough )
+        synthetic.setCResolver( name, float )
+    namespace = dict(
+        GL=GL, raw=raw, synthetic=synthetic,
+        vertices=numpy.zeros( (4,3), 'f' ),
+        matrix=numpy.identity( 4, 'f' ),
+    )
+    print( 'GENERATED_WRAPPERS = %s'%( _configflags.GENERATED_WRAPPERS, ))
+    for statement in STATEMENTS:
+        best = min( timeit.repeat( statement, globals=namespace, number=number, repeat=repeat ))
+        print( '  %-48s %8.2f us'%( statement, best/number*1e6 ))
+
+def main( ):
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[0] )
+    parser.add_argument( '--number', type=int, default=20000, help='calls per repeat' )
+    parser.add_argument( '--repeat', type=int, default=7, help='repeats (the minimum is reported)' )
+    parser.add_argument( '--compare', action='store_true', help='run with and without generated wrappers' )
+    options = parser.parse_args()
+    if not options.compare:
+        return run( options.number, options.repeat )
+    for generated in ('0','1'):
+        environ = dict( os.environ, PYOPENGL_GENERATED_WRAPPERS=generated )
+        subprocess.check_call( [
+            sys.executable, __file__,
+            '--number', str( options.number ), '--repeat', str( options.repeat ),
+        ], env=environ )
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,30 @@
+import os
+import sys
+if "--profile" in sys.argv:
+    # GL call counting wraps the entry points as they are constructed, so it has to be on before OpenGL is imported
+    os.environ.setdefault("PYOPENGL_FRAME_PROFILING", "1")
+
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
+from OpenGL.GLU.meshes import *  # cached VBO versions of gluCylinder/glutSolidCube/glutSolidSphere/...
+from OpenGL.GL.batching import *  # batch glBegin/glEnd geometry into glDrawArrays
+from OpenGL.GLUT.atlas import TextBatch
+from OpenGL.profiler import PROFILER
+from OpenGL.GL import shaders
+from OpenGL.GL.ARB.draw_instanced import glDrawArraysInstancedARB, glInitDrawInstancedARB
+from OpenGL.GL.ARB.instanced_arrays import glVertexAttribDivisorARB, glInitInstancedArraysARB
+from OpenGL.arrays import vbo
 import random
 import math
 import time
+import ctypes
+import numpy as np
+import argparse
+import hashlib
+import struct
+import atexit
+from bisect import bisect_left, bisect_right
 
 # =========================
 # Global Game State
@@ -16,9 +37,18 @@ GRID_SIZE = 10
 CELL_SIZE = GRID_LENGTH // GRID_SIZE
 rand_var = 423
 
+# Frame scheduling: the simulation runs at a fixed SIM_HZ, rendering at target_fps
+# interpolates between the last two simulation states
+SIM_HZ = 60
+SIM_DT = 1000.0 / SIM_HZ   # milliseconds per simulation tick
+MAX_CATCHUP_TICKS = 5      # ticks run per wakeup at most; beyond that the game slows down instead
 target_fps = 60
-frame_time = 1000 // target_fps  # milliseconds per frame
-last_time = 0
+frame_interval = 1000.0 / target_fps  # milliseconds per rendered frame
+last_time = 0              # GLUT_ELAPSED_TIME of the previous wakeup
+next_frame_time = 0.0      # deadline of the next wakeup
+sim_accumulator = 0.0      # simulated time owed, in milliseconds
+render_alpha = 1.0         # fraction of a tick between the previous and current state
+sim_tick = 0               # simulation ticks run so far, the game clock (never wall time)
 
 # Player (linear path: X only) & jump
 player_pos = [0.0, 0.0]   # now y will be used for forward/backward movement
@@ -60,6 +90,11 @@ coins_collected = 0
 # Platforms (procedurally generated linear segments along X)
 platforms = []  # each: {"x1":..., "x2":..., "z":..., "w":..., "d":...}
 
+# Platform index (built by build_platform_index() in gen_platforms)
+platform_index = []     # (x1, position in platforms, platform) sorted by x1
+platform_index_x1 = []  # x1 of platform_index entries, for bisect
+platform_max_len = 0.0  # longest platform, bounds how far left of x a match can start
+
 # Camera control & modes
 cam_theta = 30.0
 cam_height = 180.0
@@ -83,8 +118,55 @@ last_score_bonus = 0  # track score milestones for extra lives
 day_night_t = 0.0  # 0..1 cycles
 is_day = True      # added manual day/night control
 
-# Particles (for coin pickups)
-particles = []  # each: {"x","y","z","vx","vy","vz","life","type"}
+# Particles (for coin pickups): fixed-capacity struct-of-arrays pool, live particles are [0, particle_count)
+PARTICLE_CAPACITY = 8192
+PARTICLE_TYPES = {"coin": 0, "enemy": 1}
+# spawn spread per type: (xy jitter, z range, xy speed, vz range, life)
+PARTICLE_SPAWN = {
+    "coin": (15.0, (-5.0, 20.0), 3.0, (3.0, 10.0), 40),
+    "enemy": (20.0, (0.0, 25.0), 4.0, (5.0, 12.0), 35),
+}
+particle_pos = np.zeros((PARTICLE_CAPACITY, 3), dtype=np.float32)
+particle_vel = np.zeros((PARTICLE_CAPACITY, 3), dtype=np.float32)
+particle_life = np.zeros(PARTICLE_CAPACITY, dtype=np.float32)
+particle_kind = np.zeros(PARTICLE_CAPACITY, dtype=np.int8)
+particle_count = 0
+particle_rng = np.random.default_rng(rand_var)
+
+# Render view: positions interpolated between the previous and current tick (interpolate_view)
+prev_player = (0.0, 0.0, 40.0)
+prev_enemies = []
+prev_coin_spin = 0.0
+view_player = (0.0, 0.0, 40.0)
+view_enemies = []
+view_coin_spin = 0.0
+
+# Instanced coin/enemy rendering (init_instancing), None when unsupported
+instancing = None
+
+# Headless simulation (--headless): no window, no GL calls
+headless = False
+
+# Window size in pixels, kept up to date by reshapeListener(); the scene and the HUD are drawn at this size
+window_width, window_height = 1000, 800
+
+# Display list holding the static world (floor + platforms), built by build_static_world()
+static_world_list = None
+
+# Frame-phase profiling: PROFILER always records, P toggles the overlay, --profile dumps JSON at exit
+show_profile_overlay = False
+PROFILE_PHASES = ("simulation", "scene", "text", "swap")
+
+# Input recording (--record) and replay (--replay): key events are applied between ticks, so
+# the seed plus a log of (tick, kind, key) events reproduces a session exactly
+RECORD_MAGIC = b"BMIR"
+RECORD_VERSION = 1
+RECORD_HEADER = struct.Struct("<4sHiHI")  # magic, version, seed, SIM_HZ, event count
+RECORD_EVENT = struct.Struct("<IBH")      # tick, kind, key code
+RECORD_FOOTER = struct.Struct("<I32s")    # ticks simulated, state_hash() digest at the end
+EVENT_KEY_DOWN, EVENT_KEY_UP, EVENT_SPECIAL_KEY = 0, 1, 2
+recording = None  # list of (tick, kind, key) events while recording
+replay = None     # {"events", "next", "ticks", "digest"} while replaying a recording
 
 # =========================
 # Utility
@@ -131,6 +213,23 @@ def gen_platforms():
     platforms.append({
         "x1": -80, "x2": 120, "z": 40, "w": 200, "d": 100  # lower start platform (was z: 60)
     })
+    build_platform_index()
+
+def build_platform_index():
+    global platform_index, platform_index_x1, platform_max_len
+    platform_index = sorted(((p["x1"], i, p) for i, p in enumerate(platforms)), key=lambda e: (e[0], e[1]))
+    platform_index_x1 = [e[0] for e in platform_index]
+    platform_max_len = max([p["x2"] - p["x1"] for p in platforms] or [0.0])
+
+def platforms_near_x(x, margin=0.0):
+    # platforms with x1 - margin <= x <= x2 + margin, in platforms-list order;
+    # a match starts within platform_max_len left of x, so only that slice is scanned
+    lo = bisect_left(platform_index_x1, x - margin - platform_max_len)
+    hi = bisect_right(platform_index_x1, x + margin)
+    found = [e for e in platform_index[lo:hi] if x <= e[2]["x2"] + margin]
+    if len(found) > 1:
+        found.sort(key=lambda e: e[1])
+    return [e[2] for e in found]
 
 def place_coins():
     global coins
@@ -192,22 +291,11 @@ def init_enemies():
 # Drawing Helpers
 # =========================
 
-def draw_text(x, y, text, font = GLUT_BITMAP_HELVETICA_18):
-    glColor3f(1, 1, 1)
-    glMatrixMode(GL_PROJECTION)
-    glPushMatrix()
-    glLoadIdentity()
-    gluOrtho2D(0, 1000, 0, 800)
-    glMatrixMode(GL_MODELVIEW)
-    glPushMatrix()
-    glLoadIdentity()
-    glRasterPos2f(x, y)
-    for ch in text:
-        glutBitmapCharacter(font, ord(ch))
-    glPopMatrix()
-    glMatrixMode(GL_PROJECTION)
-    glPopMatrix()
-    glMatrixMode(GL_MODELVIEW)
+# HUD strings are queued here and drawn from the font atlases in one go at the end of the frame
+hud_text = TextBatch()
+
+def draw_text(x, y, text, font = GLUT_BITMAP_HELVETICA_18, color = (1.0, 1.0, 1.0)):
+    hud_text.add(x, y, text, font, color)
 
 def draw_checker_floor():
     glBegin(GL_QUADS)
@@ -247,15 +335,28 @@ def draw_platforms():
         glutSolidCube(1.0)
         glPopMatrix()
 
+def build_static_world():
+    # compile the floor and platforms once; rebuilt when the platforms change (restart_game)
+    global static_world_list
+    if static_world_list is None:
+        static_world_list = glGenLists(1)
+    glNewList(static_world_list, GL_COMPILE)
+    draw_checker_floor()
+    draw_platforms()
+    glEndList()
+
+def draw_static_world():
+    glCallList(static_world_list)
+
 def draw_coin(c):
     if c["taken"]:
         return
     glPushMatrix()
     glTranslatef(c["x"], c["y"], c["z"])
     dn = 0.5 + 0.5 * math.sin(day_night_t * 6.28318530718)
-    pulse = 0.8 + 0.2 * math.sin(coin_spin * 0.1)
+    pulse = 0.8 + 0.2 * math.sin(view_coin_spin * 0.1)
     glColor3f(1.0 * pulse, (0.85 + 0.14 * dn) * pulse, (0.2 + 0.2 * dn) * pulse)
-    glRotatef(coin_spin, 0, 0, 1)
+    glRotatef(view_coin_spin, 0, 0, 1)
     glScalef(12, 12, 3)  # slightly smaller coin
     glutSolidCube(1)
     
@@ -264,11 +365,11 @@ def draw_coin(c):
     glutSolidCube(1)
     glPopMatrix()
 
-def draw_enemy(e):
+def draw_enemy(e, pos=None):
     if not e["alive"]:
         return
     glPushMatrix()
-    glTranslatef(e["x"], e["y"], e["z"])
+    glTranslatef(*(pos or (e["x"], e["y"], e["z"])))
     glScalef(1.0, 1.0, e["squash"])
     
     # body (red with darker outline)
@@ -285,9 +386,11 @@ def draw_enemy(e):
     glutSolidSphere(e["r"] * 0.5, 16, 16)
     glPopMatrix()
 
-    # simple eyes
+    # simple eyes (relative to the enemy, not squashed)
     glColor3f(1.0, 1.0, 1.0)
     glPushMatrix()
+    glTranslatef(*(pos or (e["x"], e["y"], e["z"])))
+    glPushMatrix()
     glTranslatef(-e["r"] * 0.2, -e["r"] * 0.3, e["r"] * 0.2)
     glutSolidSphere(e["r"] * 0.1, 6, 6)
     glPopMatrix()
@@ -295,10 +398,183 @@ def draw_enemy(e):
     glTranslatef(e["r"] * 0.2, -e["r"] * 0.3, e["r"] * 0.2)
     glutSolidSphere(e["r"] * 0.1, 6, 6)
     glPopMatrix()
+    glPopMatrix()
+
+# Instanced drawing: each coin/enemy part is one shared mesh (in a VBO) drawn with
+# glDrawArraysInstancedARB, per-instance position/size/squash/colour come from
+# glVertexAttribDivisorARB arrays, and a small vertex shader reproduces the
+# fixed-function transform and GL_LIGHT0 lighting of the immediate-mode versions.
+# The per-instance arrays are rows of a preallocated float32 buffer (one per kind
+# of object) updated in place every frame: xyz position, size, squash, then an
+# rgba colour column per part.
+
+INSTANCE_VERTEX_SHADER = """
+#version 120
+attribute vec4 instance;       // xyz position, w size (enemy radius, 1 for coins)
+attribute float instanceSquash;
+attribute vec4 instanceColor;  // this part's colour for the instance
+uniform vec3 partOffset;       // in units of the instance size
+uniform vec3 partScale;
+uniform float partSquashed;    // 1.0 if the part is scaled by instanceSquash
+uniform float spin;            // rotation about z, degrees
+void main() {
+    vec3 scale = partScale * vec3(1.0, 1.0, mix(1.0, instanceSquash, partSquashed));
+    vec3 local = gl_Vertex.xyz * scale + partOffset * vec3(1.0, 1.0, mix(1.0, instanceSquash, partSquashed));
+    vec3 normal = gl_Normal / scale;
+    float a = radians(spin);
+    mat2 rot = mat2(cos(a), sin(a), -sin(a), cos(a));
+    local.xy = rot * local.xy;
+    normal.xy = rot * normal.xy;
+    vec4 world = vec4(local * instance.w + instance.xyz, 1.0);
+    vec4 eye = gl_ModelViewMatrix * world;
+    gl_Position = gl_ProjectionMatrix * eye;
+    vec3 n = normalize(gl_NormalMatrix * normal);
+    vec3 l = normalize(gl_LightSource[0].position.xyz - eye.xyz * gl_LightSource[0].position.w);
+    float diffuse = max(dot(n, l), 0.0);
+    gl_FrontColor = vec4(instanceColor.rgb * (gl_LightModel.ambient.rgb + gl_LightSource[0].ambient.rgb
+                                              + gl_LightSource[0].diffuse.rgb * diffuse), instanceColor.a);
+}
+"""
+INSTANCE_FRAGMENT_SHADER = """
+#version 120
+void main() {
+    gl_FragColor = gl_Color;
+}
+"""
+
+def init_instancing():
+    # compile the instancing shader and build the shared meshes; leaves instancing None if unsupported
+    global instancing
+    instancing = None
+    if not (glInitDrawInstancedARB() and glInitInstancedArraysARB()):
+        return
+    try:
+        program = shaders.compileProgram(
+            shaders.compileShader(INSTANCE_VERTEX_SHADER, GL_VERTEX_SHADER),
+            shaders.compileShader(INSTANCE_FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+            validate=False,
+        )
+    except (RuntimeError, GLError) as err:
+        print(f"Instanced rendering unavailable, using immediate mode: {err}")
+        return
+    meshes = {
+        "cube": cubeMesh(1.0),
+        "sphere12": sphereMesh(1.0, 12, 12),
+        "wire12": wireSphereMesh(1.0, 12, 12),
+        "sphere16": sphereMesh(1.0, 16, 16),
+        "sphere6": sphereMesh(1.0, 6, 6),
+    }
+    instancing = {
+        "program": program,
+        # un-indexed copies of the shared meshes, for glDrawArraysInstancedARB
+        "meshes": {name: (vbo.VBO(m.expanded()), m.count, m.mode) for name, m in meshes.items()},
+        "attributes": {name: glGetAttribLocation(program, name)
+                       for name in ("instance", "instanceSquash", "instanceColor")},
+        "uniforms": {name: glGetUniformLocation(program, name)
+                     for name in ("partOffset", "partScale", "partSquashed", "spin")},
+        "coins": instance_buffer(COIN_COUNT, COIN_PARTS),
+        "enemies": instance_buffer(ENEMY_COUNT, ENEMY_PARTS),
+    }
+
+# per-instance buffer columns: xyz position, size, squash, then rgba per part
+INSTANCE_COLOR_COLUMN = 5
+
+def instance_buffer(capacity, parts):
+    # squash 1 and each part's default colour, rows are filled in by draw_coins/draw_enemies
+    buffer = np.zeros((capacity, INSTANCE_COLOR_COLUMN + 4 * len(parts)), dtype=np.float32)
+    buffer[:, 4] = 1.0
+    for i, part in enumerate(parts):
+        column = INSTANCE_COLOR_COLUMN + 4 * i
+        buffer[:, column:column + 3] = part[4]
+        buffer[:, column + 3] = 1.0
+    return buffer
+
+# parts: (mesh, offset, scale, squashed, default color); offset/scale in units of the instance size
+COIN_PARTS = [
+    ("cube", (0.0, 0.0, 0.0), (12.0, 12.0, 3.0), False, (1.0, 1.0, 0.2)),       # pulsing coin
+    ("cube", (0.0, 0.0, 0.0), (12.0 * 0.7, 12.0 * 0.7, 3.0 * 0.7), False, (1.0, 1.0, 0.8)),
+]
+ENEMY_PARTS = [
+    ("sphere12", (0.0, 0.0, 0.0), (1.0, 1.0, 1.0), True, (0.8, 0.1, 0.1)),        # body
+    ("wire12", (0.0, 0.0, 0.0), (1.05, 1.05, 1.05), True, (0.4, 0.05, 0.05)),     # outline
+    ("sphere16", (0.0, 0.0, 0.8), (0.5, 0.5, 0.5), True, (0.0, 0.0, 0.0)),        # head
+    ("sphere6", (-0.2, -0.3, 0.2), (0.1, 0.1, 0.1), False, (1.0, 1.0, 1.0)),      # eyes
+    ("sphere6", (0.2, -0.3, 0.2), (0.1, 0.1, 0.1), False, (1.0, 1.0, 1.0)),
+]
+
+def draw_instanced(parts, instances, n, spin=0.0):
+    # instances: preallocated per-instance buffer (see instance_buffer), the first n rows are drawn
+    if not n:
+        return
+    uniforms = instancing["uniforms"]
+    attributes = instancing["attributes"]
+    locations = (attributes["instance"], attributes["instanceSquash"], attributes["instanceColor"])
+    stride = instances.strides[0]
+    base = instances.ctypes.data
+    glUseProgram(instancing["program"])
+    glUniform1f(uniforms["spin"], spin)
+    glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_NORMAL_ARRAY)
+    for location in locations:
+        glEnableVertexAttribArray(location)
+        glVertexAttribDivisorARB(location, 1)
+    glVertexAttribPointer(locations[0], 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(base))
+    glVertexAttribPointer(locations[1], 1, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(base + 16))
+    for i, (mesh, offset, scale, squashed, color) in enumerate(parts):
+        buffer, count, mode = instancing["meshes"][mesh]
+        glUniform3f(uniforms["partOffset"], *offset)
+        glUniform3f(uniforms["partScale"], *scale)
+        glUniform1f(uniforms["partSquashed"], 1.0 if squashed else 0.0)
+        # this part's colour column of the instance rows
+        column = INSTANCE_COLOR_COLUMN + 4 * i
+        glVertexAttribPointer(locations[2], 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(base + 4 * column))
+        buffer.bind()
+        glVertexPointer(3, GL_FLOAT, 24, buffer)
+        glNormalPointer(GL_FLOAT, 24, buffer + 12)
+        buffer.unbind()
+        glDrawArraysInstancedARB(mode, 0, count, n)
+    for location in locations:
+        glVertexAttribDivisorARB(location, 0)
+        glDisableVertexAttribArray(location)
+    glPopClientAttrib()
+    glUseProgram(0)
+
+def draw_coins():
+    if instancing is None:
+        for c in coins:
+            draw_coin(c)
+        return
+    instances = instancing["coins"]
+    n = 0
+    for c in coins:
+        if not c["taken"]:
+            instances[n, 0:4] = (c["x"], c["y"], c["z"], 1.0)
+            n += 1
+    dn = 0.5 + 0.5 * math.sin(day_night_t * 6.28318530718)
+    pulse = 0.8 + 0.2 * math.sin(view_coin_spin * 0.1)
+    column = INSTANCE_COLOR_COLUMN
+    instances[:n, column:column + 3] = (1.0 * pulse, (0.85 + 0.14 * dn) * pulse, (0.2 + 0.2 * dn) * pulse)
+    draw_instanced(COIN_PARTS, instances, n, view_coin_spin)
+
+def draw_enemies():
+    if instancing is None:
+        for e, pos in zip(enemies, view_enemies):
+            draw_enemy(e, pos)
+        return
+    instances = instancing["enemies"]
+    n = 0
+    for e, pos in zip(enemies, view_enemies):
+        if e["alive"]:
+            instances[n, 0:3] = pos
+            instances[n, 3] = e["r"]
+            instances[n, 4] = e["squash"]
+            n += 1
+    draw_instanced(ENEMY_PARTS, instances, n)
 
 def draw_player():
     glPushMatrix()
-    glTranslatef(player_pos[0], player_pos[1], player_z)  # include Y position
+    glTranslatef(*view_player)  # interpolated position, include Y
 
     # torso (Mario's shirt - red)
     torso_height = 32  # increased from 24
@@ -339,9 +615,9 @@ def draw_player():
         glPushMatrix()
         glColor3f(0.1, 0.1, 0.7)
         glTranslatef(side * 5, 0, -10)  # adjusted spacing and position
-        gluCylinder(gluNewQuadric(), 4, 3.5, 15, 8, 1)  # increased size
+        gluCylinder(None, 4, 3.5, 15, 8, 1)  # increased size; cached mesh, no quadric needed
         glTranslatef(0, 0, 15)
-        gluCylinder(gluNewQuadric(), 3.5, 3, 12, 8, 1)  # increased size
+        gluCylinder(None, 3.5, 3, 12, 8, 1)  # increased size
         glPopMatrix()
     
     # mustache - made bigger
@@ -354,42 +630,58 @@ def draw_player():
     
     glPopMatrix()
 
+# per-vertex quad corner offsets (multiplied by the particle size)
+PARTICLE_CORNERS = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]], dtype=np.float32)
+
 def draw_particles():
-    glBegin(GL_QUADS)
-    for p in particles:
-        # fade color with life
-        life01 = clamp(p["life"] / 40.0, 0.0, 1.0)
-        
-        if p["type"] == "coin":
-            glColor3f(1.0, 0.9 * life01, 0.3 * life01)
-        elif p["type"] == "enemy":
-            glColor3f(0.8 * life01, 0.1 * life01, 0.1 * life01)
-        else:
-            glColor3f(1.0, 0.9 * life01, 0.3 * life01)
-            
-        s = 4 + 8 * (1.0 - life01)
-        x = p["x"]; y = p["y"]; z = p["z"]
-        # billboarded-ish small quad (axis-aligned since we avoid complex math)
-        glVertex3f(x - s, y - s, z)
-        glVertex3f(x + s, y - s, z)
-        glVertex3f(x + s, y + s, z)
-        glVertex3f(x - s, y + s, z)
-    glEnd()
+    n = particle_count
+    if not n:
+        return
+    # fade color with life
+    life01 = np.clip(particle_life[:n] / 40.0, 0.0, 1.0)
+    colors = np.empty((n, 3), dtype=np.float32)
+    enemy = particle_kind[:n] == PARTICLE_TYPES["enemy"]
+    colors[:, 0] = np.where(enemy, 0.8 * life01, 1.0)
+    colors[:, 1] = np.where(enemy, 0.1, 0.9) * life01
+    colors[:, 2] = np.where(enemy, 0.1, 0.3) * life01
+    s = 4 + 8 * (1.0 - life01)
+    # billboarded-ish small quad (axis-aligned since we avoid complex math), 4 vertices per particle
+    vertices = np.repeat(particle_pos[:n], 4, axis=0)
+    vertices[:, :2] += (PARTICLE_CORNERS[np.newaxis, :, :] * s[:, np.newaxis, np.newaxis]).reshape(-1, 2)
+    colors = np.repeat(colors, 4, axis=0)
+
+    glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, vertices)
+    glColorPointer(3, GL_FLOAT, 0, colors)
+    glDrawArrays(GL_QUADS, 0, 4 * n)
+    glPopClientAttrib()
 
 # =========================
 # Input Handlers
 # =========================
 
 def keyboardListener(key, x, y):
+    global show_profile_overlay
+    key_str = key.decode('utf-8').lower()
+    if key_str == 'p':  # view-only toggle, kept out of press_key so the simulation never sees it
+        show_profile_overlay = not show_profile_overlay
+    elif replay is None:  # a replay takes no live input
+        press_key(key_str)
+    glutPostRedisplay()
+
+def press_key(key_str):
+    # game reaction to a (lower-cased) key press, shared by GLUT and the headless driver
     global player_angle, cheat_mode, cheat_v_follow, player_pos, first_person, keys_pressed
     global is_day, day_night_t
 
+    record_event(EVENT_KEY_DOWN, ord(key_str))
     if game_over:
-        if key == b'r' or key == b'R':
+        if key_str == 'r':
             restart_game()
         return
 
-    key_str = key.decode('utf-8').lower()
     keys_pressed.add(key_str)
 
     if key_str == 'a':
@@ -422,15 +714,23 @@ def keyboardListener(key, x, y):
     elif key_str == 'r':
         restart_game()
 
-    glutPostRedisplay()
-
 def keyboardUpListener(key, x, y):
-    global keys_pressed
-    key_str = key.decode('utf-8').lower()
+    if replay is None:
+        release_key(key.decode('utf-8').lower())
+
+def release_key(key_str):
+    record_event(EVENT_KEY_UP, ord(key_str))
     keys_pressed.discard(key_str)
 
 def specialKeyListener(key, x, y):
+    if replay is None:
+        special_key(key)
+    glutPostRedisplay()
+
+def special_key(key):
+    # camera control (view only, recorded so a rendered replay shows the same view)
     global cam_theta, cam_height
+    record_event(EVENT_SPECIAL_KEY, key)
     if key == GLUT_KEY_UP:
         cam_height = clamp(cam_height + 15.0, 120.0, 1400.0)
     elif key == GLUT_KEY_DOWN:
@@ -439,12 +739,15 @@ def specialKeyListener(key, x, y):
         cam_theta += 3.0
     elif key == GLUT_KEY_RIGHT:
         cam_theta -= 3.0
-    glutPostRedisplay()
 
 def mouseListener(button, state, x, y):
     # No shooting/mouse actions in this Mario-like version.
     pass
 
+def reshapeListener(w, h):
+    global window_width, window_height
+    window_width, window_height = max(w, 1), max(h, 1)
+
 # =========================
 # Camera
 # =========================
@@ -452,24 +755,25 @@ def mouseListener(button, state, x, y):
 def setupCamera():
     glMatrixMode(GL_PROJECTION)
     glLoadIdentity()
-    gluPerspective(fovY, 1.25, 0.1, 3000)
+    gluPerspective(fovY, window_width / window_height, 0.1, 3000)
     glMatrixMode(GL_MODELVIEW)
     glLoadIdentity()
 
+    px, py, pz = view_player
     if first_person:
-        eye_height = player_z + 15  # eye level
+        eye_height = pz + 15  # eye level
         look_ahead = 50
-        gluLookAt(player_pos[0], player_pos[1], eye_height,
-                  player_pos[0] + look_ahead, player_pos[1], eye_height - 5,
+        gluLookAt(px, py, eye_height,
+                  px + look_ahead, py, eye_height - 5,
                   0, 0, 1)
     else:
         # Third person follow camera
-        cam_x = player_pos[0] + cam_radius * math.cos(deg_to_rad(cam_theta))
-        cam_y = player_pos[1] + cam_radius * math.sin(deg_to_rad(cam_theta))
+        cam_x = px + cam_radius * math.cos(deg_to_rad(cam_theta))
+        cam_y = py + cam_radius * math.sin(deg_to_rad(cam_theta))
         cam_z = cam_height
         
         gluLookAt(cam_x, cam_y, cam_z,
-                  player_pos[0], player_pos[1], player_z,
+                  px, py, pz,
                   0, 0, 1)
 
 # =========================
@@ -483,7 +787,7 @@ def clamp_player_within_grid_linear():
 
 def current_ground_z_at_xy(x, y):  # updated to handle both x and y coordinates
     max_z = 0.0  # floor level
-    for p in platforms:
+    for p in platforms_near_x(x):
         if p["x1"] <= x <= p["x2"] and -40 <= y <= 40:  # platforms have some Y width
             max_z = max(max_z, p["z"])
     return max_z
@@ -569,7 +873,7 @@ def update_enemies():
             e["y"] = 0.0  # stay at horizontal middle point
             e["z"] = p["z"] + 15.0  # stay on platform surface
         else:
-            angle = time.time() * e["speed"] * 0.5
+            angle = sim_tick / SIM_HZ * e["speed"] * 0.5  # simulation clock, so replays match
             e["x"] = e["patrol_center_x"] + math.cos(angle) * e["patrol_radius"]
             e["y"] = 0.0  # horizontal middle point
             e["z"] = current_ground_z_at_xy(e["x"], e["y"]) + 12.0
@@ -578,42 +882,44 @@ def update_enemies():
             e["squash"] = min(1.0, e["squash"] + 0.1)
 
 def spawn_particles(x, y, z, n=10, particle_type="coin"):
-    global particles
-    for _ in range(n):
-        if particle_type == "coin":
-            particles.append({
-                "x": x + random.uniform(-15, 15),
-                "y": y + random.uniform(-15, 15),
-                "z": z + random.uniform(-5, 20),
-                "vx": random.uniform(-3, 3),
-                "vy": random.uniform(-3, 3),
-                "vz": random.uniform(3, 10),
-                "life": 40,
-                "type": "coin"
-            })
-        elif particle_type == "enemy":
-            particles.append({
-                "x": x + random.uniform(-20, 20),
-                "y": y + random.uniform(-20, 20),
-                "z": z + random.uniform(0, 25),
-                "vx": random.uniform(-4, 4),
-                "vy": random.uniform(-4, 4),
-                "vz": random.uniform(5, 12),
-                "life": 35,
-                "type": "enemy"
-            })
+    global particle_count
+    if particle_type not in PARTICLE_SPAWN:
+        return
+    n = min(n, PARTICLE_CAPACITY - particle_count)  # drop what does not fit
+    if n <= 0:
+        return
+    spread, (z_lo, z_hi), speed, (vz_lo, vz_hi), life = PARTICLE_SPAWN[particle_type]
+    lo, hi = particle_count, particle_count + n
+    rng = particle_rng
+    particle_pos[lo:hi, 0] = x + rng.uniform(-spread, spread, n)
+    particle_pos[lo:hi, 1] = y + rng.uniform(-spread, spread, n)
+    particle_pos[lo:hi, 2] = z + rng.uniform(z_lo, z_hi, n)
+    particle_vel[lo:hi, :2] = rng.uniform(-speed, speed, (n, 2))
+    particle_vel[lo:hi, 2] = rng.uniform(vz_lo, vz_hi, n)
+    particle_life[lo:hi] = life
+    particle_kind[lo:hi] = PARTICLE_TYPES[particle_type]
+    particle_count = hi
 
 def update_particles():
-    global particles
-    for p in particles[:]:  # copy list to avoid modification during iteration
-        p["x"] += p["vx"]
-        p["y"] += p["vy"]
-        p["z"] += p["vz"]
-        p["vz"] -= 0.3  # gravity on particles
-        p["life"] -= 1
-        
-        if p["life"] <= 0:
-            particles.remove(p)
+    global particle_count
+    n = particle_count
+    if not n:
+        return
+    particle_pos[:n] += particle_vel[:n]
+    particle_vel[:n, 2] -= 0.3  # gravity on particles
+    particle_life[:n] -= 1
+    # compact the survivors to the front of the pool (order preserved)
+    alive = particle_life[:n] > 0
+    m = int(np.count_nonzero(alive))
+    if m != n:
+        for arr in (particle_pos, particle_vel, particle_life, particle_kind):
+            arr[:m] = arr[:n][alive]
+        particle_count = m
+
+def clear_particles():
+    global particle_count, particle_rng
+    particle_count = 0
+    particle_rng = np.random.default_rng(rand_var)
 
 def collect_coins():
     global coins_collected, score
@@ -675,14 +981,55 @@ def maybe_award_extra_life():
 # Idle Loop
 # =========================
 
-def idle():
-    global bullet_cooldown, game_over, missed_bullets, coin_spin, day_night_t, damage_flash
-    global last_time
+def start_frame_timer():
+    global last_time, next_frame_time, sim_accumulator
+    last_time = glutGet(GLUT_ELAPSED_TIME)
+    next_frame_time = last_time + frame_interval
+    sim_accumulator = 0.0
+    glutTimerFunc(int(frame_interval), frame_timer, 0)
+
+def frame_timer(value):
+    # GLUT timer wakeup: run the simulation ticks owed, render, sleep until the next frame deadline
+    global last_time, next_frame_time, sim_accumulator, render_alpha
 
     current_time = glutGet(GLUT_ELAPSED_TIME)
-    if current_time - last_time < frame_time:
-        return
+    sim_accumulator += current_time - last_time
     last_time = current_time
+    # catch-up limit: drop time we could not simulate rather than spiral
+    sim_accumulator = min(sim_accumulator, MAX_CATCHUP_TICKS * SIM_DT)
+
+    with PROFILER.phase("simulation"):
+        while sim_accumulator >= SIM_DT:
+            snapshot_state()
+            simulation_step()
+            sim_accumulator -= SIM_DT
+    render_alpha = sim_accumulator / SIM_DT
+    interpolate_view(render_alpha)
+    glutPostRedisplay()
+
+    next_frame_time += frame_interval
+    if next_frame_time < current_time:  # fell behind by a frame or more; do not try to make it up
+        next_frame_time = current_time + frame_interval
+    glutTimerFunc(max(0, int(round(next_frame_time - current_time))), frame_timer, 0)
+
+def snapshot_state():
+    # remember the state before a tick, the start point of render interpolation
+    global prev_player, prev_enemies, prev_coin_spin
+    prev_player = (player_pos[0], player_pos[1], player_z)
+    prev_enemies = [(e["x"], e["y"], e["z"]) for e in enemies]
+    prev_coin_spin = coin_spin
+
+def interpolate_view(alpha):
+    global view_player, view_enemies, view_coin_spin
+    def lerp(a, b):
+        return tuple(x + (y - x) * alpha for x, y in zip(a, b))
+    view_player = lerp(prev_player, (player_pos[0], player_pos[1], player_z))
+    view_enemies = [lerp(p, (e["x"], e["y"], e["z"])) for p, e in zip(prev_enemies, enemies)]
+    view_coin_spin = (prev_coin_spin + ((coin_spin - prev_coin_spin) % 360.0) * alpha) % 360.0
+
+def simulation_step():
+    # one game-logic tick (no GL calls)
+    global bullet_cooldown, game_over, missed_bullets, coin_spin, day_night_t, damage_flash, sim_tick
 
     if bullet_cooldown > 0:
         bullet_cooldown -= 1
@@ -700,13 +1047,13 @@ def idle():
 
         coin_spin = (coin_spin + 2.0) % 360.0
 
-    glutPostRedisplay()
+    sim_tick += 1
 
 # =========================
 # Rendering
 # =========================
 
-def showScreen():
+def draw_scene():
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     
     dn = 0.5 + 0.5 * math.sin(day_night_t * 6.28318530718)
@@ -719,42 +1066,33 @@ def showScreen():
         glClearColor(sky * 0.5, sky * 0.7, sky, 1)
         
     glLoadIdentity()
-    glViewport(0, 0, 1000, 800)
+    glViewport(0, 0, window_width, window_height)
 
     setupCamera()
 
     glShadeModel(GL_SMOOTH)
 
-    draw_checker_floor()
-    draw_platforms()
-
-    for c in coins:
-        draw_coin(c)
+    draw_static_world()
 
-    for e in enemies:
-        draw_enemy(e)
+    draw_coins()
+    draw_enemies()
 
     draw_player()
     
     draw_particles()
 
+def draw_hud():
     elapsed = int(time.time() - start_time)
     
-    glColor3f(1.0, 1.0, 1.0)
     draw_text(10, 770, f"SCORE: {score:,}", GLUT_BITMAP_HELVETICA_18)
     
-    life_color = (1.0, 0.2, 0.2) if life <= 20 else (1.0, 0.8, 0.2) if life <= 50 else (0.2, 1.0, 0.2)
-    glColor3f(*life_color)
     draw_text(10, 745, f"LIFE: {life}/100", GLUT_BITMAP_HELVETICA_18)
     
-    glColor3f(0.8, 0.8, 1.0)
     draw_text(10, 720, f"COINS: {coins_collected}/{COIN_COUNT}")
     draw_text(10, 695, f"TIME: {elapsed:,}s")
     
-    glColor3f(0.6, 0.9, 0.6)
     draw_text(10, 670, f"Next Life: {((score // 500) + 1) * 500 - score} pts")
     
-    glColor3f(0.7, 0.7, 0.9)
     draw_text(10, 180, "=== CONTROLS ===")
     draw_text(10, 160, "A/D - Move Left/Right")
     draw_text(10, 140, "Space - Jump")
@@ -762,19 +1100,45 @@ def showScreen():
     draw_text(10, 100, "L/N - Day/Night Toggle")
     draw_text(10, 80, "Arrow Keys - Camera")
     draw_text(10, 60, "V - First Person | R - Restart")
+    draw_text(10, 40, "P - Frame Profiler")
 
     if game_over:
-        glColor3f(1.0, 0.3, 0.3)
         draw_text(350, 450, "=== GAME OVER ===", GLUT_BITMAP_TIMES_ROMAN_24)
-        glColor3f(1.0, 1.0, 1.0)
         draw_text(380, 400, f"Final Score: {score:,}")
         draw_text(370, 370, f"Coins Collected: {coins_collected}/{COIN_COUNT}")
         draw_text(380, 340, f"Survival Time: {elapsed:,}s")
-        glColor3f(0.8, 0.8, 1.0)
         draw_text(400, 300, "Press R to Restart")
 
-    glFlush()
-    glutSwapBuffers()
+    if show_profile_overlay:
+        draw_profile_legend()
+
+    # one textured draw per font for the whole HUD
+    hud_text.draw(window_width, window_height)
+
+def draw_profile_legend():
+    stats = PROFILER.statistics(top=0)
+    frame = stats["frame_ms"]
+    if frame:
+        draw_text(690, 690, f"frame p50 {frame['p50']:.1f} p95 {frame['p95']:.1f} p99 {frame['p99']:.1f} ms", GLUT_BITMAP_HELVETICA_12)
+    if stats["calls_per_frame"]:
+        draw_text(690, 675, f"GL calls/frame p50 {stats['calls_per_frame']['p50']:.0f}", GLUT_BITMAP_HELVETICA_12)
+    for i, name in enumerate(PROFILE_PHASES):
+        phase = stats["phases_ms"].get(name)
+        if phase:
+            draw_text(690 + 75 * i, 545, f"{name} {phase['p50']:.1f}", GLUT_BITMAP_HELVETICA_10, PROFILER.colorFor(name))
+
+def showScreen():
+    with PROFILER.phase("scene"):
+        draw_scene()
+    with PROFILER.phase("text"):
+        draw_hud()
+    if show_profile_overlay:
+        PROFILER.drawOverlay(690, 560, 300, 110, (window_width, window_height))
+
+    with PROFILER.phase("swap"):
+        glFlush()
+        glutSwapBuffers()
+    PROFILER.endFrame()
 
 # =========================
 # OpenGL / GLUT Setup
@@ -800,11 +1164,13 @@ def init_gl():
     glLightfv(GL_LIGHT0, GL_AMBIENT, light_ambient)
     glLightfv(GL_LIGHT0, GL_DIFFUSE, light_diffuse)
 
+    init_instancing()
+
 def restart_game():
     global player_pos, player_angle, bullets, missed_bullets, score, life, game_over
     global cheat_mode, cheat_v_follow, first_person
     global player_z, player_vz, on_ground, start_time
-    global coins_collected, particles, is_long_jumping, long_jump_momentum, keys_pressed
+    global coins_collected, is_long_jumping, long_jump_momentum, keys_pressed
     global damage_flash, last_score_bonus
 
     player_pos = [0.0, 0.0]
@@ -821,7 +1187,7 @@ def restart_game():
     player_vz = 0.0
     on_ground = True
     coins_collected = 0
-    particles = []
+    clear_particles()
     is_long_jumping = False
     long_jump_momentum = 0.0
     keys_pressed = set()
@@ -830,15 +1196,19 @@ def restart_game():
     start_time = time.time()
 
     gen_platforms()
+    if not headless:
+        build_static_world()
     place_coins()
     init_enemies()
+    snapshot_state()
+    interpolate_view(1.0)
 
 # =========================
 # Collision Detection
 # =========================
 
 def is_movement_blocked(new_x, new_y, new_z):
-    for p in platforms:
+    for p in platforms_near_x(new_x, 5):
         if (p["x1"] - 5 <= new_x <= p["x2"] + 5 and 
             -80 <= new_y <= 80):
             # If Mario is standing on top of the platform (within reasonable height), allow movement
@@ -850,7 +1220,7 @@ def is_movement_blocked(new_x, new_y, new_z):
     return False
 
 def is_inside_platform(x, y, z):
-    for p in platforms:
+    for p in platforms_near_x(x):
         if (p["x1"] <= x <= p["x2"] and 
             -40 <= y <= 40 and
             0 <= z <= p["z"] + 4):
@@ -862,7 +1232,8 @@ def check_platform_collision(new_x, new_y, new_z):
     if inside:
         return True, platform
     
-    for p in platforms:
+    # beyond player_radius in x the 2D distance check below cannot pass
+    for p in platforms_near_x(new_x, player_radius):
         closest_x = max(p["x1"], min(new_x, p["x2"]))
         closest_y = max(-40, min(new_y, 40))
         
@@ -880,9 +1251,8 @@ def check_platform_collision(new_x, new_y, new_z):
 # Main Entry Point
 # =========================
 
-def main():
+def main(profile_output=None, record_path=None, replay_path=None):
     try:
-        import sys
         glutInit(sys.argv)
         
         try:
@@ -909,14 +1279,29 @@ def main():
 
     try:
         init_gl()
-        restart_game()
 
         glutDisplayFunc(showScreen)
+        glutReshapeFunc(reshapeListener)
         glutKeyboardFunc(keyboardListener)
         glutKeyboardUpFunc(keyboardUpListener)
         glutSpecialFunc(specialKeyListener)
         glutMouseFunc(mouseListener)
-        glutIdleFunc(idle)
+        if replay_path:
+            start_replay(replay_path, profile_output)
+            PROFILER.reset()
+            glutIdleFunc(replay_idle)  # one tick per frame, as fast as frames can be drawn
+        else:
+            restart_game()
+            start_frame_timer()
+            if record_path:
+                start_recording()
+                atexit.register(save_recording, record_path)
+
+        if profile_output:
+            atexit.register(PROFILER.dump, profile_output)
+        if (profile_output or record_path) and HAVE_FREEGLUT:
+            # return from glutMainLoop on window close so the atexit handlers get to run
+            glutSetOption(GLUT_ACTION_ON_WINDOW_CLOSE, GLUT_ACTION_CONTINUE_EXECUTION)
 
         print("Mario game initialized successfully!")
         print("Controls: A/D to move, Space to jump, A/D+Space for long jump")
@@ -926,5 +1311,211 @@ def main():
         print(f"Game initialization failed: {e}")
         return
 
+# =========================
+# Headless Simulation
+# =========================
+
+def state_hash():
+    # digest of the simulation state, for regression checks of the game logic
+    h = hashlib.sha256()
+    h.update(repr((
+        player_pos, player_z, player_vz, on_ground, is_long_jumping, long_jump_momentum,
+        score, life, game_over, coins_collected, last_score_bonus, damage_flash, coin_spin,
+        [(c["x"], c["z"], c["taken"]) for c in coins],
+        [(e["x"], e["z"], e["speed"], e["alive"], e["squash"]) for e in enemies],
+        particle_count,
+    )).encode('utf-8'))
+    n = particle_count
+    for arr in (particle_pos, particle_vel, particle_life, particle_kind):
+        h.update(arr[:n].tobytes())
+    return h.hexdigest()
+
+def random_input(rng):
+    # scripted "player": holds a direction for a while, jumps now and then, restarts after game over
+    if game_over:
+        press_key('r')
+        return
+    if rng.random() < 0.05:
+        for k in ('a', 'd'):
+            if k in keys_pressed:
+                release_key(k)
+        direction = rng.choice(['a', 'd', 'd', None])
+    else:
+        direction = None
+    for k in ('a', 'd'):
+        if k in keys_pressed or k == direction:
+            press_key(k)  # key down, then auto-repeat while held
+    if rng.random() < 0.08:
+        press_key(' ')
+        release_key(' ')
+
+def run_headless(ticks, seed, profile_output=None, record_path=None):
+    global headless, rand_var
+    headless = True
+    rand_var = seed
+    restart_game()
+    rng = random.Random(seed)
+    games = 1
+    if record_path:
+        start_recording()
+    PROFILER.reset()
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        if game_over:
+            games += 1
+        random_input(rng)
+        with PROFILER.phase("simulation"):
+            simulation_step()
+        PROFILER.endFrame()  # one "frame" per tick
+    elapsed = time.perf_counter() - t0
+    print(f"ticks: {ticks} in {elapsed:.3f}s ({ticks / elapsed if elapsed else float('inf'):,.0f} ticks/s)")
+    print(f"games: {games} score: {score} life: {life} coins: {coins_collected}/{COIN_COUNT}")
+    print(f"state hash: {state_hash()}")
+    if profile_output:
+        PROFILER.dump(profile_output)
+    if record_path:
+        save_recording(record_path)
+
+# =========================
+# Input Recording / Replay
+# =========================
+
+def record_event(kind, key):
+    if recording is not None:
+        recording.append((sim_tick, kind, key))
+
+def start_recording():
+    # record from the current (freshly restarted) state; the seed is saved with the events
+    global recording, sim_tick
+    sim_tick = 0
+    recording = []
+
+def save_recording(path):
+    data = bytearray(RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, rand_var, SIM_HZ, len(recording)))
+    for event in recording:
+        data += RECORD_EVENT.pack(*event)
+    data += RECORD_FOOTER.pack(sim_tick, bytes.fromhex(state_hash()))
+    with open(path, 'wb') as f:
+        f.write(data)
+    print(f"recorded {len(recording)} events over {sim_tick} ticks to {path} ({len(data)} bytes)")
+
+def load_recording(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, seed, sim_hz, count = RECORD_HEADER.unpack_from(data, 0)
+    if magic != RECORD_MAGIC or version != RECORD_VERSION:
+        raise ValueError(f"{path}: not a version {RECORD_VERSION} input recording")
+    if sim_hz != SIM_HZ:
+        raise ValueError(f"{path}: recorded at {sim_hz} ticks/s, the game runs at {SIM_HZ}")
+    offset = RECORD_HEADER.size
+    events = [RECORD_EVENT.unpack_from(data, offset + i * RECORD_EVENT.size) for i in range(count)]
+    ticks, digest = RECORD_FOOTER.unpack_from(data, offset + count * RECORD_EVENT.size)
+    return seed, events, ticks, digest.hex()
+
+def start_replay(path, profile_output=None):
+    global replay, rand_var, sim_tick
+    seed, events, ticks, digest = load_recording(path)
+    rand_var = seed
+    restart_game()
+    sim_tick = 0
+    replay = {"events": events, "next": 0, "ticks": ticks, "digest": digest, "start": time.perf_counter(),
+              "profile": profile_output}
+
+def apply_event(kind, key):
+    if kind == EVENT_KEY_DOWN:
+        press_key(chr(key))
+    elif kind == EVENT_KEY_UP:
+        release_key(chr(key))
+    elif kind == EVENT_SPECIAL_KEY:
+        special_key(key)
+
+def replay_tick():
+    # apply the events recorded before this tick, then run it; False once the recording is used up
+    events = replay["events"]
+    i = replay["next"]
+    while i < len(events) and events[i][0] <= sim_tick:
+        apply_event(events[i][1], events[i][2])
+        i += 1
+    replay["next"] = i
+    if sim_tick >= replay["ticks"]:
+        return False
+    snapshot_state()
+    simulation_step()
+    return True
+
+def finish_replay():
+    # report speed and whether the final state matches the one saved with the recording
+    elapsed = time.perf_counter() - replay["start"]
+    ticks = replay["ticks"]
+    digest = state_hash()
+    print(f"replayed {ticks} ticks in {elapsed:.3f}s ({ticks / elapsed if elapsed else float('inf'):,.0f} ticks/s)")
+    print(f"state hash: {digest}")
+    if digest == replay["digest"]:
+        print("replay matches the recording")
+        return True
+    print(f"replay DIVERGED from the recording (expected {replay['digest']})")
+    return False
+
+def replay_idle():
+    # rendered replay: one tick per frame, no frame pacing
+    with PROFILER.phase("simulation"):
+        running = replay_tick()
+    if not running:
+        matched = finish_replay()
+        if HAVE_FREEGLUT:
+            glutLeaveMainLoop()
+        else:
+            # os._exit skips the atexit handlers, so write the --profile output here
+            if replay["profile"]:
+                PROFILER.dump(replay["profile"])
+            os._exit(0 if matched else 1)
+        return
+    interpolate_view(1.0)
+    glutPostRedisplay()
+
+def run_replay(path, profile_output=None):
+    global headless
+    headless = True
+    start_replay(path)
+    PROFILER.reset()
+    while True:
+        with PROFILER.phase("simulation"):
+            running = replay_tick()
+        if not running:
+            break
+        PROFILER.endFrame()
+    matched = finish_replay()
+    if profile_output:
+        PROFILER.dump(profile_output)
+    return matched
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="BRACU Mario - Linear 3D Platformer")
+    parser.add_argument("--headless", action="store_true", help="run the game logic without a window or GL")
+    parser.add_argument("--ticks", type=int, default=10000, help="ticks to simulate in headless mode")
+    parser.add_argument("--seed", type=int, default=rand_var, help="level seed (and input seed for headless mode)")
+    parser.add_argument("--record", metavar="FILE", help="record the seed and key events to FILE (binary log)")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="re-run a recording at full speed, rendered (or not, with --headless); "
+                             "exits non-zero if the final state differs from the recorded one")
+    parser.add_argument("--profile", nargs="?", const="frame_profile.json", metavar="FILE",
+                        help="count GL calls and write frame-phase percentiles to FILE (JSON) on exit")
+    args, rest = parser.parse_known_args(argv)  # unknown arguments are left for glutInit
+    if args.seed < 0:
+        parser.error(f"--seed must not be negative, got {args.seed}")
+    if args.record and args.seed >= 2**31:  # saved as a signed 32-bit value in RECORD_HEADER
+        parser.error(f"--seed must be below 2**31 to be recorded, got {args.seed}")
+    return args, rest
+
 if __name__ == "__main__":
-    main()
+    args, rest = parse_args(sys.argv[1:])
+    if args.replay and args.headless:
+        sys.exit(0 if run_replay(args.replay, args.profile) else 1)
+    elif args.headless:
+        run_headless(args.ticks, args.seed, args.profile, args.record)
+    else:
+        rand_var = args.seed
+        sys.argv = sys.argv[:1] + rest
+        main(args.profile, args.record, args.replay)
+        if replay is not None:
+            sys.exit(0 if state_hash() == replay["digest"] else 1)